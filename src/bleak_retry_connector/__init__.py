@@ -4,15 +4,25 @@ __version__ = "4.6.3"
 
 
 import asyncio
+import contextlib
 import logging
-from collections.abc import Awaitable, Callable
-from typing import Any, ParamSpec, TypeVar
+import time
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar
 
 from bleak import BleakClient, BleakScanner
 from bleak.backends.device import BLEDevice
 from bleak.backends.service import BleakGATTServiceCollection
 from bleak.exc import BleakDBusError, BleakDeviceNotFoundError, BleakError
 
+from .attempts import ConnectionAttempt, ConnectionErrorCategory
+from .bleak_manager import (
+    WarmUpReport,
+    get_bluez_manager,
+    get_global_bluez_manager_with_timeout,
+    register_bluez_manager_callback,
+    warm_up,
+)
 from .bluez import (  # noqa: F401
     AllocationChange,
     AllocationChangeEvent,
@@ -20,27 +30,82 @@ from .bluez import (  # noqa: F401
     BleakSlotManager,
     _get_properties,
     _get_services_cache,
+    adapter_from_path,
     clear_cache,
+    device_is_absent,
     device_source,
+    get_bluez_device,
     get_connected_devices,
     get_device,
     get_device_by_adapter,
     path_from_ble_device,
+    wait_for_advertisement,
     wait_for_device_to_reappear,
     wait_for_disconnect,
 )
-from .const import DISCONNECT_TIMEOUT, IS_LINUX, NO_RSSI_VALUE, RSSI_SWITCH_THRESHOLD
+from .circuit_breaker import (
+    BleakCircuitOpenError,
+    CircuitState,
+    ConnectionCircuitBreaker,
+)
+from .const import (
+    ABSENT_DEVICE_WAIT_TIMEOUT,
+    DISCONNECT_TIMEOUT,
+    IS_LINUX,
+    NO_RSSI_VALUE,
+    RSSI_SWITCH_THRESHOLD,
+)
+from .health import (
+    ADAPTER_ERROR_CATEGORIES,
+    AdapterHealthTracker,
+    get_adapter_health_tracker,
+)
+from .latency import ConnectLatencyTracker
+from .metrics import (
+    BACKOFF_SECONDS,
+    CONNECT_ATTEMPT_SECONDS,
+    CONNECT_ATTEMPTS,
+    CONNECT_OUTCOMES,
+    UNKNOWN_ADAPTER,
+    MetricsRegistry,
+    get_metrics_registry,
+    render_metrics,
+)
+from .recorder import FlightRecorder, get_flight_recorder
+from .restore import DiscoveryRestorer, RestoreReport, partition_by_adapter
+from .tracing import Tracer, set_tracer, trace_span
 from .util import asyncio_timeout
+from .watchdog import SlowConnectSnapshot, SlowConnectWatchdog
 
 DEFAULT_ATTEMPTS = 2
 
-if IS_LINUX:
-    from bluetooth_adapters import load_history_from_managed_objects
+if TYPE_CHECKING:
+    from bluetooth_adapters import AdvertisementHistory
+
 
-    from .dbus import disconnect_devices
-else:
-    load_history_from_managed_objects = None
-    disconnect_devices = None  # type: ignore[assignment]
+# bluetooth-adapters and dbus-fast are slow to import and only needed
+# on Linux once there is something to restore or disconnect, so they
+# are imported on first use instead of with the package
+
+
+def load_history_from_managed_objects(
+    managed_objects: dict[str, Any], source_adapter: str | None = None
+) -> dict[str, AdvertisementHistory]:
+    """Load the advertisement history from the BlueZ managed objects."""
+    from bluetooth_adapters import (  # pylint: disable=import-outside-toplevel
+        load_history_from_managed_objects,
+    )
+
+    return load_history_from_managed_objects(managed_objects, source_adapter)
+
+
+async def disconnect_devices(devices: list[BLEDevice]) -> None:
+    """Disconnect a list of devices."""
+    from .dbus import (  # pylint: disable=import-outside-toplevel
+        disconnect_devices,
+    )
+
+    await disconnect_devices(devices)
 
 
 # Make sure bleak and dbus-fast have time
@@ -62,16 +127,42 @@ __all__ = [
     "BleakSlotManager",  # Currently only possible for BlueZ, for MacOS we have no of knowing
     "ble_device_description",
     "establish_connection",
+    "establish_connection_on_advertisement",
+    "get_adapter_health_tracker",
     "close_stale_connections",
     "close_stale_connections_by_address",
     "clear_cache",
     "get_device",
     "get_device_by_adapter",
     "device_source",
+    "device_is_absent",
+    "register_bluez_manager_callback",
     "restore_discoveries",
+    "restore_discoveries_by_adapter",
     "retry_bluetooth_connection_error",
+    "wait_for_advertisement",
+    "warm_up",
+    "WarmUpReport",
+    "RestoreReport",
+    "DiscoveryRestorer",
+    "AdapterHealthTracker",
     "BleakClientWithServiceCache",
+    "CircuitState",
+    "ConnectionAttempt",
+    "ConnectionErrorCategory",
+    "ConnectionCircuitBreaker",
+    "ConnectLatencyTracker",
+    "FlightRecorder",
+    "get_flight_recorder",
+    "MetricsRegistry",
+    "get_metrics_registry",
+    "render_metrics",
+    "SlowConnectSnapshot",
+    "SlowConnectWatchdog",
+    "Tracer",
+    "set_tracer",
     "BleakAbortedError",
+    "BleakCircuitOpenError",
     "BleakConnectionError",
     "BleakNotFoundError",
     "BleakOutOfConnectionSlotsError",
@@ -168,19 +259,30 @@ OUT_OF_SLOTS_ADVICE = (
 NORMAL_DISCONNECT = "Disconnected"
 
 
-class BleakNotFoundError(BleakError):
+class _BleakConnectionAttemptsError(BleakError):
+    """A connection failure that carries the connection attempts."""
+
+    def __init__(
+        self, *args: object, attempts: list[ConnectionAttempt] | None = None
+    ) -> None:
+        """Initialize the error."""
+        super().__init__(*args)
+        self.attempts: list[ConnectionAttempt] = attempts or []
+
+
+class BleakNotFoundError(_BleakConnectionAttemptsError):
     """The device was not found."""
 
 
-class BleakConnectionError(BleakError):
+class BleakConnectionError(_BleakConnectionAttemptsError):
     """General connection failure after all retries."""
 
 
-class BleakAbortedError(BleakError):
+class BleakAbortedError(_BleakConnectionAttemptsError):
     """The connection was aborted."""
 
 
-class BleakOutOfConnectionSlotsError(BleakError):
+class BleakOutOfConnectionSlotsError(_BleakConnectionAttemptsError):
     """The proxy/adapter is out of connection slots."""
 
 
@@ -250,6 +352,13 @@ def ble_device_description(device: BLEDevice) -> str:
     return base_name
 
 
+def _adapter_from_device(device: BLEDevice) -> str | None:
+    """Get the adapter or proxy source a device is connected through."""
+    if path := path_from_ble_device(device):
+        return adapter_from_path(path)
+    return device_source(device)
+
+
 async def _has_valid_services_in_cache(device: BLEDevice) -> bool:
     """Check if the device has valid services in cache.
 
@@ -277,7 +386,9 @@ async def _has_valid_services_in_cache(device: BLEDevice) -> bool:
         return True
 
     # Get the services cache
-    if not (services_cache := await _get_services_cache()):
+    if not (
+        manager := get_bluez_manager() or await get_global_bluez_manager_with_timeout()
+    ) or not (services_cache := manager._services_cache):
         _LOGGER.debug(
             "%s - %s: No services cache available, cannot validate",
             device.name or "Unknown",
@@ -296,7 +407,7 @@ async def _has_valid_services_in_cache(device: BLEDevice) -> bool:
         return False
 
     # Get current properties to check if cached services are still present
-    if not (properties := await _get_properties()):
+    if not (properties := manager._properties):
         _LOGGER.debug(
             "%s - %s: Could not get properties to validate cache",
             device.name or "Unknown",
@@ -365,6 +476,78 @@ def calculate_backoff_time(exc: Exception) -> float:
     return BLEAK_BACKOFF_TIME
 
 
+def _categorize_exception(exc: BaseException) -> ConnectionErrorCategory:
+    """Categorize the exception from a failed connection attempt."""
+    if isinstance(exc, asyncio.TimeoutError):
+        return ConnectionErrorCategory.TIMEOUT
+    if isinstance(exc, KeyError):
+        return ConnectionErrorCategory.SERVICES_CHANGED
+    if isinstance(exc, BrokenPipeError):
+        return ConnectionErrorCategory.BROKEN_PIPE
+    if isinstance(exc, EOFError):
+        return ConnectionErrorCategory.EOF
+    bleak_error = str(exc)
+    if (
+        isinstance(exc, (BleakDeviceNotFoundError, BleakNotFoundError))
+        or "not found" in bleak_error
+    ):
+        return ConnectionErrorCategory.DEVICE_MISSING
+    if isinstance(exc, BleakError):
+        if any(error in bleak_error for error in OUT_OF_SLOTS_ERRORS):
+            return ConnectionErrorCategory.OUT_OF_SLOTS
+        if any(error in bleak_error for error in ABORT_ERRORS):
+            return ConnectionErrorCategory.ABORTED
+        if any(error in bleak_error for error in DEVICE_MISSING_ERRORS):
+            return ConnectionErrorCategory.DEVICE_MISSING
+        if NORMAL_DISCONNECT in bleak_error:
+            return ConnectionErrorCategory.DISCONNECTED
+    return ConnectionErrorCategory.OTHER
+
+
+async def _backoff(
+    device: BLEDevice, connection_attempt: ConnectionAttempt, backoff_time: float
+) -> None:
+    """Wait for the device to disconnect and back off after a failed attempt."""
+    connection_attempt.backoff = backoff_time
+    BACKOFF_SECONDS.labels(connection_attempt.adapter or UNKNOWN_ADAPTER).observe(
+        backoff_time
+    )
+    start = time.monotonic()
+    with trace_span("backoff", address=device.address, backoff=backoff_time):
+        await wait_for_disconnect(device, backoff_time)
+    connection_attempt.disconnect_wait = time.monotonic() - start
+
+
+@contextlib.contextmanager
+def _attempt_context(
+    connection_attempt: ConnectionAttempt,
+    device: BLEDevice,
+    name: str,
+    attempt: int,
+    watchdog: SlowConnectWatchdog | None,
+) -> Iterator[None]:
+    """Trace and watch a connection attempt and record its duration."""
+    get_flight_recorder().record(
+        device.address, "attempt", connection_attempt.adapter, str(attempt)
+    )
+    adapter = connection_attempt.adapter or UNKNOWN_ADAPTER
+    CONNECT_ATTEMPTS.labels(adapter).inc()
+    watch = watchdog.watch(device, name, attempt) if watchdog is not None else None
+    try:
+        with trace_span(
+            "connect_attempt",
+            address=device.address,
+            adapter=connection_attempt.adapter,
+            attempt=attempt,
+        ):
+            yield
+    finally:
+        if watch is not None:
+            watch.cancel()
+        connection_attempt.duration = time.monotonic() - connection_attempt.start
+        CONNECT_ATTEMPT_SECONDS.labels(adapter).observe(connection_attempt.duration)
+
+
 async def close_stale_connections_by_address(
     address: str, only_other_adapters: bool = False
 ) -> None:
@@ -398,7 +581,10 @@ async def close_stale_connections(
 
     if not to_disconnect:
         return
-    await disconnect_devices(to_disconnect)
+    with trace_span(
+        "stale_cleanup", address=device.address, devices=len(to_disconnect)
+    ):
+        await disconnect_devices(to_disconnect)
 
 
 AnyBleakClient = TypeVar("AnyBleakClient", bound=BleakClient)
@@ -414,6 +600,14 @@ async def establish_connection(
     ble_device_callback: Callable[[], BLEDevice] | None = None,
     use_services_cache: bool = True,
     pair: bool = False,
+    fail_fast_if_absent: bool = False,
+    last_seen: float | None = None,
+    latency_tracker: ConnectLatencyTracker | None = None,
+    circuit_breaker: ConnectionCircuitBreaker | None = None,
+    attempts_callback: Callable[[list[ConnectionAttempt]], None] | None = None,
+    watchdog: SlowConnectWatchdog | None = None,
+    slot_manager: BleakSlotManager | None = None,
+    adapter_health: AdapterHealthTracker | None = None,
     **kwargs: Any,
 ) -> AnyBleakClient:
     """Establish a connection to the device."""
@@ -421,41 +615,106 @@ async def establish_connection(
     connect_errors = 0
     transient_errors = 0
     attempt = 0
+    connection_attempts: list[ConnectionAttempt] = []
 
     def _raise_if_needed(name: str, description: str, exc: Exception) -> None:
-        """Raise if we reach the max attempts."""
+        """Record the failed attempt and raise if we reach the max attempts."""
+        category = connection_attempts[-1].category = _categorize_exception(exc)
+        CONNECT_OUTCOMES.labels(adapter or UNKNOWN_ADAPTER, category.name.lower()).inc()
+        recorder.record(
+            device.address,
+            "failed",
+            adapter,
+            f"{category.name}: {str(exc) or type(exc).__name__}",
+        )
+        if (
+            adapter_health is not None
+            and adapter
+            and category in ADAPTER_ERROR_CATEGORIES
+        ):
+            adapter_health.record_failure(adapter)
         if (
             timeouts + connect_errors < max_attempts
             and transient_errors < MAX_TRANSIENT_ERRORS
         ):
             return
+        if circuit_breaker is not None:
+            circuit_breaker.record_failure(device.address)
+        if slot_manager is not None:
+            # Once per call so the retries of one connect are one observation
+            slot_manager.record_connect_failure(device, category)
         msg = (
             f"{name} - {description}: Failed to connect after "
             f"{attempt} attempt(s): {str(exc) or type(exc).__name__}"
         )
         # Sure would be nice if bleak gave us typed exceptions
         if isinstance(exc, asyncio.TimeoutError):
-            raise BleakNotFoundError(msg) from exc
+            raise BleakNotFoundError(msg, attempts=connection_attempts) from exc
         if isinstance(exc, BleakDeviceNotFoundError) or "not found" in str(exc):
-            raise BleakNotFoundError(f"{msg}: {DEVICE_MISSING_ADVICE}") from exc
+            raise BleakNotFoundError(
+                f"{msg}: {DEVICE_MISSING_ADVICE}", attempts=connection_attempts
+            ) from exc
         if isinstance(exc, BleakError):
             if any(error in str(exc) for error in OUT_OF_SLOTS_ERRORS):
                 raise BleakOutOfConnectionSlotsError(
-                    f"{msg}: {OUT_OF_SLOTS_ADVICE}"
+                    f"{msg}: {OUT_OF_SLOTS_ADVICE}", attempts=connection_attempts
                 ) from exc
             if any(error in str(exc) for error in ABORT_ERRORS):
-                raise BleakAbortedError(f"{msg}: {ABORT_ADVICE}") from exc
+                raise BleakAbortedError(
+                    f"{msg}: {ABORT_ADVICE}", attempts=connection_attempts
+                ) from exc
             if any(error in str(exc) for error in DEVICE_MISSING_ERRORS):
-                raise BleakNotFoundError(f"{msg}: {DEVICE_MISSING_ADVICE}") from exc
-        raise BleakConnectionError(msg) from exc
+                raise BleakNotFoundError(
+                    f"{msg}: {DEVICE_MISSING_ADVICE}", attempts=connection_attempts
+                ) from exc
+        raise BleakConnectionError(msg, attempts=connection_attempts) from exc
 
+    recorder = get_flight_recorder()
+    if circuit_breaker is not None:
+        try:
+            circuit_breaker.check(device.address, name)
+        except BleakCircuitOpenError as ex:
+            recorder.record(device.address, "circuit_open", detail=str(ex))
+            raise
     debug_enabled = _LOGGER.isEnabledFor(logging.DEBUG)
+    if fail_fast_if_absent and await device_is_absent(device, last_seen):
+        # Rather than spending BLEAK_TIMEOUT on every attempt for a device
+        # that is not around, give it a short window to advertise.
+        if not (
+            advertised_device := await wait_for_advertisement(
+                device.address, ABSENT_DEVICE_WAIT_TIMEOUT
+            )
+        ):
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(device.address)
+            recorder.record(device.address, "absent")
+            raise BleakNotFoundError(
+                f"{name} - {device.address}: Device has not advertised recently: "
+                f"{DEVICE_MISSING_ADVICE}",
+                attempts=connection_attempts,
+            )
+        if path_from_ble_device(device):
+            device = advertised_device
+
     if IS_LINUX and (devices := await get_connected_devices(device)):
         # Bleak 0.17 will handle already connected devices for us so
         # if we are already connected we swap the device to the connected
         # device.
         device = devices[0]
+    elif (
+        adapter_health is not None
+        and (path := path_from_ble_device(device))
+        and adapter_health.is_quarantined(adapter_from_path(path))
+        and (
+            healthy_device := await get_bluez_device(
+                name, path, adapter_health=adapter_health
+            )
+        )
+    ):
+        # The adapter keeps failing so move to a healthy one
+        device = healthy_device
 
+    adapter = _adapter_from_device(device)
     client = client_class(
         device,
         disconnected_callback=disconnected_callback,
@@ -474,24 +733,45 @@ async def establish_connection(
                 attempt,
             )
 
+        connection_attempt = ConnectionAttempt(
+            adapter, path_from_ble_device(device), time.monotonic()
+        )
+        connection_attempts.append(connection_attempt)
         try:
-            async with asyncio_timeout(BLEAK_SAFETY_TIMEOUT):
-                # Only use cache if we have valid services in the cache
-                should_use_cache = use_services_cache or bool(cached_services)
-                if should_use_cache:
-                    should_use_cache = await _has_valid_services_in_cache(device)
-
-                await client.connect(
-                    timeout=BLEAK_TIMEOUT,
-                    dangerous_use_bleak_cache=should_use_cache,
-                )
-                if debug_enabled:
-                    _LOGGER.debug(
-                        "%s - %s: Connected after %s attempts",
-                        name,
-                        device.address,
-                        attempt,
+            with _attempt_context(connection_attempt, device, name, attempt, watchdog):
+                async with asyncio_timeout(BLEAK_SAFETY_TIMEOUT):
+                    # Only use cache if we have valid services in the cache
+                    should_use_cache = use_services_cache or bool(cached_services)
+                    if should_use_cache:
+                        with trace_span("cache_validation", address=device.address):
+                            should_use_cache = await _has_valid_services_in_cache(
+                                device
+                            )
+
+                    connect_timeout = BLEAK_TIMEOUT
+                    if latency_tracker is not None:
+                        connect_timeout = latency_tracker.get_timeout(
+                            device.address, BLEAK_TIMEOUT, timeouts
+                        )
+                    connect_start = time.monotonic()
+                    await client.connect(
+                        timeout=connect_timeout,
+                        dangerous_use_bleak_cache=should_use_cache,
                     )
+                    connect_time = time.monotonic() - connect_start
+                    if latency_tracker is not None:
+                        latency_tracker.record(device.address, connect_time)
+                    if adapter_health is not None and adapter:
+                        adapter_health.record_success(adapter, connect_time)
+                    if slot_manager is not None:
+                        slot_manager.record_connect_success(device)
+                    if debug_enabled:
+                        _LOGGER.debug(
+                            "%s - %s: Connected after %s attempts",
+                            name,
+                            device.address,
+                            attempt,
+                        )
         except asyncio.TimeoutError as exc:
             timeouts += 1
             if debug_enabled:
@@ -502,7 +782,7 @@ async def establish_connection(
                     attempt,
                 )
             backoff_time = calculate_backoff_time(exc)
-            await wait_for_disconnect(device, backoff_time)
+            await _backoff(device, connection_attempt, backoff_time)
             _raise_if_needed(name, device.address, exc)
         except KeyError as exc:
             # Likely: KeyError: 'org.bluez.GattService1' from bleak
@@ -522,7 +802,7 @@ async def establish_connection(
                 await client.clear_cache()
                 await client.disconnect()
                 backoff_time = calculate_backoff_time(exc)
-                await wait_for_disconnect(device, backoff_time)
+                await _backoff(device, connection_attempt, backoff_time)
             _raise_if_needed(name, device.address, exc)
         except BrokenPipeError as exc:
             # BrokenPipeError is raised by dbus-next when the device disconnects
@@ -557,7 +837,7 @@ async def establish_connection(
                     backoff_time,
                     attempt,
                 )
-            await wait_for_disconnect(device, backoff_time)
+            await _backoff(device, connection_attempt, backoff_time)
             _raise_if_needed(name, device.address, exc)
         except BLEAK_EXCEPTIONS as exc:
             bleak_error = str(exc)
@@ -583,9 +863,15 @@ async def establish_connection(
                     backoff_time,
                     attempt,
                 )
-            await wait_for_disconnect(device, backoff_time)
+            await _backoff(device, connection_attempt, backoff_time)
             _raise_if_needed(name, device.address, exc)
         else:
+            CONNECT_OUTCOMES.labels(adapter or UNKNOWN_ADAPTER, "connected").inc()
+            recorder.record(device.address, "connected", adapter, str(attempt))
+            if circuit_breaker is not None:
+                circuit_breaker.record_success(device.address)
+            if attempts_callback is not None:
+                attempts_callback(connection_attempts)
             return client
         # Ensure the disconnect callback
         # has a chance to run before we try to reconnect
@@ -594,6 +880,96 @@ async def establish_connection(
     raise RuntimeError("This should never happen")
 
 
+async def establish_connection_on_advertisement(
+    client_class: type[AnyBleakClient],
+    device: BLEDevice,
+    name: str,
+    timeout: float = BLEAK_SAFETY_TIMEOUT,
+    disconnected_callback: Callable[[AnyBleakClient], None] | None = None,
+    use_services_cache: bool = True,
+    pair: bool = False,
+    **kwargs: Any,
+) -> AnyBleakClient:
+    """Establish a connection right after the device advertises.
+
+    Sleepy peripherals are often only connectable for a short time
+    after they advertise so instead of connecting at a random time,
+    wait for the next advertisement or RSSI update on any adapter and
+    connect through the best adapter immediately. Each advertisement
+    starts a single attempt (transient errors are still retried) until
+    the timeout expires.
+
+    Devices that are not on a BlueZ adapter are connected normally.
+    """
+    if "max_attempts" in kwargs:
+        raise TypeError(
+            "establish_connection_on_advertisement does not take max_attempts, "
+            "each advertisement starts a single attempt"
+        )
+    if not IS_LINUX or not path_from_ble_device(device):
+        async with asyncio_timeout(timeout):
+            return await establish_connection(
+                client_class,
+                device,
+                name,
+                disconnected_callback,
+                use_services_cache=use_services_cache,
+                pair=pair,
+                **kwargs,
+            )
+
+    last_exc: BleakError | None = None
+    try:
+        async with asyncio_timeout(timeout):
+            while advertised := await wait_for_advertisement(device.address, timeout):
+                path: str = advertised.details["path"]
+                rssi: int | None = advertised.details["props"].get("RSSI")
+                device = (
+                    await get_bluez_device(
+                        name, path, rssi, adapter_health=kwargs.get("adapter_health")
+                    )
+                    or advertised
+                )
+                _LOGGER.debug(
+                    "%s - %s: Advertisement received on %s, connecting via %s",
+                    name,
+                    device.address,
+                    path,
+                    device.details["path"],
+                )
+                try:
+                    return await establish_connection(
+                        client_class,
+                        device,
+                        name,
+                        disconnected_callback,
+                        max_attempts=1,
+                        use_services_cache=use_services_cache,
+                        pair=pair,
+                        **kwargs,
+                    )
+                except BleakCircuitOpenError:
+                    raise
+                except BleakError as exc:
+                    last_exc = exc
+                    _LOGGER.debug(
+                        "%s - %s: Failed to connect after advertisement: %s",
+                        name,
+                        device.address,
+                        exc,
+                    )
+    except asyncio.TimeoutError:
+        pass
+    if last_exc is None:
+        msg = (
+            f"{name} - {device.address}: Failed to connect on advertisement "
+            f"within {timeout} seconds"
+        )
+        raise BleakNotFoundError(f"{msg}: {DEVICE_MISSING_ADVICE}")
+    # Keep the type of the last failure
+    raise last_exc
+
+
 P = ParamSpec("P")
 T = TypeVar("T")
 
@@ -635,14 +1011,10 @@ def retry_bluetooth_connection_error(
     return _decorator_retry_bluetooth_connection_error
 
 
-async def restore_discoveries(scanner: BleakScanner, adapter: str) -> None:
-    """Restore discoveries from the bus."""
-    if not IS_LINUX:
-        # This is only supported on Linux
-        return
-    if not (properties := await _get_properties()):
-        _LOGGER.debug("Failed to restore discoveries for %s", adapter)
-        return
+def _restore_history(
+    scanner: BleakScanner, managed_objects: dict[str, Any], adapter: str
+) -> int:
+    """Add the history of an adapter to the scanner and return how many are new."""
     backend = scanner._backend
     before = len(backend.seen_devices)
     details: dict[str, Any]
@@ -650,13 +1022,54 @@ async def restore_discoveries(scanner: BleakScanner, adapter: str) -> None:
         {
             path: (device, history.advertisement_data)
             for history in load_history_from_managed_objects(
-                properties, adapter
+                managed_objects, adapter
             ).values()
             if (device := history.device)
             and (details := device.details)
             and (path := details.get("path"))
         }
     )
+    return len(backend.seen_devices) - before
+
+
+async def restore_discoveries(scanner: BleakScanner, adapter: str) -> None:
+    """Restore discoveries from the bus."""
+    if not IS_LINUX:
+        # This is only supported on Linux
+        return
+    if not (properties := await _get_properties()):
+        _LOGGER.debug("Failed to restore discoveries for %s", adapter)
+        return
     _LOGGER.debug(
-        "Restored %s discoveries for %s", len(backend.seen_devices) - before, adapter
+        "Restored %s discoveries for %s",
+        _restore_history(scanner, properties, adapter),
+        adapter,
     )
+
+
+async def restore_discoveries_by_adapter(
+    scanners: Mapping[str, BleakScanner],
+) -> RestoreReport:
+    """Restore discoveries from the bus for the scanner of each adapter.
+
+    The managed objects are split by adapter in one pass instead of
+    every adapter walking the whole bus like restore_discoveries does.
+    """
+    report = RestoreReport()
+    if not IS_LINUX:
+        # This is only supported on Linux
+        return report
+    if not (properties := await _get_properties()):
+        _LOGGER.debug("Failed to restore discoveries for %s", list(scanners))
+        return report
+    start = time.monotonic()
+    partitions = partition_by_adapter(properties, scanners)
+    report.partition_seconds = time.monotonic() - start
+    for adapter, scanner in scanners.items():
+        start = time.monotonic()
+        report.restored[adapter] = _restore_history(
+            scanner, partitions[adapter], adapter
+        )
+        report.seconds[adapter] = time.monotonic() - start
+    _LOGGER.debug("Restored discoveries: %s", report)
+    return report
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+
+
+class ConnectionErrorCategory(Enum):
+    """Why a connection attempt failed."""
+
+    TIMEOUT = 1
+    DEVICE_MISSING = 2
+    OUT_OF_SLOTS = 3
+    ABORTED = 4
+    DISCONNECTED = 5
+    SERVICES_CHANGED = 6
+    BROKEN_PIPE = 7
+    EOF = 8
+    OTHER = 9
+
+
+@dataclass(slots=True)
+class ConnectionAttempt:
+    adapter: str | None  # Adapter/Controller (hciX) or proxy source
+    path: str | None  # D-Bus object path of the device
+    start: float  # time.monotonic() when the attempt started
+    duration: float = 0.0  # Seconds until connected or failed
+    category: ConnectionErrorCategory | None = None  # None if connected
+    backoff: float = 0.0  # Minimum seconds to back off after the failure
+    disconnect_wait: float = 0.0  # Seconds spent waiting for disconnect/backoff
@@ -2,32 +2,99 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import importlib
 import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING
 
-from .const import DBUS_CONNECT_TIMEOUT, IS_LINUX
+from .const import (
+    DBUS_CONNECT_TIMEOUT,
+    DBUS_REPROBE_INTERVAL,
+    DBUS_REPROBE_MAX_INTERVAL,
+    DBUS_REPROBE_MAX_TRIES,
+    IS_LINUX,
+)
+from .tracing import trace_span
 from .util import asyncio_timeout
 
 _LOGGER = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    from bleak.backends.bluezdbus.manager import BlueZManager
+
+# Imported from bleak on first use by _load_bluez_manager since the
+# BlueZ manager pulls in dbus-fast which is slow to import
 _global_instances: dict[asyncio.AbstractEventLoop, BlueZManager] | None = None
-if IS_LINUX:
-    with contextlib.suppress(ImportError):  # pragma: no cover
-        from bleak.backends.bluezdbus.manager import (  # pragma: no cover
-            BlueZManager,
-            get_global_bluez_manager,
-        )
+get_global_bluez_manager: Callable[[], Awaitable[BlueZManager]] | None = None
+
+# Imported by warm_up since they are otherwise imported on first use
+_WARM_UP_MODULES = (
+    "bleak.backends.bluezdbus.manager",
+    "dbus_fast.message",
+    "bluetooth_adapters",
+    "bleak_retry_connector.dbus",
+)
+
+_connect_task: asyncio.Task[BlueZManager | None] | None = None
+_reprobe_task: asyncio.Task[None] | None = None
+_manager_callbacks: set[Callable[[BlueZManager], None]] = set()
+
 
+def _load_bluez_manager() -> None:
+    """Import the BlueZ manager from bleak unless it was replaced."""
+    global _global_instances, get_global_bluez_manager
     with contextlib.suppress(ImportError):  # pragma: no cover
-        from bleak.backends.bluezdbus.manager import (  # type: ignore[no-redef] # pragma: no cover
-            _global_instances,
-        )
+        from bleak.backends.bluezdbus import manager  # pragma: no cover
+
+        if get_global_bluez_manager is None:
+            get_global_bluez_manager = manager.get_global_bluez_manager
+        if _global_instances is None:
+            _global_instances = getattr(manager, "_global_instances", None)
+
+
+def get_bluez_manager() -> BlueZManager | None:
+    """Return the BlueZ manager of the running loop if it is connected.
+
+    Unlike get_global_bluez_manager_with_timeout this never connects
+    and is not a coroutine, so hot paths can check it first and only
+    await get_global_bluez_manager_with_timeout when it returns None.
+    """
+    if (
+        IS_LINUX
+        and _global_instances
+        and (manager := _global_instances.get(asyncio.get_running_loop()))
+        # bleak registers the manager before it connects and only sets
+        # the bus once it has the managed objects
+        and manager._bus is not None
+    ):
+        return manager
+    return None
+
+
+def register_bluez_manager_callback(
+    callback: Callable[[BlueZManager], None],
+) -> Callable[[], None]:
+    """Register a callback for when D-Bus becomes available.
+
+    The callback is called with the manager when a background re-probe
+    connects after D-Bus or BlueZ was not available, for example when
+    bluetoothd starts after this process on boot.
+    """
+    _manager_callbacks.add(callback)
+    return partial(_manager_callbacks.discard, callback)
 
 
 async def get_global_bluez_manager_with_timeout() -> BlueZManager | None:
     """Get the properties."""
+    global _connect_task
     if not IS_LINUX:
         return None
 
+    if get_global_bluez_manager is None:
+        _load_bluez_manager()
     loop = asyncio.get_running_loop()
     if _global_instances and (manager := _global_instances.get(loop)):
         return manager
@@ -36,25 +103,45 @@ async def get_global_bluez_manager_with_timeout() -> BlueZManager | None:
         getattr(get_global_bluez_manager_with_timeout, "_has_dbus_socket", None)
         is False
     ):
-        # We are not running on a system with DBus do don't
-        # keep trying to call get_global_bluez_manager as it
-        # waits for a bit trying to connect to DBus.
+        # DBus was not available so do not wait for it again; it is
+        # re-probed in the background until it shows up
         return None
 
+    # Concurrent callers share one connect so they do not each wait
+    # for DBUS_CONNECT_TIMEOUT when D-Bus does not answer
+    if (
+        _connect_task is None
+        or _connect_task.done()
+        or _connect_task.get_loop() is not loop
+    ):
+        _connect_task = loop.create_task(_connect_bluez_manager())
+    # Shielded so a cancelled caller does not cancel the connect of the others
+    if (manager := await asyncio.shield(_connect_task)) is None and getattr(
+        get_global_bluez_manager_with_timeout, "_has_dbus_socket", None
+    ) is False:
+        _schedule_reprobe()
+    return manager
+
+
+async def _connect_bluez_manager() -> BlueZManager | None:
+    """Connect the BlueZ manager and remember if DBus is not available."""
+    if (connect := get_global_bluez_manager) is None:
+        # bleak's BlueZ backend could not be imported
+        return None
     try:
         async with asyncio_timeout(DBUS_CONNECT_TIMEOUT):
-            return await get_global_bluez_manager()
+            return await connect()
     except FileNotFoundError as ex:
         setattr(get_global_bluez_manager_with_timeout, "_has_dbus_socket", False)
         _LOGGER.debug(
-            "Dbus socket at %s not found, will not try again until next restart: %s",
+            "Dbus socket at %s not found, will retry in the background: %s",
             ex.filename,
             ex,
         )
     except asyncio.TimeoutError:
         setattr(get_global_bluez_manager_with_timeout, "_has_dbus_socket", False)
         _LOGGER.debug(
-            "Timed out trying to connect to DBus; will not try again until next restart"
+            "Timed out trying to connect to DBus; will retry in the background"
         )
     except Exception as ex:  # pylint: disable=broad-except
         _LOGGER.debug(
@@ -64,6 +151,104 @@ async def get_global_bluez_manager_with_timeout() -> BlueZManager | None:
     return None
 
 
+def _schedule_reprobe() -> None:
+    """Start re-probing DBus in the background unless it already is."""
+    global _reprobe_task
+    if _reprobe_task is None or _reprobe_task.done():
+        _reprobe_task = asyncio.create_task(_reprobe())
+
+
+async def _reprobe() -> None:
+    """Probe DBus with exponential backoff until the manager connects.
+
+    Gives up after DBUS_REPROBE_MAX_TRIES probes so a host without a
+    system bus is not probed forever; the next caller of
+    get_global_bluez_manager_with_timeout probes again.
+    """
+    interval = DBUS_REPROBE_INTERVAL
+    for _ in range(DBUS_REPROBE_MAX_TRIES):
+        await asyncio.sleep(interval)
+        if (manager := await _connect_bluez_manager()) is not None:
+            break
+        interval = min(interval * 2, DBUS_REPROBE_MAX_INTERVAL)
+        _LOGGER.debug("DBus is still not available, retrying in %s seconds", interval)
+    else:
+        setattr(get_global_bluez_manager_with_timeout, "_has_dbus_socket", None)
+        _LOGGER.debug(
+            "DBus is still not available after %s probes, giving up until needed",
+            DBUS_REPROBE_MAX_TRIES,
+        )
+        return
+    setattr(get_global_bluez_manager_with_timeout, "_has_dbus_socket", None)
+    _LOGGER.debug("DBus is available again")
+    for callback in list(_manager_callbacks):
+        try:
+            callback(manager)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in callback")
+
+
 def _reset_dbus_socket_cache() -> None:
     """Reset the dbus socket cache."""
+    global _connect_task, _reprobe_task
     setattr(get_global_bluez_manager_with_timeout, "_has_dbus_socket", None)
+    for task in (_connect_task, _reprobe_task):
+        if task is not None and not task.get_loop().is_closed():
+            task.cancel()
+    _connect_task = _reprobe_task = None
+
+
+@dataclass(slots=True)
+class WarmUpReport:
+    manager: bool = False  # Whether the BlueZ manager is connected
+    adapters: int = 0  # Adapters on the bus
+    devices: int = 0  # Devices on the bus
+    phases: dict[str, float] = field(default_factory=dict)  # Seconds per phase
+
+
+async def warm_up() -> WarmUpReport:
+    """Connect to BlueZ and load what the first connection attempt needs.
+
+    Run it concurrently with the rest of startup so the first
+    establish_connection does not pay for importing dbus-fast, connecting
+    to D-Bus and fetching the managed objects of the whole bus. The
+    report has the time each phase took.
+    """
+    report = WarmUpReport()
+    if not IS_LINUX:
+        return report
+    loop = asyncio.get_running_loop()
+    with trace_span("warm_up"):
+        start = time.monotonic()
+        for module in _WARM_UP_MODULES:
+            with contextlib.suppress(ImportError):
+                # Imports read from disk so keep them off the loop
+                await loop.run_in_executor(None, importlib.import_module, module)
+        report.phases["imports"] = time.monotonic() - start
+
+        start = time.monotonic()
+        manager = await get_global_bluez_manager_with_timeout()
+        report.phases["manager"] = time.monotonic() - start
+        if manager is None:
+            return report
+        report.manager = True
+
+        from bleak.backends.bluezdbus import (  # pylint: disable=import-outside-toplevel
+            defs,
+        )
+
+        start = time.monotonic()
+        for interfaces in manager._properties.values():
+            if defs.DEVICE_INTERFACE in interfaces:
+                report.devices += 1
+            elif defs.ADAPTER_INTERFACE in interfaces:
+                report.adapters += 1
+        report.phases["properties"] = time.monotonic() - start
+
+    _LOGGER.debug(
+        "Warmed up with %s adapters and %s devices: %s",
+        report.adapters,
+        report.devices,
+        report.phases,
+    )
+    return report
@@ -4,28 +4,49 @@ import asyncio
 import contextlib
 import logging
 import time
-from collections.abc import Callable, Generator
+import weakref
+from collections.abc import Callable, Generator, Iterable, Mapping
 from dataclasses import dataclass
 from enum import Enum
 from functools import partial
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from bleak import BleakGATTServiceCollection
 from bleak.backends.device import BLEDevice
 from bleak.exc import BleakError
 
-from .bleak_manager import get_global_bluez_manager_with_timeout
+from .attempts import ConnectionErrorCategory
+from .bleak_manager import get_bluez_manager, get_global_bluez_manager_with_timeout
+from .capacity import SlotCapacityLearner
 from .const import (
+    ABSENT_DEVICE_MAX_AGE,
+    ADVERTISEMENT_PROPERTIES,
+    ALLOCATION_EVENTS_QUEUE_SIZE,
     DISCONNECT_TIMEOUT,
     IS_LINUX,
     NO_RSSI_VALUE,
     REAPPEAR_WAIT_INTERVAL,
     RSSI_SWITCH_THRESHOLD,
 )
+from .health import AdapterHealthTracker, get_adapter_health_tracker
+from .metrics import (
+    DISCONNECT_WAIT_SECONDS,
+    REAPPEAR_WAIT_SECONDS,
+    SLOTS_ALLOCATED,
+    SLOTS_TOTAL,
+)
+from .recorder import get_flight_recorder
+from .tracing import trace_span
 from .util import asyncio_timeout
 
-if IS_LINUX:
-    from dbus_fast.message import Message
+if TYPE_CHECKING:
+    # Importing the BlueZ manager pulls in dbus-fast which is slow to
+    # import, so it is only imported for typing here and by
+    # bleak_manager on first use
+    from bleak.backends.bluezdbus.manager import (
+        BlueZManager,
+        DeviceConditionCallback,
+    )
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,10 +54,7 @@ _LOGGER = logging.getLogger(__name__)
 if IS_LINUX:
     with contextlib.suppress(ImportError):  # pragma: no cover
         from bleak.backends.bluezdbus import defs  # pragma: no cover
-        from bleak.backends.bluezdbus.manager import (  # pragma: no cover
-            BlueZManager,
-            DeviceWatcher,
-        )
+        from bleak.backends.bluezdbus.defs import Device1  # pragma: no cover
 
 
 class AllocationChange(Enum):
@@ -46,7 +64,7 @@ class AllocationChange(Enum):
     RELEASED = 2
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class AllocationChangeEvent:
     change: AllocationChange
     path: str | None  # D-Bus object path of the device
@@ -54,12 +72,14 @@ class AllocationChangeEvent:
     address: str  # Address of the remote BLE device
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class Allocations:
     adapter: str  # Adapter/Controller (hciX)
     slots: int  # Number of slots
-    free: int  # Number of free slots
-    allocated: list[str]  # Addresses of connected devices
+    free: int  # Number of free slots, never below 0
+    allocated: tuple[str, ...]  # Addresses of connected devices
+    pending: int = 0  # Slots reserved for connects that are not connected yet
+    established: int = 0  # Slots of connected devices or held without a ttl
 
 
 def device_source(device: BLEDevice) -> str | None:
@@ -91,46 +111,193 @@ def path_from_ble_device(device: BLEDevice) -> str | None:
     return _device_details_value_or_none(device, "path")
 
 
-def _on_characteristic_value_changed(*args: Any, **kwargs: Any) -> None:
-    """Dummy callback for registering characteristic value changed."""
+class _CoalescedAllocationCallback:
+    """Batch allocation changes and pass them on once per window."""
+
+    __slots__ = ("_callback", "_handle", "_loop", "_pending", "_window")
+
+    def __init__(
+        self,
+        callback: Callable[[list[AllocationChangeEvent]], None],
+        window: float,
+    ) -> None:
+        """Init the callback."""
+        self._callback = callback
+        self._window = window
+        self._loop = asyncio.get_running_loop()
+        self._pending: list[AllocationChangeEvent] = []
+        self._handle: asyncio.TimerHandle | None = None
+
+    def __call__(self, event: AllocationChangeEvent) -> None:
+        self._pending.append(event)
+        if self._handle is None:
+            self._handle = self._loop.call_later(self._window, self._flush)
+
+    def _flush(self) -> None:
+        self._handle = None
+        events, self._pending = self._pending, []
+        try:
+            self._callback(events)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in coalesced allocation callback")
+
+    def cancel(self) -> None:
+        """Drop the pending changes."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._pending.clear()
+
+
+def _enqueue_allocation_change(
+    queue: asyncio.Queue[AllocationChangeEvent | None], event: AllocationChangeEvent
+) -> None:
+    """Queue a change for an iterator, dropping the oldest when it is full."""
+    if queue.full():
+        queue.get_nowait()
+        _LOGGER.debug("Dropped allocation change for a slow consumer")
+    queue.put_nowait(event)
+
+
+class _AllocationEvents:
+    """Iterate over the allocation changes queued since it was created.
+
+    The callback only holds the queue so an iterator that is dropped
+    without being closed is unregistered when it is garbage collected.
+    """
+
+    __slots__ = ("_queue", "_unregister", "__weakref__")
+
+    def __init__(self, slot_manager: BleakSlotManager, maxsize: int) -> None:
+        """Register for the changes."""
+        # None wakes a consumer waiting when the iterator is closed
+        self._queue: asyncio.Queue[AllocationChangeEvent | None] = asyncio.Queue(
+            maxsize
+        )
+        self._unregister = weakref.finalize(
+            self,
+            slot_manager.register_allocation_callback(
+                partial(_enqueue_allocation_change, self._queue)
+            ),
+        )
+
+    def __aiter__(self) -> _AllocationEvents:
+        return self
+
+    async def __anext__(self) -> AllocationChangeEvent:
+        if not self._unregister.alive or (event := await self._queue.get()) is None:
+            raise StopAsyncIteration
+        return event
+
+    async def aclose(self) -> None:
+        """Stop queueing changes and end a pending iteration."""
+        self._unregister()
+        if self._queue.empty():
+            self._queue.put_nowait(None)
 
 
 class BleakSlotManager:
     """A class to manage the connection slots."""
 
-    def __init__(self) -> None:
-        """Initialize the class."""
+    def __init__(
+        self,
+        learn_slots: bool = False,
+        learned_slots: Mapping[str, int] | None = None,
+        adapter_health: AdapterHealthTracker | None = None,
+    ) -> None:
+        """Initialize the class.
+
+        With learn_slots the number of slots of each adapter is learned
+        from the connects reported by establish_connection, starting from
+        learned_slots of a previous run if there are any.
+
+        The diagnostics report adapter_health, the tracker passed to
+        establish_connection, instead of the shared tracker if it is given.
+        """
+        self._adapter_health = adapter_health
         self._adapter_slots: dict[str, int] = {}
-        self._allocations_by_adapter: dict[str, dict[str, DeviceWatcher]] = {}
+        self._capacity = SlotCapacityLearner(learned_slots) if learn_slots else None
+        # The Connected condition watching each allocated path by adapter
+        self._allocations_by_adapter: dict[str, dict[str, DeviceConditionCallback]] = {}
         self._manager: BlueZManager | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
         self._callbacks: set[Callable[[AllocationChangeEvent], None]] = set()
+        # Adapter of every allocated path by address
+        self._adapters_by_address: dict[str, dict[str, str]] = {}
+        # Allocations of each registered adapter since its last change
+        self._allocations_snapshots: dict[str, Allocations] = {}
+        # Expiry of the slots reserved for devices that are not connected yet
+        self._reservations: dict[str, asyncio.TimerHandle] = {}
+        # The Connected condition registered with BlueZ for each watched path
+        self._conditions: dict[str, DeviceConditionCallback] = {}
 
     async def async_setup(self) -> None:
         """Set up the class."""
+        self._loop = asyncio.get_running_loop()
         self._manager = await get_global_bluez_manager_with_timeout()
 
     def diagnostics(self) -> dict[str, Any]:
         """Return diagnostics."""
-        return {
+        diagnostics = {
             "manager": self._manager is not None,
             "adapter_slots": self._adapter_slots,
             "allocations_by_adapter": {
                 adapter: self._get_allocations(adapter)
                 for adapter in self._adapter_slots
             },
+            "adapter_health": (
+                self._adapter_health or get_adapter_health_tracker()
+            ).diagnostics(),
+            "flight_recorder": get_flight_recorder().diagnostics(),
         }
+        if self._capacity is not None:
+            diagnostics["slot_capacity"] = self._capacity.diagnostics()
+        return diagnostics
+
+    def learned_slots(self) -> dict[str, int]:
+        """Return the learned number of slots to start the next run with."""
+        return {} if self._capacity is None else self._capacity.learned()
+
+    def _slots(self, adapter: str) -> int:
+        """Return the number of slots of a registered adapter."""
+        slots = self._adapter_slots[adapter]
+        if self._capacity is None:
+            return slots
+        return self._capacity.capacity(adapter, slots)
 
     def get_allocations(self, adapter: str) -> Allocations:
-        """Get the allocations."""
-        slots = self._adapter_slots.get(adapter, 0)
-        allocated: list[str] = []
+        """Get the allocations.
+
+        The result is an immutable snapshot shared by every caller until
+        a slot of the adapter is allocated or released.
+        """
+        if allocations := self._allocations_snapshots.get(adapter):
+            return allocations
+        slots = self._slots(adapter) if adapter in self._adapter_slots else 0
+        allocated: tuple[str, ...] = ()
+        pending = 0
         if adapter in self._allocations_by_adapter:
-            allocated = [
-                address_from_path(path)
-                for path in self._allocations_by_adapter[adapter]
-            ]
-        free = slots - len(allocated)
-        return Allocations(adapter, slots, free, allocated)
+            paths = self._allocations_by_adapter[adapter]
+            allocated = tuple(address_from_path(path) for path in paths)
+            pending = sum(1 for path in paths if path in self._reservations)
+        # The probed slot of learn_slots is allocated beyond the slots
+        free = max(slots - len(allocated), 0)
+        allocations = Allocations(
+            adapter, slots, free, allocated, pending, len(allocated) - pending
+        )
+        if adapter in self._adapter_slots:
+            self._allocations_snapshots[adapter] = allocations
+        return allocations
+
+    def is_allocated(self, address: str) -> bool:
+        """Return if a device holds a slot on any adapter."""
+        return address.upper() in self._adapters_by_address
+
+    def adapter_for(self, address: str) -> str | None:
+        """Return the adapter a device holds a slot on."""
+        if adapters := self._adapters_by_address.get(address.upper()):
+            return next(iter(adapters.values()))
+        return None
 
     def _get_allocations(self, adapter: str) -> list[str]:
         """Get connected path allocations."""
@@ -141,11 +308,16 @@ class BleakSlotManager:
     def remove_adapter(self, adapter: str) -> None:
         """Remove an adapter."""
         del self._adapter_slots[adapter]
+        self._allocations_snapshots.pop(adapter, None)
+        SLOTS_TOTAL.remove(adapter)
+        SLOTS_ALLOCATED.remove(adapter)
         watchers = self._allocations_by_adapter[adapter]
         if self._manager is None:
             return
-        for watcher in watchers.values():
-            self._manager.remove_device_watcher(watcher)
+        for path in watchers:
+            self._unwatch_slot(path)
+            self._unindex(path, address_from_path(path))
+            self._cancel_reservation(path)
         del self._allocations_by_adapter[adapter]
 
     def register_allocation_callback(
@@ -161,36 +333,81 @@ class BleakSlotManager:
         """Unregister a callback."""
         self._callbacks.discard(callback)
 
+    def register_coalesced_allocation_callback(
+        self,
+        callback: Callable[[list[AllocationChangeEvent]], None],
+        window: float,
+    ) -> Callable[[], None]:
+        """Register a callback for batches of allocation changes.
+
+        The callback gets every change of a window of seconds at once, so
+        a mass disconnect calls it once instead of once per device. Must
+        be called from the event loop; changes still pending when it is
+        unregistered are dropped.
+        """
+        coalesced = _CoalescedAllocationCallback(callback, window)
+        self._callbacks.add(coalesced)
+
+        def _unregister() -> None:
+            self._callbacks.discard(coalesced)
+            coalesced.cancel()
+
+        return _unregister
+
+    def events(self, maxsize: int = ALLOCATION_EVENTS_QUEUE_SIZE) -> _AllocationEvents:
+        """Iterate over the allocation changes from this call on.
+
+        Changes are queued so a slow consumer never holds up the D-Bus
+        dispatch; when more than maxsize are waiting the oldest are
+        dropped. Call aclose on the iterator to stop queueing.
+        """
+        return _AllocationEvents(self, maxsize)
+
     def register_adapter(self, adapter: str, slots: int) -> None:
         """Register an adapter."""
-        self._allocations_by_adapter[adapter] = {}
-        self._adapter_slots[adapter] = slots
+        self.register_adapters({adapter: slots})
+
+    def register_adapters(self, adapter_slots: Mapping[str, int]) -> None:
+        """Register adapters with their number of slots.
+
+        The devices already connected on any of the adapters are found in
+        a single pass over the BlueZ properties, so registering every
+        adapter at once costs the same as registering one.
+        """
+        for adapter, slots in adapter_slots.items():
+            self._allocations_by_adapter[adapter] = {}
+            self._adapter_slots[adapter] = slots
+            self._allocations_snapshots.pop(adapter, None)
+            SLOTS_TOTAL.labels(adapter).set(self._slots(adapter))
+            SLOTS_ALLOCATED.labels(adapter).set(0)
         if self._manager is None:
             return
         for path, device in self._manager._properties.items():
             if (
-                defs.DEVICE_INTERFACE in device
-                and device[defs.DEVICE_INTERFACE].get("Connected")
-                and adapter_from_path(path) == adapter
+                (props := device.get(defs.DEVICE_INTERFACE))
+                and props.get("Connected")
+                and adapter_from_path(path) in adapter_slots
             ):
                 self._allocate_and_watch_slot(path)
 
-    def _allocate_and_watch_slot(self, path: str) -> None:
-        """Setup a device watcher."""
-        assert self._manager is not None  # nosec
+    def _allocate_and_watch_slot(self, path: str, ttl: float | None = None) -> None:
+        """Allocate a slot and watch the Connected property of the path.
+
+        A condition callback is only called for changes of the Device1
+        properties of its path, unlike a DeviceWatcher which is also
+        called for every characteristic notification of the device.
+        With a ttl the slot is only reserved until the device connects.
+        """
         adapter = adapter_from_path(path)
+        address = address_from_path(path)
         allocations = self._allocations_by_adapter[adapter]
-
-        def _on_device_connected_changed(connected: bool) -> None:
-            if not connected:
-                self._release_slot(path)
-
-        allocations[path] = self._manager.add_device_watcher(
-            path,
-            on_connected_changed=_on_device_connected_changed,
-            on_characteristic_value_changed=_on_characteristic_value_changed,
-        )
-        self._call_callbacks(AllocationChange.ALLOCATED, path)
+        allocations[path] = self._watch_slot(path)
+        if ttl is not None:
+            self._reserve(path, ttl)
+        self._adapters_by_address.setdefault(address, {})[path] = adapter
+        self._allocations_snapshots.pop(adapter, None)
+        SLOTS_ALLOCATED.labels(adapter).set(len(allocations))
+        self._call_callbacks(AllocationChange.ALLOCATED, path, adapter, address)
 
     def release_slot(self, device: BLEDevice) -> None:
         """Release a slot."""
@@ -213,24 +430,126 @@ class BleakSlotManager:
             )
             return
         allocations = self._allocations_by_adapter[adapter]
-        if watcher := allocations.pop(path, None):
-            self._manager.remove_device_watcher(watcher)
-        self._call_callbacks(AllocationChange.RELEASED, path)
+        address = address_from_path(path)
+        if allocations.pop(path, None) is not None:
+            self._unwatch_slot(path)
+            self._unindex(path, address)
+            self._cancel_reservation(path)
+            self._allocations_snapshots.pop(adapter, None)
+        SLOTS_ALLOCATED.labels(adapter).set(len(allocations))
+        self._call_callbacks(AllocationChange.RELEASED, path, adapter, address)
+
+    def _reserve(self, path: str, ttl: float) -> None:
+        """Reserve the slot of a path until it connects or the ttl passes."""
+        assert self._loop is not None  # nosec
+        self._cancel_reservation(path)
+        self._reservations[path] = self._loop.call_later(
+            ttl, self._expire_reservation, path
+        )
 
-    def _call_callbacks(self, change: AllocationChange, path: str) -> None:
+    def _cancel_reservation(self, path: str) -> bool:
+        """Cancel the reservation of a path and return if there was one."""
+        if handle := self._reservations.pop(path, None):
+            handle.cancel()
+            return True
+        return False
+
+    def _expire_reservation(self, path: str) -> None:
+        """Release a reserved slot the device never connected with."""
+        assert self._manager is not None  # nosec
+        del self._reservations[path]
+        adapter = adapter_from_path(path)
+        if self._manager.is_connected(path):
+            # Connected without us seeing it, e.g. while the slot was
+            # being reserved
+            self._allocations_snapshots.pop(adapter, None)
+            return
+        _LOGGER.debug("Slot reservation for %s expired", path)
+        get_flight_recorder().record(address_from_path(path), "slot_expired", adapter)
+        self._release_slot(path)
+
+    def _watch_slot(self, path: str) -> DeviceConditionCallback:
+        """Return the condition watching the Connected property of a path.
+
+        BlueZManager iterates the conditions of a path while it calls
+        them, so a path that is allocated again from an allocation
+        callback keeps the condition it still has instead of adding one.
+        """
+        from bleak.backends.bluezdbus.manager import (  # pylint: disable=import-outside-toplevel
+            DeviceConditionCallback,
+        )
+
+        assert self._manager is not None  # nosec
+        if condition := self._conditions.get(path):
+            return condition
+        condition = self._conditions[path] = DeviceConditionCallback(
+            partial(self._on_connected_changed, path), "Connected"
+        )
+        self._manager._condition_callbacks.setdefault(path, set()).add(condition)
+        return condition
+
+    def _on_connected_changed(self, path: str, connected: Any | None) -> None:
+        """Release or confirm the slot of a path when Connected changes."""
+        adapter = adapter_from_path(path)
+        if path not in self._allocations_by_adapter.get(adapter, ()):
+            # Released and not allocated again before the condition is removed
+            return
+        if not connected:
+            self._release_slot(path)
+        elif self._cancel_reservation(path):
+            self._allocations_snapshots.pop(adapter, None)
+
+    def _unwatch_slot(self, path: str) -> None:
+        """Stop watching a released path.
+
+        BlueZManager iterates the conditions of a path while it calls
+        them, so the condition is removed once that is done.
+        """
+        assert self._loop is not None  # nosec
+        self._loop.call_soon(self._remove_condition, path)
+
+    def _remove_condition(self, path: str) -> None:
+        """Remove the condition of a path unless it was allocated again."""
+        assert self._manager is not None  # nosec
+        if path in self._allocations_by_adapter.get(adapter_from_path(path), ()):
+            return
+        if (condition := self._conditions.pop(path, None)) is None:
+            return
+        conditions = self._manager._condition_callbacks
+        if (callbacks := conditions.get(path)) is not None:
+            callbacks.discard(condition)
+            if not callbacks:
+                del conditions[path]
+
+    def _unindex(self, path: str, address: str) -> None:
+        """Remove a released path from the address index."""
+        if (adapters := self._adapters_by_address.get(address)) is not None:
+            adapters.pop(path, None)
+            if not adapters:
+                del self._adapters_by_address[address]
+
+    def _call_callbacks(
+        self, change: AllocationChange, path: str, adapter: str, address: str
+    ) -> None:
         """Call the callbacks."""
+        get_flight_recorder().record(address, f"slot_{change.name.lower()}", adapter)
+        event = AllocationChangeEvent(change, path, adapter, address)
         for callback_ in self._callbacks:
             try:
-                callback_(
-                    AllocationChangeEvent(
-                        change, path, adapter_from_path(path), address_from_path(path)
-                    )
-                )
+                callback_(event)
             except Exception:  # pylint
                 _LOGGER.exception("Error in callback")
 
-    def allocate_slot(self, device: BLEDevice) -> bool:
-        """Allocate a slot."""
+    def allocate_slot(self, device: BLEDevice, ttl: float | None = None) -> bool:
+        """Allocate a slot.
+
+        With a ttl the slot is only reserved until the device connects;
+        if it has not connected within ttl seconds the slot is released
+        again, so a failed connect does not hold it until release_slot is
+        called. The ttl should cover every attempt of the connect, and
+        allocating a reserved slot again restarts it. Without a ttl the
+        slot is held until it is released.
+        """
         if (
             self._manager is None
             or not (path := path_from_ble_device(device))
@@ -240,29 +559,116 @@ class BleakSlotManager:
             return True
         allocations = self._allocations_by_adapter[adapter]
         if path in allocations:
-            # Already connected
+            # Already connected or reserved
+            if path in self._reservations:
+                if ttl is None:
+                    self._cancel_reservation(path)
+                    self._allocations_snapshots.pop(adapter, None)
+                else:
+                    self._reserve(path, ttl)
             return True
-        if len(allocations) >= self._adapter_slots[adapter]:
+        slots = self._adapter_slots[adapter]
+        if self._capacity is not None:
+            slots = self._capacity.limit(adapter, slots)
+        if len(allocations) >= slots:
             _LOGGER.debug(
                 "No slots available for %s (used by: %s)",
                 path,
                 self._get_allocations(adapter),
             )
+            get_flight_recorder().record(
+                address_from_path(path), "no_slot", adapter, f"{len(allocations)} used"
+            )
             return False
-        self._allocate_and_watch_slot(path)
+        self._allocate_and_watch_slot(
+            path, None if self._manager.is_connected(path) else ttl
+        )
         return True
 
+    def record_connect_success(self, device: BLEDevice) -> None:
+        """Record that a connect to a device succeeded to learn the slots."""
+        if (learned := self._learning_adapter(device)) is None:
+            return
+        adapter, path = learned
+        assert self._capacity is not None  # nosec
+        if self._capacity.record_connected(
+            adapter,
+            self._adapter_slots[adapter],
+            self._connected_count(adapter, path) + 1,
+        ):
+            self._capacity_changed(adapter)
+
+    def record_connect_failure(
+        self, device: BLEDevice, category: ConnectionErrorCategory
+    ) -> None:
+        """Record that a connect to a device failed to learn the slots.
+
+        Out of slots errors mean the adapter is full. BlueZ also reports
+        a device that cannot be connected to because the adapter is full
+        as not found, so that counts only when it happens while probing
+        for a slot beyond the current capacity, and only alongside an out
+        of slots error since the device may simply be gone.
+        """
+        if (learned := self._learning_adapter(device)) is None:
+            return
+        adapter, path = learned
+        assert self._capacity is not None  # nosec
+        slots = self._adapter_slots[adapter]
+        connected = self._connected_count(adapter, path)
+        if (
+            category is ConnectionErrorCategory.OUT_OF_SLOTS
+            or (
+                category is ConnectionErrorCategory.DEVICE_MISSING
+                and connected >= self._capacity.capacity(adapter, slots)
+            )
+        ) and self._capacity.record_full(
+            adapter,
+            slots,
+            connected,
+            category is ConnectionErrorCategory.OUT_OF_SLOTS,
+        ):
+            self._capacity_changed(adapter)
+
+    def _learning_adapter(self, device: BLEDevice) -> tuple[str, str] | None:
+        """Return the adapter and path of a device if its slots are learned."""
+        if (
+            self._capacity is None
+            or not (path := path_from_ble_device(device))
+            or (adapter := adapter_from_path(path)) not in self._adapter_slots
+        ):
+            return None
+        return adapter, path
+
+    def _connected_count(self, adapter: str, path: str) -> int:
+        """Return the connected devices on an adapter other than a path."""
+        return sum(
+            1
+            for allocated_path in self._allocations_by_adapter[adapter]
+            if allocated_path != path and allocated_path not in self._reservations
+        )
+
+    def _capacity_changed(self, adapter: str) -> None:
+        """Update what depends on the number of slots of an adapter."""
+        slots = self._slots(adapter)
+        _LOGGER.debug("Learned %s slots for %s", slots, adapter)
+        SLOTS_TOTAL.labels(adapter).set(slots)
+        self._allocations_snapshots.pop(adapter, None)
+
 
 async def _get_properties() -> dict[str, dict[str, dict[str, Any]]] | None:
     """Get the properties."""
-    if bluez_manager := await get_global_bluez_manager_with_timeout():
+    if bluez_manager := get_bluez_manager() or (
+        await get_global_bluez_manager_with_timeout()
+    ):
         return bluez_manager._properties  # pylint: disable=protected-access
     return None
 
 
 async def _get_services_cache() -> dict[str, BleakGATTServiceCollection] | None:
     """Get the services cache."""
-    if bluez_manager := await get_global_bluez_manager_with_timeout():
+    if bluez_manager := get_bluez_manager() or (
+        await get_global_bluez_manager_with_timeout()
+    ):
         return bluez_manager._services_cache  # pylint: disable=protected-access
     return None
 
@@ -271,6 +677,12 @@ async def clear_cache(address: str) -> bool:
     """Clear the cache for a device."""
     if not IS_LINUX:
         return False
+    with trace_span("clear_cache", address=address):
+        return await _clear_cache(address)
+
+
+async def _clear_cache(address: str) -> bool:
+    """Clear the cache for a device on BlueZ."""
     caches_cleared: list[str] = []
     with contextlib.suppress(Exception):
         if not await get_device(address):
@@ -288,6 +700,8 @@ async def clear_cache(address: str) -> bool:
             if services_cache.pop(path, None):
                 caches_cleared.append(path)
         _LOGGER.debug("Cleared cache for %s: %s", address, caches_cleared)
+        from dbus_fast.message import Message  # pylint: disable=import-outside-toplevel
+
         async with asyncio_timeout(DISCONNECT_TIMEOUT):
             for device_path in caches_cleared:
                 # Send since we are going to ignore errors
@@ -311,6 +725,8 @@ async def stop_discovery(adapter_name: str) -> None:
     :param adapter_name: The adapter name (hciX).
     """
     if manager := await get_global_bluez_manager_with_timeout():
+        from dbus_fast.message import Message  # pylint: disable=import-outside-toplevel
+
         adapter_path = f"/org/bluez/{adapter_name}"
         await manager._bus.send(
             Message(
@@ -340,17 +756,173 @@ def adapter_path_from_device_path(device_path: str) -> str:
     return device_path[:15]
 
 
+def _advertisement_key(props: Device1 | dict[str, Any]) -> tuple[Any, ...]:
+    """Return the properties that only change when the device advertises."""
+    return tuple(props.get(name) for name in ADVERTISEMENT_PROPERTIES)
+
+
+class _AdvertisementDispatcher:
+    """Dispatch advertisements from a BlueZ manager to waiters.
+
+    A single callback is registered per adapter no matter how many
+    devices are being waited on so each advertisement only costs
+    one dict lookup.
+
+    BlueZManager runs the callbacks on every Device1 PropertiesChanged,
+    so waiters are only resolved when one of ADVERTISEMENT_PROPERTIES
+    changed and not for changes like Connected.
+    """
+
+    __slots__ = ("_manager", "_waiters", "_adapter_paths", "_advertised")
+
+    def __init__(self, manager: BlueZManager) -> None:
+        """Initialize the dispatcher."""
+        self._manager = manager
+        self._waiters: dict[str, set[asyncio.Future[BLEDevice]]] = {}
+        self._adapter_paths: set[str] = set()
+        # The advertisement properties last seen for each waited on path
+        self._advertised: dict[str, tuple[Any, ...]] = {}
+
+    def _on_advertisement(self, path: str, props: Device1) -> None:
+        """Resolve any waiters for the device path."""
+        if not (waiters := self._waiters.get(path)):
+            return
+        if (key := _advertisement_key(props)) == self._advertised.get(path):
+            return
+        self._advertised[path] = key
+        device = ble_device_from_properties(path, props)
+        for future in waiters:
+            if not future.done():
+                future.set_result(device)
+
+    def add_waiter(
+        self, paths: Iterable[str], future: asyncio.Future[BLEDevice]
+    ) -> None:
+        """Add a waiter for any of the paths."""
+        callbacks = self._manager._advertisement_callbacks
+        properties = self._manager._properties
+        for path in paths:
+            if path not in self._waiters:
+                self._advertised[path] = _advertisement_key(
+                    properties.get(path, {}).get(defs.DEVICE_INTERFACE, {})
+                )
+            self._waiters.setdefault(path, set()).add(future)
+            adapter_path = adapter_path_from_device_path(path)
+            if adapter_path not in self._adapter_paths:
+                self._adapter_paths.add(adapter_path)
+                callbacks[adapter_path].append(self._on_advertisement)
+
+    def remove_waiter(
+        self, paths: Iterable[str], future: asyncio.Future[BLEDevice]
+    ) -> None:
+        """Remove a waiter."""
+        for path in paths:
+            waiters = self._waiters[path]
+            waiters.discard(future)
+            if not waiters:
+                del self._waiters[path]
+                del self._advertised[path]
+        if self._waiters:
+            return
+        callbacks = self._manager._advertisement_callbacks
+        for adapter_path in self._adapter_paths:
+            with contextlib.suppress(ValueError):
+                callbacks[adapter_path].remove(self._on_advertisement)
+        self._adapter_paths.clear()
+
+
+_advertisement_dispatchers: weakref.WeakKeyDictionary[
+    BlueZManager, _AdvertisementDispatcher
+] = weakref.WeakKeyDictionary()
+
+
+async def wait_for_advertisement(address: str, timeout: float) -> BLEDevice | None:
+    """Wait for the next advertisement from a device on any adapter.
+
+    Returns the BLEDevice for the adapter that saw the advertisement
+    or None if the device did not advertise before the timeout.
+    """
+    if not IS_LINUX or not (manager := await get_global_bluez_manager_with_timeout()):
+        return None
+    if not (dispatcher := _advertisement_dispatchers.get(manager)):
+        dispatcher = _advertisement_dispatchers[manager] = _AdvertisementDispatcher(
+            manager
+        )
+    paths = tuple(_get_possible_paths(address_to_bluez_path(address)))
+    future: asyncio.Future[BLEDevice] = asyncio.get_running_loop().create_future()
+    dispatcher.add_waiter(paths, future)
+    try:
+        async with asyncio_timeout(timeout):
+            return await future
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        dispatcher.remove_waiter(paths, future)
+
+
+async def device_is_absent(
+    device: BLEDevice,
+    last_seen: float | None = None,
+    max_age: float = ABSENT_DEVICE_MAX_AGE,
+) -> bool:
+    """Check if a device is clearly absent.
+
+    A device is absent when the caller supplied last_seen time.monotonic()
+    timestamp is older than max_age and, for BlueZ devices, no adapter is
+    connected to it or reports an RSSI for it.
+
+    When there is not enough information to decide the device is
+    assumed to be present.
+    """
+    if last_seen is None or time.monotonic() - last_seen < max_age:
+        return False
+    if (
+        not IS_LINUX
+        or not path_from_ble_device(device)
+        or not (
+            manager := get_bluez_manager()
+            or await get_global_bluez_manager_with_timeout()
+        )
+    ):
+        return True
+    properties = manager._properties  # pylint: disable=protected-access
+    for path in _get_possible_paths(address_to_bluez_path(device.address)):
+        if path in properties and (
+            device_props := properties[path].get(defs.DEVICE_INTERFACE)
+        ):
+            if device_props.get("Connected") or "RSSI" in device_props:
+                return False
+    return True
+
+
 async def wait_for_device_to_reappear(device: BLEDevice, wait_timeout: float) -> bool:
     """Wait for a device to reappear on the bus."""
+    start = time.monotonic()
+    with trace_span(
+        "wait_for_device_to_reappear", address=device.address, timeout=wait_timeout
+    ):
+        reappeared = await _wait_for_device_to_reappear(device, wait_timeout)
+    REAPPEAR_WAIT_SECONDS.labels("true" if reappeared else "false").observe(
+        time.monotonic() - start
+    )
+    return reappeared
+
+
+async def _wait_for_device_to_reappear(device: BLEDevice, wait_timeout: float) -> bool:
+    """Wait for a device to reappear on the bus or until the timeout."""
     await asyncio.sleep(0)
     if (
         not IS_LINUX
         or not isinstance(device.details, dict)
         or "path" not in device.details
-        or not (properties := await _get_properties())
+        or not (
+            manager := get_bluez_manager()
+            or await get_global_bluez_manager_with_timeout()
+        )
     ):
         await asyncio.sleep(wait_timeout)
         return False
+    properties = manager._properties  # pylint: disable=protected-access
 
     debug = _LOGGER.isEnabledFor(logging.DEBUG)
     device_path = address_to_bluez_path(device.address)
@@ -402,19 +974,33 @@ async def wait_for_disconnect(device: BLEDevice, min_wait_time: float) -> None:
         await asyncio.sleep(min_wait_time)
         return
     device_path = device.details["path"]
-    start = time.monotonic() if min_wait_time else 0
+    start = time.monotonic()
     try:
-        if not (manager := await get_global_bluez_manager_with_timeout()):
+        if not (
+            manager := get_bluez_manager()
+            or await get_global_bluez_manager_with_timeout()
+        ):
             _LOGGER.debug(
                 "%s - %s: Failed to wait for disconnect because no manager",
                 device.name,
                 device.address,
             )
             return
-        async with asyncio_timeout(DISCONNECT_TIMEOUT):
-            await manager._wait_condition(device_path, "Connected", False)
-        end = time.monotonic() if min_wait_time else 0
-        waited = end - start
+        disconnected = False
+        try:
+            with trace_span(
+                "disconnect_wait", address=device.address, path=device_path
+            ):
+                async with asyncio_timeout(DISCONNECT_TIMEOUT):
+                    await manager._wait_condition(device_path, "Connected", False)
+            disconnected = True
+        finally:
+            # Waits that time out or fail are the long tail so they are
+            # observed too, labelled by whether the device disconnected
+            waited = time.monotonic() - start
+            DISCONNECT_WAIT_SECONDS.labels(
+                adapter_from_path(device_path), "true" if disconnected else "false"
+            ).observe(waited)
         _LOGGER.debug(
             "%s - %s: Waited %s seconds to disconnect",
             device.name,
@@ -451,12 +1037,34 @@ async def wait_for_disconnect(device: BLEDevice, min_wait_time: float) -> None:
         )
 
 
+async def _get_bus_state(
+    path: str,
+) -> tuple[dict[str, Any] | None, int | None, list[str]]:
+    """Get the Device1 properties, pending D-Bus calls and awaited conditions."""
+    if not IS_LINUX or not (manager := await get_global_bluez_manager_with_timeout()):
+        return None, None, []
+    device_props = manager._properties.get(path, {}).get(defs.DEVICE_INTERFACE)
+    pending_calls = len(manager._bus._method_return_handlers) if manager._bus else None
+    conditions = [
+        condition.property_name
+        for condition in manager._condition_callbacks.get(path, ())
+    ]
+    return (
+        dict(device_props) if device_props is not None else None,
+        pending_calls,
+        conditions,
+    )
+
+
 async def get_device_by_adapter(address: str, adapter: str) -> BLEDevice | None:
     """Get the device by adapter and address."""
     if not IS_LINUX:
         return None
-    if not (properties := await _get_properties()):
+    if not (
+        manager := get_bluez_manager() or await get_global_bluez_manager_with_timeout()
+    ):
         return None
+    properties = manager._properties  # pylint: disable=protected-access
     device_path = address_to_bluez_path(address, adapter)
     if device_path in properties and (
         device_props := properties[device_path].get(defs.DEVICE_INTERFACE)
@@ -466,15 +1074,26 @@ async def get_device_by_adapter(address: str, adapter: str) -> BLEDevice | None:
 
 
 async def get_bluez_device(
-    name: str, path: str, rssi: int | None = None, _log_disappearance: bool = True
+    name: str,
+    path: str,
+    rssi: int | None = None,
+    _log_disappearance: bool = True,
+    adapter_health: AdapterHealthTracker | None = None,
 ) -> BLEDevice | None:
-    """Get a BLEDevice object for a BlueZ DBus path."""
+    """Get a BLEDevice object for a BlueZ DBus path.
+
+    With adapter_health, paths on quarantined adapters are skipped and
+    the RSSI of each path is penalized by the failure rate of its adapter.
+    """
 
     best_path = device_path = path
     rssi_to_beat: int = rssi or NO_RSSI_VALUE
 
-    if not (properties := await _get_properties()):
+    if not (
+        manager := get_bluez_manager() or await get_global_bluez_manager_with_timeout()
+    ):
         return None
+    properties = manager._properties  # pylint: disable=protected-access
 
     if (
         device_path not in properties
@@ -486,6 +1105,18 @@ async def get_bluez_device(
             _LOGGER.debug("%s - %s: Device has disappeared", name, device_path)
         rssi_to_beat = NO_RSSI_VALUE
 
+    if adapter_health is not None:
+        adapter = adapter_from_path(device_path)
+        if adapter_health.is_quarantined(adapter):
+            # adapter is degraded so take anything
+            # on a healthy adapter over the current path
+            _LOGGER.debug(
+                "%s - %s: Adapter %s is quarantined", name, device_path, adapter
+            )
+            rssi_to_beat = NO_RSSI_VALUE
+        elif rssi_to_beat != NO_RSSI_VALUE:
+            rssi_to_beat -= adapter_health.rssi_penalty(adapter)
+
     for path in _get_possible_paths(device_path):
         if path not in properties or not (
             device_props := properties[path].get(defs.DEVICE_INTERFACE)
@@ -508,6 +1139,11 @@ async def get_bluez_device(
             continue
 
         alternate_device_rssi: int = device_props.get("RSSI") or NO_RSSI_VALUE
+        if adapter_health is not None:
+            adapter = adapter_from_path(path)
+            if adapter_health.is_quarantined(adapter):
+                continue
+            alternate_device_rssi -= adapter_health.rssi_penalty(adapter)
         if (
             rssi_to_beat != NO_RSSI_VALUE
             and alternate_device_rssi - RSSI_SWITCH_THRESHOLD < rssi_to_beat
@@ -538,8 +1174,11 @@ async def get_connected_devices(device: BLEDevice) -> list[BLEDevice]:
 
     if not isinstance(device.details, dict) or "path" not in device.details:
         return connected
-    if not (properties := await _get_properties()):
+    if not (
+        manager := get_bluez_manager() or await get_global_bluez_manager_with_timeout()
+    ):
         return connected
+    properties = manager._properties  # pylint: disable=protected-access
     device_path = device.details["path"]
     for path in _get_possible_paths(device_path):
         if path not in properties or defs.DEVICE_INTERFACE not in properties[path]:
@@ -550,12 +1189,17 @@ async def get_connected_devices(device: BLEDevice) -> list[BLEDevice]:
     return connected
 
 
-async def get_device(address: str) -> BLEDevice | None:
+async def get_device(
+    address: str, adapter_health: AdapterHealthTracker | None = None
+) -> BLEDevice | None:
     """Get the device."""
     if not IS_LINUX:
         return None
     return await get_bluez_device(
-        address, address_to_bluez_path(address), _log_disappearance=False
+        address,
+        address_to_bluez_path(address),
+        _log_disappearance=False,
+        adapter_health=adapter_health,
     )
 
 
@@ -572,7 +1216,7 @@ def _get_possible_paths(path: str) -> Generator[str]:
         yield f"{path[0:14]}{i}{path[15:]}"
 
 
-def ble_device_from_properties(path: str, props: dict[str, Any]) -> BLEDevice:
+def ble_device_from_properties(path: str, props: dict[str, Any] | Device1) -> BLEDevice:
     """Get a BLEDevice from a dict of properties."""
     return BLEDevice(
         props["Address"],
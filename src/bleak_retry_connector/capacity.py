@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+# A full adapter must be seen this many times at the same number of
+# connections before its capacity is settled, so a single spurious
+# out of slots error does not shrink it
+CAPACITY_FULL_OBSERVATIONS = 3
+
+
+@dataclass(slots=True)
+class _SlotCapacity:
+    capacity: int  # Connections the adapter is believed to hold
+    confirmed: bool = False  # Whether the adapter was seen full at capacity
+    most_connected: int = 0  # Most connections seen to succeed at once
+    # Times the adapter was seen full by the number of connections
+    full_at: dict[int, int] = field(default_factory=dict)
+    # Numbers of connections the adapter itself reported being full at
+    reported_full_at: set[int] = field(default_factory=set)
+
+
+class SlotCapacityLearner:
+    """Learn how many connections each adapter really holds.
+
+    Adapters start at the number of slots they were registered with.
+    Until that is confirmed one connection more than the capacity is
+    allowed as a probe; a probe that connects raises the capacity and
+    an adapter that is seen full at the same number of connections
+    CAPACITY_FULL_OBSERVATIONS times, at least once reported by the
+    adapter itself, settles it there.
+    """
+
+    def __init__(self, learned: Mapping[str, int] | None = None) -> None:
+        """Initialize the learner with the capacities of a previous run."""
+        self._adapters: dict[str, _SlotCapacity] = {
+            adapter: _SlotCapacity(capacity, confirmed=True)
+            for adapter, capacity in (learned or {}).items()
+        }
+
+    def capacity(self, adapter: str, slots: int) -> int:
+        """Return the capacity of an adapter registered with slots."""
+        if (learned := self._adapters.get(adapter)) is None:
+            return slots
+        return learned.capacity
+
+    def limit(self, adapter: str, slots: int) -> int:
+        """Return how many connections to allow including a probe."""
+        if (learned := self._adapters.get(adapter)) is None:
+            return slots + 1
+        return learned.capacity + (not learned.confirmed)
+
+    def record_connected(self, adapter: str, slots: int, connected: int) -> bool:
+        """Record a connect that succeeded with connected connections.
+
+        Returns if the capacity changed.
+        """
+        learned = self._get(adapter, slots)
+        learned.most_connected = max(learned.most_connected, connected)
+        # Seeing the adapter full with fewer connections was spurious
+        for full_connected in [n for n in learned.full_at if n < connected]:
+            del learned.full_at[full_connected]
+            learned.reported_full_at.discard(full_connected)
+        if connected <= learned.capacity:
+            return False
+        learned.capacity = connected
+        learned.confirmed = False
+        return True
+
+    def record_full(
+        self, adapter: str, slots: int, connected: int, reported: bool = True
+    ) -> bool:
+        """Record a connect that failed because the adapter was full.
+
+        Without reported the adapter being full was only inferred, for
+        example from a device that was not found; that adds to the
+        observations but never settles the capacity on its own.
+
+        Returns if the capacity changed.
+        """
+        learned = self._get(adapter, slots)
+        if connected < learned.most_connected or connected <= 0:
+            # More connections have succeeded before
+            return False
+        learned.full_at[connected] = learned.full_at.get(connected, 0) + 1
+        if reported:
+            learned.reported_full_at.add(connected)
+        if (
+            learned.full_at[connected] < CAPACITY_FULL_OBSERVATIONS
+            or connected not in learned.reported_full_at
+        ):
+            return False
+        learned.full_at.clear()
+        learned.reported_full_at.clear()
+        changed = learned.capacity != connected or not learned.confirmed
+        learned.capacity = connected
+        learned.confirmed = True
+        return changed
+
+    def _get(self, adapter: str, slots: int) -> _SlotCapacity:
+        if (learned := self._adapters.get(adapter)) is None:
+            learned = self._adapters[adapter] = _SlotCapacity(slots)
+        return learned
+
+    def learned(self) -> dict[str, int]:
+        """Return the confirmed capacities to initialize the next run with."""
+        return {
+            adapter: learned.capacity
+            for adapter, learned in self._adapters.items()
+            if learned.confirmed
+        }
+
+    def diagnostics(self) -> dict[str, dict[str, Any]]:
+        """Return diagnostics."""
+        return {
+            adapter: {
+                "capacity": learned.capacity,
+                "confirmed": learned.confirmed,
+                "most_connected": learned.most_connected,
+                "full_at": dict(learned.full_at),
+            }
+            for adapter, learned in self._adapters.items()
+        }
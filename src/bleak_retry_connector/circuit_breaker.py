@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from bleak.exc import BleakError
+
+CIRCUIT_FAILURE_THRESHOLD = 2
+CIRCUIT_BASE_OPEN_TIME = 30.0
+CIRCUIT_MAX_OPEN_TIME = 900.0
+
+
+class BleakCircuitOpenError(BleakError):
+    """The device has failed too often and connecting is paused."""
+
+
+class CircuitState(Enum):
+    """Circuit state."""
+
+    CLOSED = 1
+    OPEN = 2
+    HALF_OPEN = 3
+
+
+@dataclass(slots=True)
+class _Circuit:
+    state: CircuitState
+    failures: int  # Consecutive failed connects
+    open_count: int  # Consecutive times the circuit was opened
+    until: float  # time.monotonic() when the open period or trial ends
+
+
+class ConnectionCircuitBreaker:
+    """Stop connecting to persistently unreachable devices for a while.
+
+    After failure_threshold consecutive failed connects the circuit
+    for the address opens and connecting raises BleakCircuitOpenError
+    until the open period ends. The next connect is then let through
+    as a trial (half-open); if it fails the circuit opens again for
+    twice as long, if it succeeds the circuit closes.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        base_open_time: float = CIRCUIT_BASE_OPEN_TIME,
+        max_open_time: float = CIRCUIT_MAX_OPEN_TIME,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self._failure_threshold = failure_threshold
+        self._base_open_time = base_open_time
+        self._max_open_time = max_open_time
+        self._circuits: dict[str, _Circuit] = {}
+
+    def get_state(self, address: str) -> CircuitState:
+        """Get the circuit state for an address."""
+        if not (circuit := self._circuits.get(address)):
+            return CircuitState.CLOSED
+        return circuit.state
+
+    def check(self, address: str, name: str) -> None:
+        """Raise BleakCircuitOpenError if a connect should not be attempted."""
+        if not (circuit := self._circuits.get(address)) or (
+            circuit.state is CircuitState.CLOSED
+        ):
+            return
+        now = time.monotonic()
+        if now >= circuit.until:
+            # Let one connect through as a trial. If the trial never
+            # reports back (cancelled) another one is allowed once
+            # the trial window has passed.
+            circuit.state = CircuitState.HALF_OPEN
+            circuit.until = now + self._base_open_time
+            return
+        raise BleakCircuitOpenError(
+            f"{name} - {address}: Not connecting after {circuit.failures} "
+            f"failed connection(s); next try in {circuit.until - now:.1f}s"
+        )
+
+    def record_success(self, address: str) -> None:
+        """Record a successful connect."""
+        self._circuits.pop(address, None)
+
+    def record_failure(self, address: str) -> None:
+        """Record a failed connect."""
+        if not (circuit := self._circuits.get(address)):
+            circuit = self._circuits[address] = _Circuit(CircuitState.CLOSED, 0, 0, 0)
+        circuit.failures += 1
+        if (
+            circuit.state is CircuitState.CLOSED
+            and circuit.failures < self._failure_threshold
+        ):
+            return
+        circuit.state = CircuitState.OPEN
+        circuit.until = time.monotonic() + min(
+            self._max_open_time, self._base_open_time * 2**circuit.open_count
+        )
+        circuit.open_count += 1
+
+    def diagnostics(self) -> dict[str, dict[str, Any]]:
+        """Return diagnostics."""
+        now = time.monotonic()
+        return {
+            address: {
+                "state": circuit.state.name,
+                "failures": circuit.failures,
+                "open_count": circuit.open_count,
+                "remaining": max(0.0, circuit.until - now),
+            }
+            for address, circuit in self._circuits.items()
+        }
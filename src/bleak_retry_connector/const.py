@@ -8,3 +8,19 @@ RSSI_SWITCH_THRESHOLD = 5
 DISCONNECT_TIMEOUT = 5
 REAPPEAR_WAIT_INTERVAL = 0.5
 DBUS_CONNECT_TIMEOUT = 8.5
+# After D-Bus was not available it is probed again in the background,
+# first after this many seconds and then backing off exponentially
+DBUS_REPROBE_INTERVAL = 5.0
+DBUS_REPROBE_MAX_INTERVAL = 300.0
+# The background re-probe gives up after this many probes and the next
+# caller that wants the manager probes D-Bus again
+DBUS_REPROBE_MAX_TRIES = 10
+# A device that has not advertised for this long (and has no RSSI
+# on any adapter) is considered absent by the fast-fail pre-flight check
+ABSENT_DEVICE_MAX_AGE = 180.0
+ABSENT_DEVICE_WAIT_TIMEOUT = 2.0
+# The Device1 properties BlueZ only changes when the device advertises
+ADVERTISEMENT_PROPERTIES = ("RSSI", "ManufacturerData", "ServiceData")
+# Allocation changes buffered for a BleakSlotManager.events() consumer
+# before the oldest are dropped
+ALLOCATION_EVENTS_QUEUE_SIZE = 256
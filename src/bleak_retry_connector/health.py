@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from .attempts import ConnectionErrorCategory
+
+HEALTH_WINDOW = 20
+# An adapter needs this many outcomes in the window
+# before it is judged at all
+HEALTH_MIN_OUTCOMES = 5
+QUARANTINE_SUCCESS_RATE = 0.2
+QUARANTINE_TIME = 60.0
+# RSSI penalty in dBm for an adapter where every connect fails
+MAX_RSSI_PENALTY = 20
+# Failures that are caused by the adapter rather than the device;
+# timeouts and missing devices say nothing about the adapter
+ADAPTER_ERROR_CATEGORIES = frozenset(
+    {ConnectionErrorCategory.OUT_OF_SLOTS, ConnectionErrorCategory.ABORTED}
+)
+
+
+@dataclass(slots=True)
+class _AdapterHealth:
+    outcomes: deque[bool] = field(default_factory=lambda: deque(maxlen=HEALTH_WINDOW))
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=HEALTH_WINDOW))
+    quarantined_until: float = 0.0
+
+    @property
+    def success_rate(self) -> float | None:
+        """Return the success rate or None if there is not enough data."""
+        if len(self.outcomes) < HEALTH_MIN_OUTCOMES:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+
+class AdapterHealthTracker:
+    """Track connect outcomes per adapter to avoid degraded adapters.
+
+    Adapters are BlueZ adapters (hciX) or the source of proxy devices.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self._adapters: dict[str, _AdapterHealth] = {}
+
+    def clear(self) -> None:
+        """Forget all adapters."""
+        self._adapters.clear()
+
+    def record_success(self, adapter: str, duration: float) -> None:
+        """Record a successful connect through an adapter."""
+        health = self._adapters.setdefault(adapter, _AdapterHealth())
+        health.outcomes.append(True)
+        health.latencies.append(duration)
+
+    def record_failure(self, adapter: str) -> None:
+        """Record a failed connect attempt through an adapter."""
+        health = self._adapters.setdefault(adapter, _AdapterHealth())
+        health.outcomes.append(False)
+        if (
+            success_rate := health.success_rate
+        ) is not None and success_rate < QUARANTINE_SUCCESS_RATE:
+            health.quarantined_until = time.monotonic() + QUARANTINE_TIME
+            # Start over once the quarantine is lifted so the adapter
+            # is judged only on outcomes after it has had time to recover
+            health.outcomes.clear()
+
+    def is_quarantined(self, adapter: str) -> bool:
+        """Check if an adapter is quarantined."""
+        return (
+            health := self._adapters.get(adapter)
+        ) is not None and health.quarantined_until > time.monotonic()
+
+    def rssi_penalty(self, adapter: str) -> int:
+        """Return the RSSI penalty in dBm for an adapter."""
+        if (health := self._adapters.get(adapter)) is None or (
+            success_rate := health.success_rate
+        ) is None:
+            return 0
+        return round((1 - success_rate) * MAX_RSSI_PENALTY)
+
+    def diagnostics(self) -> dict[str, dict[str, Any]]:
+        """Return diagnostics."""
+        now = time.monotonic()
+        return {
+            adapter: {
+                "success_rate": health.success_rate,
+                "outcomes": len(health.outcomes),
+                "average_latency": (
+                    sum(health.latencies) / len(health.latencies)
+                    if health.latencies
+                    else None
+                ),
+                "quarantined_for": max(0.0, health.quarantined_until - now),
+            }
+            for adapter, health in self._adapters.items()
+        }
+
+
+_ADAPTER_HEALTH = AdapterHealthTracker()
+
+
+def get_adapter_health_tracker() -> AdapterHealthTracker:
+    """Return a shared adapter health tracker to pass to establish_connection."""
+    return _ADAPTER_HEALTH
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+# The floor keeps a tight history from producing a timeout
+# that is shorter than a slow connection interval
+ADAPTIVE_TIMEOUT_FLOOR = 2.0
+ADAPTIVE_TIMEOUT_MARGIN = 1.0
+ADAPTIVE_TIMEOUT_MULTIPLIER = 1.5
+ADAPTIVE_TIMEOUT_PERCENTILE = 0.95
+MIN_LATENCY_SAMPLES = 3
+MAX_LATENCY_SAMPLES = 20
+MAX_TRACKED_DEVICES = 1024
+# Devices that have not connected in this long are forgotten
+LATENCY_IDLE_TIME = 86400.0
+
+
+@dataclass(slots=True)
+class _LatencyHistory:
+    samples: deque[float]  # Durations of successful connects in seconds
+    last_used: float  # time.monotonic() of the last recorded connect
+
+
+class ConnectLatencyTracker:
+    """Track successful connect durations to derive per-device timeouts."""
+
+    def __init__(
+        self,
+        floor: float = ADAPTIVE_TIMEOUT_FLOOR,
+        margin: float = ADAPTIVE_TIMEOUT_MARGIN,
+        multiplier: float = ADAPTIVE_TIMEOUT_MULTIPLIER,
+        percentile: float = ADAPTIVE_TIMEOUT_PERCENTILE,
+        max_devices: int = MAX_TRACKED_DEVICES,
+        idle_time: float = LATENCY_IDLE_TIME,
+    ) -> None:
+        """Initialize the tracker."""
+        self._floor = floor
+        self._margin = margin
+        self._multiplier = multiplier
+        self._percentile = percentile
+        self._max_devices = max_devices
+        self._idle_time = idle_time
+        self._histories: OrderedDict[str, _LatencyHistory] = OrderedDict()
+
+    def record(self, address: str, duration: float) -> None:
+        """Record the duration of a successful connect."""
+        now = time.monotonic()
+        if history := self._histories.get(address):
+            history.samples.append(duration)
+            history.last_used = now
+            self._histories.move_to_end(address)
+        else:
+            self._histories[address] = _LatencyHistory(
+                deque((duration,), maxlen=MAX_LATENCY_SAMPLES), now
+            )
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Evict the least recently used and idle devices."""
+        histories = self._histories
+        while histories:
+            address, history = next(iter(histories.items()))
+            if (
+                len(histories) <= self._max_devices
+                and now - history.last_used < self._idle_time
+            ):
+                return
+            del histories[address]
+
+    def get_timeout(self, address: str, ceiling: float, timeouts: int = 0) -> float:
+        """Get the connect timeout for a device.
+
+        Returns the ceiling until enough connects have been recorded.
+        Each previous timeout in the current connection attempt doubles
+        the timeout so a slower than usual connect still gets a chance.
+        """
+        history = self._histories.get(address)
+        if history is None or len(history.samples) < MIN_LATENCY_SAMPLES:
+            return ceiling
+        samples = sorted(history.samples)
+        index = min(len(samples) - 1, int(len(samples) * self._percentile))
+        timeout = samples[index] * self._multiplier + self._margin
+        return min(ceiling, max(self._floor, timeout) * 2**timeouts)
+
+    def diagnostics(self) -> dict[str, list[float]]:
+        """Return diagnostics."""
+        return {
+            address: list(history.samples)
+            for address, history in self._histories.items()
+        }
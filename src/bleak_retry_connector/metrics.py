@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import abc
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Generic, TypeVar
+
+METRIC_PREFIX = "bleak_retry_connector_"
+# Adapter label for devices without a known adapter or proxy source
+UNKNOWN_ADAPTER = "unknown"
+# Buckets in seconds from a fast reconnect up to BLEAK_SAFETY_TIMEOUT
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    """Format a label set."""
+    formatted = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return f"{{{formatted}}}" if formatted else ""
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class CounterValue:
+    """A counter for one label set."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        """Initialize the counter."""
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the counter."""
+        self.value += amount
+
+
+class GaugeValue:
+    """A gauge for one label set."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        """Initialize the gauge."""
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        """Set the gauge."""
+        self.value = value
+
+
+class HistogramValue:
+    """A fixed bucket histogram for one label set.
+
+    Observing only bumps a slot in a preallocated array.
+    """
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        """Initialize the histogram."""
+        self.buckets = buckets
+        # The last slot counts observations above the largest bucket
+        self.counts = array("Q", bytes(8 * (len(buckets) + 1)))
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Observe a value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+_ValueT = TypeVar("_ValueT", CounterValue, GaugeValue, HistogramValue)
+
+
+class _Metric(abc.ABC, Generic[_ValueT]):
+    """A metric with a value per label set."""
+
+    type_name = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> None:
+        """Initialize the metric."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], _ValueT] = {}
+
+    @abc.abstractmethod
+    def _new_value(self) -> _ValueT:
+        """Create the value of a new label set."""
+
+    def labels(self, *labelvalues: str) -> _ValueT:
+        """Get the value for a label set, creating it on first use."""
+        if (value := self._values.get(labelvalues)) is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {labelvalues}"
+                )
+            value = self._values[labelvalues] = self._new_value()
+        return value
+
+    def remove(self, *labelvalues: str) -> None:
+        """Remove a label set."""
+        self._values.pop(labelvalues, None)
+
+    def clear(self) -> None:
+        """Remove all label sets."""
+        self._values.clear()
+
+    def render(self, lines: list[str]) -> None:
+        """Render the metric in the OpenMetrics text format."""
+        lines.append(f"# TYPE {self.name} {self.type_name}")
+        lines.append(f"# HELP {self.name} {self.documentation}")
+        for labelvalues, value in self._values.items():
+            self._render_value(
+                lines, list(zip(self.labelnames, labelvalues, strict=True)), value
+            )
+
+    @abc.abstractmethod
+    def _render_value(
+        self, lines: list[str], labels: list[tuple[str, str]], value: _ValueT
+    ) -> None:
+        """Render the value of a label set."""
+
+
+class Counter(_Metric[CounterValue]):
+    """A monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def _new_value(self) -> CounterValue:
+        return CounterValue()
+
+    def _render_value(
+        self, lines: list[str], labels: list[tuple[str, str]], value: CounterValue
+    ) -> None:
+        lines.append(
+            f"{self.name}_total{_format_labels(labels)} {_format_value(value.value)}"
+        )
+
+
+class Gauge(_Metric[GaugeValue]):
+    """A value that can go up and down."""
+
+    type_name = "gauge"
+
+    def _new_value(self) -> GaugeValue:
+        return GaugeValue()
+
+    def _render_value(
+        self, lines: list[str], labels: list[tuple[str, str]], value: GaugeValue
+    ) -> None:
+        lines.append(
+            f"{self.name}{_format_labels(labels)} {_format_value(value.value)}"
+        )
+
+
+class Histogram(_Metric[HistogramValue]):
+    """A histogram with fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize the histogram."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_value(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def _render_value(
+        self, lines: list[str], labels: list[tuple[str, str]], value: HistogramValue
+    ) -> None:
+        cumulative = 0
+        for upper_bound, count in zip(
+            (*self.buckets, float("inf")), value.counts, strict=True
+        ):
+            cumulative += count
+            le = "+Inf" if upper_bound == float("inf") else repr(upper_bound)
+            lines.append(
+                f"{self.name}_bucket{_format_labels([*labels, ('le', le)])} "
+                f"{cumulative}"
+            )
+        lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        lines.append(
+            f"{self.name}_sum{_format_labels(labels)} {_format_value(value.sum)}"
+        )
+
+
+_MetricT = TypeVar("_MetricT", Counter, Gauge, Histogram)
+
+
+class MetricsRegistry:
+    """A registry of metrics that renders them as OpenMetrics text."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def register(self, metric: _MetricT) -> _MetricT:
+        """Register a metric."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def clear(self) -> None:
+        """Reset all metrics."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def render(self) -> str:
+        """Render all metrics in the OpenMetrics text format."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            metric.render(lines)
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+_METRICS = MetricsRegistry()
+
+CONNECT_ATTEMPTS = _METRICS.register(
+    Counter(
+        f"{METRIC_PREFIX}connect_attempts",
+        "Connection attempts by adapter.",
+        ("adapter",),
+    )
+)
+CONNECT_OUTCOMES = _METRICS.register(
+    Counter(
+        f"{METRIC_PREFIX}connect_outcomes",
+        "Connection attempt outcomes by adapter and error category.",
+        ("adapter", "outcome"),
+    )
+)
+CONNECT_ATTEMPT_SECONDS = _METRICS.register(
+    Histogram(
+        f"{METRIC_PREFIX}connect_attempt_seconds",
+        "Duration of connection attempts.",
+        ("adapter",),
+    )
+)
+BACKOFF_SECONDS = _METRICS.register(
+    Histogram(
+        f"{METRIC_PREFIX}backoff_seconds",
+        "Minimum backoff chosen after a failed connection attempt.",
+        ("adapter",),
+    )
+)
+DISCONNECT_WAIT_SECONDS = _METRICS.register(
+    Histogram(
+        f"{METRIC_PREFIX}disconnect_wait_seconds",
+        "Time spent waiting for BlueZ to report a device disconnected.",
+        ("adapter", "disconnected"),
+    )
+)
+REAPPEAR_WAIT_SECONDS = _METRICS.register(
+    Histogram(
+        f"{METRIC_PREFIX}reappear_wait_seconds",
+        "Time spent waiting for a device to reappear on the bus.",
+        ("reappeared",),
+    )
+)
+SLOTS_ALLOCATED = _METRICS.register(
+    Gauge(
+        f"{METRIC_PREFIX}slots_allocated",
+        "Connection slots in use by adapter.",
+        ("adapter",),
+    )
+)
+SLOTS_TOTAL = _METRICS.register(
+    Gauge(
+        f"{METRIC_PREFIX}slots",
+        "Connection slots registered by adapter.",
+        ("adapter",),
+    )
+)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the registry fed by establish_connection and BleakSlotManager."""
+    return _METRICS
+
+
+def render_metrics() -> str:
+    """Render the metrics in the OpenMetrics text format."""
+    return _METRICS.render()
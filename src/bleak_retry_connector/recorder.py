@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any
+
+MAX_RECORDED_EVENTS = 32
+MAX_RECORDED_DEVICES = 256
+
+
+@dataclass(slots=True)
+class _RecordedEvent:
+    time: float  # time.time() when the event happened
+    event: str  # What happened, e.g. attempt, failed, connected
+    adapter: str | None  # Adapter/Controller (hciX) or proxy source
+    detail: str | None  # Classification or error message
+
+
+class FlightRecorder:
+    """Keep the last connection events per device in memory.
+
+    Unlike DEBUG logging this is cheap enough to leave on so failures
+    can be debugged after the fact from the diagnostics.
+    """
+
+    def __init__(
+        self,
+        max_events: int = MAX_RECORDED_EVENTS,
+        max_devices: int = MAX_RECORDED_DEVICES,
+    ) -> None:
+        """Initialize the recorder."""
+        self._max_events = max_events
+        self._max_devices = max_devices
+        self._events: OrderedDict[str, deque[_RecordedEvent]] = OrderedDict()
+
+    def clear(self) -> None:
+        """Forget all devices."""
+        self._events.clear()
+
+    def record(
+        self,
+        address: str,
+        event: str,
+        adapter: str | None = None,
+        detail: str | None = None,
+    ) -> None:
+        """Record an event for a device."""
+        events = self._events
+        if (device_events := events.get(address)) is None:
+            device_events = events[address] = deque(maxlen=self._max_events)
+            if len(events) > self._max_devices:
+                events.popitem(last=False)
+        else:
+            events.move_to_end(address)
+        device_events.append(_RecordedEvent(time.time(), event, adapter, detail))
+
+    def get_events(self, address: str) -> list[dict[str, Any]]:
+        """Get the recorded events for a device, oldest first."""
+        return [
+            {
+                "time": recorded.time,
+                "event": recorded.event,
+                "adapter": recorded.adapter,
+                "detail": recorded.detail,
+            }
+            for recorded in self._events.get(address, ())
+        ]
+
+    def diagnostics(self) -> dict[str, list[dict[str, Any]]]:
+        """Return diagnostics."""
+        return {address: self.get_events(address) for address in self._events}
+
+
+_FLIGHT_RECORDER = FlightRecorder()
+
+
+def get_flight_recorder() -> FlightRecorder:
+    """Return the flight recorder fed by establish_connection."""
+    return _FLIGHT_RECORDER
@@ -0,0 +1,155 @@
+"""Restore discoveries from the BlueZ managed objects."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from .bluez import _get_properties
+from .const import IS_LINUX
+
+if TYPE_CHECKING:
+    from bleak import BleakScanner
+    from bleak.backends.device import BLEDevice
+    from bleak.backends.scanner import AdvertisementData
+
+_LOGGER = logging.getLogger(__name__)
+
+DEVICE_PATH_PREFIX = "/org/bluez/hci"
+DEVICE_INTERFACE = "org.bluez.Device1"
+
+
+@dataclass(slots=True)
+class RestoreReport:
+    restored: dict[str, int] = field(default_factory=dict)  # Added per adapter
+    removed: dict[str, int] = field(default_factory=dict)  # Removed per adapter
+    seconds: dict[str, float] = field(default_factory=dict)  # Seconds per adapter
+    partition_seconds: float = 0.0  # Seconds to split the objects by adapter
+
+
+def partition_by_adapter(
+    managed_objects: dict[str, Any], adapters: Iterable[str]
+) -> dict[str, dict[str, Any]]:
+    """Split the managed objects under each adapter in a single pass.
+
+    Objects of adapters that are not asked for are dropped, so loading
+    the history of a partition only walks the objects of its adapter.
+    """
+    partitions: dict[str, dict[str, Any]] = {adapter: {} for adapter in adapters}
+    for path, interfaces in managed_objects.items():
+        if (
+            path.startswith(DEVICE_PATH_PREFIX)
+            and (partition := partitions.get(path.split("/", 4)[3])) is not None
+        ):
+            partition[path] = interfaces
+    return partitions
+
+
+def _load_discoveries(
+    managed_objects: dict[str, Any], adapter: str
+) -> dict[str, tuple[BLEDevice, AdvertisementData]]:
+    """Load the discoveries of an adapter keyed by device path."""
+    from bluetooth_adapters import (  # pylint: disable=import-outside-toplevel
+        load_history_from_managed_objects,
+    )
+
+    return {
+        history.device.details["path"]: (history.device, history.advertisement_data)
+        for history in load_history_from_managed_objects(
+            managed_objects, adapter
+        ).values()
+    }
+
+
+@dataclass(slots=True)
+class _RestoredAdapter:
+    # The seen_devices of the scanner last restored into
+    seen_devices: dict[str, Any] | None = None
+    # The Device1 properties of every restored path
+    props: dict[str, dict[str, Any]] = field(default_factory=dict)
+    discoveries: dict[str, tuple[BLEDevice, AdvertisementData]] = field(
+        default_factory=dict
+    )
+
+
+class DiscoveryRestorer:
+    """Restore discoveries into scanners, only loading what changed.
+
+    A device is only loaded again when BlueZ replaced its Device1
+    properties, which it does when the device is removed and found
+    again; properties that change in place are left to the scanner,
+    which updates its own entry as advertisements come in. Restoring
+    into the same scanner again only adds and removes the devices that
+    changed, and a restarted scanner gets the remembered discoveries in
+    a single dict update.
+    """
+
+    def __init__(self) -> None:
+        """Init the restorer."""
+        self._adapters: dict[str, _RestoredAdapter] = {}
+
+    def clear(self) -> None:
+        """Forget what was restored so the next restore loads everything."""
+        self._adapters.clear()
+
+    async def restore(self, scanners: Mapping[str, BleakScanner]) -> RestoreReport:
+        """Restore discoveries from the bus for the scanner of each adapter."""
+        report = RestoreReport()
+        if not IS_LINUX:
+            # This is only supported on Linux
+            return report
+        if not (properties := await _get_properties()):
+            _LOGGER.debug("Failed to restore discoveries for %s", list(scanners))
+            return report
+        start = time.monotonic()
+        partitions = partition_by_adapter(properties, scanners)
+        report.partition_seconds = time.monotonic() - start
+        for adapter, scanner in scanners.items():
+            start = time.monotonic()
+            report.restored[adapter], report.removed[adapter] = self._restore_adapter(
+                scanner._backend.seen_devices, partitions[adapter], adapter
+            )
+            report.seconds[adapter] = time.monotonic() - start
+        _LOGGER.debug("Restored discoveries: %s", report)
+        return report
+
+    def _restore_adapter(
+        self,
+        seen_devices: dict[str, Any],
+        managed_objects: dict[str, Any],
+        adapter: str,
+    ) -> tuple[int, int]:
+        """Restore the discoveries of an adapter and return the added and removed."""
+        if not (restored := self._adapters.get(adapter)):
+            restored = self._adapters[adapter] = _RestoredAdapter()
+        known = restored.props
+        current = {
+            path: props
+            for path, interfaces in managed_objects.items()
+            if (props := interfaces.get(DEVICE_INTERFACE))
+        }
+        removed = [path for path in known if path not in current]
+        changed = {
+            path: managed_objects[path]
+            for path, props in current.items()
+            if known.get(path) is not props
+        }
+        discoveries = restored.discoveries
+        for path in removed:
+            del discoveries[path]
+        loaded = _load_discoveries(changed, adapter) if changed else {}
+        discoveries.update(loaded)
+        restored.props = current
+        if seen_devices is not restored.seen_devices:
+            # A scanner we have not restored into yet, or one that
+            # restarted and started over with an empty dict
+            restored.seen_devices = seen_devices
+            seen_devices.update(discoveries)
+            return len(discoveries), 0
+        for path in removed:
+            seen_devices.pop(path, None)
+        seen_devices.update(loaded)
+        return len(loaded), len(removed)
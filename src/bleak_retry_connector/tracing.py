@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+from contextlib import AbstractContextManager
+from types import TracebackType
+from typing import Any, Protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Tracer(Protocol):
+    """A tracing backend that receives span start and end events."""
+
+    def start_span(self, name: str, attributes: dict[str, Any]) -> Any:
+        """Start a span and return a token that is passed to end_span."""
+
+    def end_span(self, span: Any, error: BaseException | None) -> None:
+        """End a span started with start_span."""
+
+
+_tracer: Tracer | None = None
+# Shared and reusable so a span costs one function call without a tracer
+_NO_SPAN: AbstractContextManager[None] = contextlib.nullcontext()
+
+
+def set_tracer(tracer: Tracer | None) -> None:
+    """Set the tracer or None to stop tracing."""
+    global _tracer
+    _tracer = tracer
+
+
+class _Span:
+    """Emit start and end events for a span to the tracer."""
+
+    __slots__ = ("_tracer", "_name", "_attributes", "_span")
+
+    def __init__(self, tracer: Tracer, name: str, attributes: dict[str, Any]) -> None:
+        """Initialize the span."""
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+        self._span: Any = None
+
+    def __enter__(self) -> None:
+        """Start the span."""
+        try:
+            self._span = self._tracer.start_span(self._name, self._attributes)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in tracer")
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """End the span."""
+        try:
+            self._tracer.end_span(self._span, exc)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in tracer")
+
+
+def trace_span(name: str, **attributes: Any) -> AbstractContextManager[None]:
+    """Trace the enclosed block as a span if a tracer is set."""
+    if _tracer is None:
+        return _NO_SPAN
+    return _Span(_tracer, name, attributes)
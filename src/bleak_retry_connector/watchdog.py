@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from bleak.backends.device import BLEDevice
+
+from .bluez import (
+    Allocations,
+    BleakSlotManager,
+    _get_bus_state,
+    adapter_from_path,
+    path_from_ble_device,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SLOW_CONNECT_THRESHOLD = 15.0
+
+
+@dataclass(slots=True)
+class SlowConnectSnapshot:
+    address: str
+    name: str
+    attempt: int  # The attempt that is stalled
+    elapsed: float  # Seconds since the attempt started
+    stack: list[str]  # Frames of the stalled connect, outermost first
+    device_properties: dict[str, Any] | None  # BlueZ Device1 properties
+    allocations: Allocations | None  # Slot allocations of the adapter
+    pending_dbus_calls: int | None  # D-Bus method calls waiting for a reply
+    pending_conditions: list[str]  # Device properties being waited on
+
+
+def _coroutine_stack(task: asyncio.Task[Any]) -> list[str]:
+    """Walk the await chain of a task.
+
+    Task.get_stack only returns the outermost frame of a suspended
+    coroutine so follow cr_await down to the awaited future instead.
+    """
+    stack: list[str] = []
+    awaitable: Any = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(
+            awaitable, "gi_frame", None
+        )
+        if frame is None:
+            # The future (or other awaitable) at the bottom of the chain
+            stack.append(repr(awaitable))
+            break
+        code = frame.f_code
+        stack.append(f"{code.co_filename}:{frame.f_lineno} in {code.co_name}")
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(
+            awaitable, "gi_yieldfrom", None
+        )
+    return stack
+
+
+class SlowConnectWatchdog:
+    """Snapshot the state of connection attempts that stall.
+
+    When an attempt takes longer than the threshold, the stack of the
+    stalled connect, the Device1 properties, the slot allocations of
+    the adapter and the pending D-Bus calls are passed to the callback
+    while the attempt is still running.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[SlowConnectSnapshot], None],
+        threshold: float = SLOW_CONNECT_THRESHOLD,
+        slot_manager: BleakSlotManager | None = None,
+    ) -> None:
+        """Initialize the watchdog."""
+        self._callback = callback
+        self._threshold = threshold
+        self._slot_manager = slot_manager
+
+    def watch(self, device: BLEDevice, name: str, attempt: int) -> asyncio.Task[None]:
+        """Watch the connection attempt running in the current task.
+
+        Cancel the returned task when the attempt finishes.
+        """
+        task = asyncio.current_task()
+        assert task is not None  # nosec
+        return asyncio.create_task(
+            self._watch(task, device, name, attempt, time.monotonic())
+        )
+
+    async def _watch(
+        self,
+        task: asyncio.Task[Any],
+        device: BLEDevice,
+        name: str,
+        attempt: int,
+        start: float,
+    ) -> None:
+        """Wait for the threshold and snapshot the stalled attempt."""
+        await asyncio.sleep(self._threshold)
+        stack = _coroutine_stack(task)
+        allocations: Allocations | None = None
+        device_properties: dict[str, Any] | None = None
+        pending_dbus_calls: int | None = None
+        pending_conditions: list[str] = []
+        if path := path_from_ble_device(device):
+            if self._slot_manager is not None:
+                allocations = self._slot_manager.get_allocations(
+                    adapter_from_path(path)
+                )
+            (
+                device_properties,
+                pending_dbus_calls,
+                pending_conditions,
+            ) = await _get_bus_state(path)
+        snapshot = SlowConnectSnapshot(
+            device.address,
+            name,
+            attempt,
+            time.monotonic() - start,
+            stack,
+            device_properties,
+            allocations,
+            pending_dbus_calls,
+            pending_conditions,
+        )
+        try:
+            self._callback(snapshot)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in slow connect callback")
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from bleak.backends.bluezdbus import defs
+
+DEVICE_COUNT = 10_000
+ADAPTER_COUNT = 8
+
+_REPORTS = pytest.StashKey[list[str]]()
+
+
+@pytest.fixture(autouse=True)
+def configure_test_logging(caplog: pytest.LogCaptureFixture) -> None:
+    """Benchmark without the DEBUG logging the other tests turn on."""
+    caplog.set_level(logging.INFO)
+
+
+@pytest.fixture
+def benchmark_report(request: pytest.FixtureRequest) -> Callable[[str], None]:
+    """Report a line in the terminal summary and as a test property.
+
+    Output printed by a benchmark is captured by pytest, so it never
+    shows up in the CI run.
+    """
+    reports = request.config.stash.setdefault(_REPORTS, [])
+
+    def _report(line: str) -> None:
+        reports.append(f"{request.node.name}: {line}")
+        request.node.user_properties.append(("report", line))
+
+    return _report
+
+
+def pytest_terminal_summary(
+    terminalreporter: pytest.TerminalReporter, config: pytest.Config
+) -> None:
+    """Show the lines reported by the benchmarks."""
+    if reports := config.stash.get(_REPORTS, None):
+        terminalreporter.section("benchmark reports")
+        for line in reports:
+            terminalreporter.write_line(line)
+
+
+def make_address(index: int) -> str:
+    """Make a deterministic address for a synthetic device."""
+    return ":".join(f"{byte:02X}" for byte in (0xC0, 0x00, *index.to_bytes(4, "big")))
+
+
+def make_properties(
+    device_count: int = DEVICE_COUNT, adapter_count: int = ADAPTER_COUNT
+) -> dict[str, dict[str, dict[str, Any]]]:
+    """Make a BlueZ property tree like the one a busy gateway sees.
+
+    Each device is seen by up to three adapters with a different RSSI
+    on each, and every tenth device is connected.
+    """
+    properties: dict[str, dict[str, dict[str, Any]]] = {}
+    for adapter in range(adapter_count):
+        properties[f"/org/bluez/hci{adapter}"] = {
+            defs.ADAPTER_INTERFACE: {"Address": f"00:1A:7D:DA:71:0{adapter}"}
+        }
+    for index in range(device_count):
+        address = make_address(index)
+        for offset in range(3):
+            adapter = (index + offset) % adapter_count
+            path = f"/org/bluez/hci{adapter}/dev_{address.replace(':', '_')}"
+            properties[path] = {
+                defs.DEVICE_INTERFACE: {
+                    "Address": address,
+                    "Alias": f"Sensor {index}",
+                    "Adapter": f"/org/bluez/hci{adapter}",
+                    "RSSI": -40 - (index + offset * 7) % 60,
+                    "Connected": offset == 0 and index % 10 == 0,
+                    "ManufacturerData": {0x004C: b"\x02\x15" + bytes(21)},
+                    "ServiceUUIDs": ["0000fe95-0000-1000-8000-00805f9b34fb"],
+                }
+            }
+    return properties
+
+
+@pytest.fixture(scope="session")
+def bluez_properties() -> dict[str, dict[str, dict[str, Any]]]:
+    """A property tree with 10k devices across 8 adapters."""
+    return make_properties()
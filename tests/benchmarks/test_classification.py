@@ -0,0 +1,82 @@
+"""Benchmarks for the device and error classification helpers."""
+
+from __future__ import annotations
+
+import asyncio
+
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakDBusError, BleakDeviceNotFoundError, BleakError
+from pytest_codspeed import BenchmarkFixture
+
+from bleak_retry_connector import (
+    ble_device_description,
+    ble_device_has_changed,
+    calculate_backoff_time,
+)
+
+from .conftest import make_address
+
+BLUEZ_DEVICES = [
+    BLEDevice(
+        make_address(index),
+        f"Sensor {index}",
+        {
+            "path": f"/org/bluez/hci{index % 8}/dev_"
+            f"{make_address(index).replace(':', '_')}",
+            "props": {"RSSI": -60},
+        },
+    )
+    for index in range(500)
+]
+PROXY_DEVICES = [
+    BLEDevice(make_address(index), f"Sensor {index}", {"source": "esp32-proxy"})
+    for index in range(500)
+]
+MOVED_DEVICES = [
+    BLEDevice(
+        device.address,
+        device.name,
+        {"path": device.details["path"].replace("/hci", "/hci1", 1)},
+    )
+    for device in BLUEZ_DEVICES
+]
+EXCEPTIONS: list[Exception] = [
+    asyncio.TimeoutError(),
+    EOFError(),
+    BrokenPipeError(),
+    BleakDBusError("org.bluez.Error.Failed", ["le-connection-abort-by-local"]),
+    BleakDBusError("org.bluez.Error.InProgress", ["In Progress"]),
+    BleakDeviceNotFoundError("FA:23:9D:AA:45:46"),
+    BleakError("ESP_GATT_CONN_CONN_CANCEL"),
+    BleakError("ESP_GATT_CONN_TIMEOUT"),
+    BleakError("ESP_GATT_ERROR"),
+    BleakError("Disconnected"),
+    BleakError("Unknown error"),
+] * 50
+
+
+def test_ble_device_description(benchmark: BenchmarkFixture) -> None:
+    devices = BLUEZ_DEVICES + PROXY_DEVICES
+
+    @benchmark
+    def _() -> None:
+        for device in devices:
+            ble_device_description(device)
+
+
+def test_ble_device_has_changed(benchmark: BenchmarkFixture) -> None:
+    # Every device unchanged and then moved to another adapter
+    pairs = list(zip(BLUEZ_DEVICES, BLUEZ_DEVICES, strict=True))
+    pairs += list(zip(BLUEZ_DEVICES, MOVED_DEVICES, strict=True))
+
+    @benchmark
+    def _() -> None:
+        for original, new in pairs:
+            ble_device_has_changed(original, new)
+
+
+def test_calculate_backoff_time(benchmark: BenchmarkFixture) -> None:
+    @benchmark
+    def _() -> None:
+        for exc in EXCEPTIONS:
+            calculate_backoff_time(exc)
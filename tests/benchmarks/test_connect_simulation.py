@@ -0,0 +1,128 @@
+"""Benchmark establish_connection against a simulated BlueZ on a virtual clock."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from bleak.exc import BleakError
+from pytest_codspeed import BenchmarkFixture
+
+from bleak_retry_connector import (
+    ConnectionAttempt,
+    establish_connection,
+)
+from tests.fake_bluez import (
+    AdapterProfile,
+    FakeBlueZManager,
+    installed,
+    make_client_class,
+)
+from tests.virtual_clock import run_with_virtual_clock
+
+from .conftest import make_address
+
+CONNECTS = 2000
+WORKERS = 16
+
+ADAPTERS = {
+    # A healthy adapter
+    "hci0": AdapterProfile(
+        latency=1.0, errors={"abort": 0.05, "eof": 0.01, "timeout": 0.01}
+    ),
+    # A busy adapter that often runs out of slots
+    "hci1": AdapterProfile(
+        latency=1.5, errors={"out_of_slots": 0.15, "abort": 0.1}, slots=3
+    ),
+    # A degraded adapter
+    "hci2": AdapterProfile(
+        latency=3.0,
+        jitter=1.0,
+        errors={"abort": 0.3, "device_missing": 0.1, "timeout": 0.05},
+    ),
+}
+
+
+@dataclass
+class SimulationReport:
+    durations: list[float] = field(default_factory=list)
+    attempts: list[int] = field(default_factory=list)
+    failures: Counter[str] = field(default_factory=Counter)
+
+    def percentile(self, percentile: float) -> float:
+        durations = sorted(self.durations)
+        return durations[min(len(durations) - 1, int(len(durations) * percentile))]
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.durations)} connects: "
+            f"p50={self.percentile(0.5):.2f}s "
+            f"p90={self.percentile(0.9):.2f}s "
+            f"p99={self.percentile(0.99):.2f}s "
+            f"mean attempts={sum(self.attempts) / len(self.attempts):.2f} "
+            f"failures={dict(self.failures)}"
+        )
+
+
+async def simulate(
+    adapters: dict[str, AdapterProfile],
+    connects: int = CONNECTS,
+    workers: int = WORKERS,
+    seed: int = 0,
+) -> SimulationReport:
+    """Connect and disconnect devices from concurrent workers."""
+    manager = FakeBlueZManager(adapters, seed)
+    client_class = make_client_class(manager)
+    loop = asyncio.get_running_loop()
+    report = SimulationReport()
+    devices = [
+        manager.add_device(make_address(index), [list(adapters)[index % len(adapters)]])
+        for index in range(workers)
+    ]
+
+    async def _worker(worker: int) -> None:
+        for _ in range(worker, connects, workers):
+            recorded: list[list[ConnectionAttempt]] = []
+            start = loop.time()
+            try:
+                client = await establish_connection(
+                    client_class,
+                    devices[worker],
+                    "simulated",
+                    attempts_callback=recorded.append,
+                )
+            except BleakError as ex:
+                report.failures[type(ex).__name__] += 1
+                report.attempts.append(len(getattr(ex, "attempts", ())))
+            else:
+                report.attempts.append(len(recorded[0]))
+                await asyncio.sleep(5)
+                await client.disconnect()
+            report.durations.append(loop.time() - start)
+
+    with installed(manager):
+        await asyncio.gather(*(_worker(worker) for worker in range(workers)))
+    return report
+
+
+def test_simulated_connects_are_deterministic() -> None:
+    """The same seed gives the same connect times."""
+    first = run_with_virtual_clock(simulate(ADAPTERS, connects=200))
+    second = run_with_virtual_clock(simulate(ADAPTERS, connects=200))
+    assert first == second
+    assert len(first.durations) == 200
+    assert first.failures
+
+
+def test_simulated_connects(
+    benchmark: BenchmarkFixture, benchmark_report: Callable[[str], None]
+) -> None:
+    reports: list[SimulationReport] = []
+
+    @benchmark
+    def _() -> None:
+        reports.append(run_with_virtual_clock(simulate(ADAPTERS)))
+
+    benchmark_report(reports[-1].summary())
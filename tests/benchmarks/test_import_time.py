@@ -0,0 +1,60 @@
+"""Benchmark how long importing the package takes with -X importtime."""
+
+from __future__ import annotations
+
+import os
+import subprocess  # nosec
+import sys
+from collections.abc import Callable
+
+from pytest_codspeed import BenchmarkFixture
+
+# Only needed on Linux once there is a BlueZ manager, something to
+# disconnect or discoveries to restore
+LAZY_MODULES = (
+    "bleak.backends.bluezdbus.manager",
+    "bleak_retry_connector.dbus",
+    "bluetooth_adapters",
+    "dbus_fast",
+)
+
+
+def _run(code: str, *args: str) -> subprocess.CompletedProcess[str]:
+    """Run code in a fresh interpreter with the same import path."""
+    return subprocess.run(  # nosec
+        [sys.executable, *args, "-c", code],
+        capture_output=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        text=True,
+    )
+
+
+def import_time(module: str) -> int:
+    """Return the cumulative import time of a module in microseconds."""
+    stderr = _run(f"import {module}", "-X", "importtime").stderr
+    for line in stderr.splitlines():
+        _, cumulative, name = line.rsplit("|", 2)
+        if name.strip() == module:
+            return int(cumulative)
+    raise AssertionError(f"{module} not found in {stderr}")
+
+
+def test_linux_only_dependencies_are_imported_lazily() -> None:
+    stdout = _run(
+        "import sys, bleak_retry_connector\n"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    ).stdout
+    assert stdout.strip() == ""
+
+
+def test_import_time(
+    benchmark: BenchmarkFixture, benchmark_report: Callable[[str], None]
+) -> None:
+    timings: list[int] = []
+
+    @benchmark
+    def _() -> None:
+        timings.append(import_time("bleak_retry_connector"))
+
+    benchmark_report(f"import bleak_retry_connector: {min(timings) / 1000:.1f}ms")
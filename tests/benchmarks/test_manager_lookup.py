@@ -0,0 +1,75 @@
+"""Benchmark the BlueZ manager lookups done on every connection attempt."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from pytest_codspeed import BenchmarkFixture
+
+import bleak_retry_connector
+from bleak_retry_connector.bluez import (
+    get_bluez_manager,
+    get_global_bluez_manager_with_timeout,
+)
+from tests.fake_bluez import AdapterProfile, FakeBlueZManager
+
+ATTEMPTS = 10_000
+# Manager lookups done by each connection attempt
+LOOKUPS = 3
+
+
+@pytest.fixture
+def connected_manager(
+    mock_linux: None, monkeypatch: pytest.MonkeyPatch
+) -> dict[asyncio.AbstractEventLoop, FakeBlueZManager]:
+    """Register a connected manager for the loop the benchmark runs on."""
+    instances: dict[asyncio.AbstractEventLoop, FakeBlueZManager] = {}
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "_global_instances", instances
+    )
+    return instances
+
+
+async def _awaited_lookups(
+    instances: dict[asyncio.AbstractEventLoop, FakeBlueZManager],
+) -> None:
+    """The lookups of an attempt when each one awaits a coroutine."""
+    instances[asyncio.get_running_loop()] = FakeBlueZManager({"hci0": AdapterProfile()})
+    for _ in range(ATTEMPTS):
+        for _lookup in range(LOOKUPS):
+            manager = await get_global_bluez_manager_with_timeout()
+            assert manager is not None
+            assert manager._properties is not None
+
+
+async def _synchronous_lookups(
+    instances: dict[asyncio.AbstractEventLoop, FakeBlueZManager],
+) -> None:
+    """The lookups of an attempt once the connected manager is used directly."""
+    instances[asyncio.get_running_loop()] = FakeBlueZManager({"hci0": AdapterProfile()})
+    for _ in range(ATTEMPTS):
+        for _lookup in range(LOOKUPS):
+            manager = (
+                get_bluez_manager() or await get_global_bluez_manager_with_timeout()
+            )
+            assert manager is not None
+            assert manager._properties is not None
+
+
+def test_awaited_manager_lookups(
+    benchmark: BenchmarkFixture,
+    connected_manager: dict[asyncio.AbstractEventLoop, FakeBlueZManager],
+) -> None:
+    @benchmark
+    def _() -> None:
+        asyncio.run(_awaited_lookups(connected_manager))
+
+
+def test_synchronous_manager_lookups(
+    benchmark: BenchmarkFixture,
+    connected_manager: dict[asyncio.AbstractEventLoop, FakeBlueZManager],
+) -> None:
+    @benchmark
+    def _() -> None:
+        asyncio.run(_synchronous_lookups(connected_manager))
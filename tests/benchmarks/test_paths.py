@@ -0,0 +1,107 @@
+"""Benchmarks for the path helpers called on every connect."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from bleak.backends.bluezdbus import defs
+from pytest_codspeed import BenchmarkFixture
+
+import bleak_retry_connector
+from bleak_retry_connector.bluez import (
+    _get_possible_paths,
+    adapter_from_path,
+    address_from_path,
+    address_to_bluez_path,
+    ble_device_from_properties,
+    get_device,
+)
+
+from .conftest import DEVICE_COUNT, make_address
+
+PATHS = [
+    f"/org/bluez/hci{index % 8}/dev_{make_address(index).replace(':', '_')}"
+    for index in range(1000)
+]
+
+
+def test_get_possible_paths(benchmark: BenchmarkFixture) -> None:
+    @benchmark
+    def _() -> None:
+        for path in PATHS:
+            for _possible_path in _get_possible_paths(path):
+                pass
+
+
+def test_address_to_bluez_path(benchmark: BenchmarkFixture) -> None:
+    addresses = [make_address(index) for index in range(1000)]
+
+    @benchmark
+    def _() -> None:
+        for address in addresses:
+            address_to_bluez_path(address)
+
+
+def test_address_from_path(benchmark: BenchmarkFixture) -> None:
+    @benchmark
+    def _() -> None:
+        for path in PATHS:
+            address_from_path(path)
+
+
+def test_adapter_from_path(benchmark: BenchmarkFixture) -> None:
+    @benchmark
+    def _() -> None:
+        for path in PATHS:
+            adapter_from_path(path)
+
+
+def test_ble_device_from_properties(
+    benchmark: BenchmarkFixture,
+    bluez_properties: dict[str, dict[str, dict[str, Any]]],
+) -> None:
+    devices = [
+        (path, interfaces[defs.DEVICE_INTERFACE])
+        for path, interfaces in bluez_properties.items()
+        if defs.DEVICE_INTERFACE in interfaces
+    ]
+
+    @benchmark
+    def _() -> None:
+        for path, props in devices:
+            ble_device_from_properties(path, props)
+
+
+def test_get_device_10k_devices(
+    benchmark: BenchmarkFixture,
+    bluez_properties: dict[str, dict[str, dict[str, Any]]],
+) -> None:
+    """Find the best path for 100 devices in a tree of 10k devices."""
+    addresses = [make_address(index) for index in range(1, DEVICE_COUNT, 100)]
+    loop = asyncio.new_event_loop()
+
+    async def _get_devices() -> None:
+        for address in addresses:
+            await get_device(address)
+
+    with (
+        patch.object(bleak_retry_connector.bluez, "IS_LINUX", True),
+        patch.object(bleak_retry_connector.bluez, "defs", defs),
+        patch.object(
+            bleak_retry_connector.bluez,
+            "get_bluez_manager",
+            lambda: SimpleNamespace(_properties=bluez_properties),
+        ),
+    ):
+        try:
+            assert loop.run_until_complete(get_device(addresses[0])) is not None
+
+            @benchmark
+            def _() -> None:
+                loop.run_until_complete(_get_devices())
+
+        finally:
+            loop.close()
@@ -0,0 +1,78 @@
+"""Benchmark restoring the discoveries of every adapter at startup."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+from pytest_codspeed import BenchmarkFixture
+
+import bleak_retry_connector
+from bleak_retry_connector import (
+    DiscoveryRestorer,
+    restore_discoveries,
+    restore_discoveries_by_adapter,
+)
+
+from .conftest import ADAPTER_COUNT
+
+ADAPTERS = [f"hci{adapter}" for adapter in range(ADAPTER_COUNT)]
+
+
+def _make_scanners() -> dict[str, Any]:
+    return {adapter: Mock(_backend=Mock(seen_devices={})) for adapter in ADAPTERS}
+
+
+@pytest.fixture
+def restore_properties(
+    bluez_properties: dict[str, dict[str, dict[str, Any]]],
+) -> Any:
+    async def _get_properties() -> dict[str, dict[str, dict[str, Any]]]:
+        return bluez_properties
+
+    with (
+        patch.object(bleak_retry_connector, "IS_LINUX", True),
+        patch.object(bleak_retry_connector, "_get_properties", _get_properties),
+        patch.object(bleak_retry_connector.restore, "IS_LINUX", True),
+        patch.object(bleak_retry_connector.restore, "_get_properties", _get_properties),
+    ):
+        yield
+
+
+async def _restore_each_adapter() -> None:
+    for adapter, scanner in _make_scanners().items():
+        await restore_discoveries(scanner, adapter)
+
+
+def test_restore_discoveries_each_adapter(
+    benchmark: BenchmarkFixture, restore_properties: None
+) -> None:
+    """One restore_discoveries per adapter, each walking the whole bus."""
+
+    @benchmark
+    def _() -> None:
+        asyncio.run(_restore_each_adapter())
+
+
+def test_restore_discoveries_by_adapter(
+    benchmark: BenchmarkFixture, restore_properties: None
+) -> None:
+    """A single pass over the bus for all adapters."""
+
+    @benchmark
+    def _() -> None:
+        asyncio.run(restore_discoveries_by_adapter(_make_scanners()))
+
+
+def test_discovery_restorer_restart(
+    benchmark: BenchmarkFixture, restore_properties: None
+) -> None:
+    """Restarted scanners on a bus where nothing changed since the last restore."""
+    restorer = DiscoveryRestorer()
+    asyncio.run(restorer.restore(_make_scanners()))
+
+    @benchmark
+    def _() -> None:
+        asyncio.run(restorer.restore(_make_scanners()))
@@ -0,0 +1,131 @@
+"""Benchmark retry policies across scripted failure scenarios on a virtual clock."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import pytest
+from bleak.exc import BleakError
+from pytest_codspeed import BenchmarkFixture
+
+from bleak_retry_connector import (
+    ConnectionAttempt,
+    establish_connection,
+)
+from tests.fake_bluez import (
+    ERRORS,
+    AdapterProfile,
+    FakeBlueZManager,
+    installed,
+    make_client_class,
+)
+from tests.virtual_clock import run_with_virtual_clock
+
+from .conftest import make_address
+
+SCENARIOS = 2000
+# Every connect takes exactly this long so the wall time of a scenario
+# only depends on the retry policy
+CONNECT_TIME = 1.0
+
+
+def make_scenarios(count: int = SCENARIOS, seed: int = 0) -> list[list[str | None]]:
+    """Make scripts of up to five failures before a successful connect."""
+    rand = random.Random(seed)
+    errors = sorted(ERRORS)
+    return [
+        [*(rand.choice(errors) for _ in range(rand.randrange(6))), None]
+        for _ in range(count)
+    ]
+
+
+@dataclass
+class PolicyReport:
+    wall_times: list[float] = field(default_factory=list)
+    attempt_times: list[float] = field(default_factory=list)
+    connected: int = 0
+
+    @property
+    def total(self) -> float:
+        return sum(self.wall_times)
+
+    def summary(self) -> str:
+        wall_times = sorted(self.wall_times)
+        return (
+            f"{len(wall_times)} scenarios: "
+            f"connected={self.connected} "
+            f"total={self.total:.1f}s "
+            f"mean={self.total / len(wall_times):.2f}s "
+            f"p99={wall_times[int(len(wall_times) * 0.99)]:.2f}s"
+        )
+
+
+async def run_policy(
+    scenarios: list[list[str | None]], max_attempts: int
+) -> PolicyReport:
+    """Replay every scenario concurrently with its own device."""
+    manager = FakeBlueZManager(
+        {"hci0": AdapterProfile(latency=CONNECT_TIME, jitter=0, slots=len(scenarios))}
+    )
+    client_class = make_client_class(manager)
+    loop = asyncio.get_running_loop()
+    report = PolicyReport()
+
+    async def _run(index: int, script: list[str | None]) -> None:
+        device = manager.add_device(make_address(index))
+        manager.script(device.details["path"], script)
+        recorded: list[list[ConnectionAttempt]] = []
+        start = loop.time()
+        try:
+            await establish_connection(
+                client_class,
+                device,
+                "scenario",
+                max_attempts=max_attempts,
+                attempts_callback=recorded.append,
+            )
+        except BleakError as ex:
+            attempts: list[ConnectionAttempt] = getattr(ex, "attempts", [])
+        else:
+            report.connected += 1
+            attempts = recorded[0]
+        report.wall_times.append(loop.time() - start)
+        report.attempt_times.append(
+            sum(attempt.duration + attempt.backoff for attempt in attempts)
+        )
+
+    with installed(manager):
+        await asyncio.gather(
+            *(_run(index, script) for index, script in enumerate(scenarios))
+        )
+    return report
+
+
+@pytest.mark.parametrize("max_attempts", [2, 4])
+def test_retry_policy_wall_time_is_attempts_and_backoffs(max_attempts: int) -> None:
+    """Nothing but the connects and the backoffs take time."""
+    report = run_with_virtual_clock(run_policy(make_scenarios(500), max_attempts))
+    assert report.wall_times == pytest.approx(report.attempt_times)
+    assert report.connected
+    assert report == run_with_virtual_clock(
+        run_policy(make_scenarios(500), max_attempts)
+    )
+
+
+@pytest.mark.parametrize("max_attempts", [2, 4])
+def test_retry_policies(
+    benchmark: BenchmarkFixture,
+    benchmark_report: Callable[[str], None],
+    max_attempts: int,
+) -> None:
+    scenarios = make_scenarios()
+    reports: list[PolicyReport] = []
+
+    @benchmark
+    def _() -> None:
+        reports.append(run_with_virtual_clock(run_policy(scenarios, max_attempts)))
+
+    benchmark_report(f"max_attempts={max_attempts}: {reports[-1].summary()}")
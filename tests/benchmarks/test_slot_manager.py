@@ -0,0 +1,95 @@
+"""Benchmark the BleakSlotManager queries made by schedulers and UIs."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from pytest_codspeed import BenchmarkFixture
+
+from bleak_retry_connector import BleakSlotManager
+from tests.fake_bluez import AdapterProfile, FakeBlueZManager, installed
+
+from .conftest import ADAPTER_COUNT, make_address
+
+ADAPTERS = [f"hci{adapter}" for adapter in range(ADAPTER_COUNT)]
+SLOTS = 5
+QUERIES = 1000
+
+
+@pytest.fixture
+def full_slot_manager() -> BleakSlotManager:
+    """A slot manager with every slot of every adapter allocated."""
+    manager = FakeBlueZManager(
+        {adapter: AdapterProfile(slots=SLOTS) for adapter in ADAPTERS}
+    )
+    slot_manager = BleakSlotManager()
+    with installed(manager):
+        asyncio.run(slot_manager.async_setup())
+        for adapter in ADAPTERS:
+            slot_manager.register_adapter(adapter, SLOTS)
+            for index in range(SLOTS):
+                device = manager.add_device(
+                    make_address(ADAPTERS.index(adapter) * SLOTS + index), [adapter]
+                )
+                assert slot_manager.allocate_slot(device, ttl=None)
+    return slot_manager
+
+
+def test_get_allocations(
+    benchmark: BenchmarkFixture, full_slot_manager: BleakSlotManager
+) -> None:
+    @benchmark
+    def _() -> None:
+        for _ in range(QUERIES):
+            for adapter in ADAPTERS:
+                full_slot_manager.get_allocations(adapter)
+
+
+def test_adapter_for(
+    benchmark: BenchmarkFixture, full_slot_manager: BleakSlotManager
+) -> None:
+    addresses = [make_address(index) for index in range(ADAPTER_COUNT * SLOTS)]
+
+    @benchmark
+    def _() -> None:
+        for _ in range(QUERIES):
+            for address in addresses:
+                full_slot_manager.adapter_for(address)
+
+
+def _setup_slot_manager(
+    properties: dict[str, dict[str, dict[str, Any]]],
+) -> tuple[BleakSlotManager, FakeBlueZManager]:
+    manager = FakeBlueZManager({adapter: AdapterProfile() for adapter in ADAPTERS})
+    manager._properties = properties
+    slot_manager = BleakSlotManager()
+    with installed(manager):
+        asyncio.run(slot_manager.async_setup())
+    return slot_manager, manager
+
+
+def test_register_adapter_each(
+    benchmark: BenchmarkFixture,
+    bluez_properties: dict[str, dict[str, dict[str, Any]]],
+) -> None:
+    """Register every adapter of a 10k device bus one at a time."""
+
+    @benchmark
+    def _() -> None:
+        slot_manager, _manager = _setup_slot_manager(bluez_properties)
+        for adapter in ADAPTERS:
+            slot_manager.register_adapter(adapter, SLOTS)
+
+
+def test_register_adapters(
+    benchmark: BenchmarkFixture,
+    bluez_properties: dict[str, dict[str, dict[str, Any]]],
+) -> None:
+    """Register every adapter of a 10k device bus at once."""
+
+    @benchmark
+    def _() -> None:
+        slot_manager, _manager = _setup_slot_manager(bluez_properties)
+        slot_manager.register_adapters(dict.fromkeys(ADAPTERS, SLOTS))
@@ -1,11 +1,24 @@
+import asyncio
 import logging
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Iterator, Mapping
+from typing import Any
 from unittest.mock import patch
 
 import pytest
+import pytest_asyncio
 from blockbuster import BlockBuster, blockbuster_ctx
 
 import bleak_retry_connector
+from tests.virtual_clock import VirtualClockEventLoop, virtual_monotonic
+
+
+def pytest_asyncio_loop_factories(
+    config: pytest.Config, item: pytest.Item
+) -> Mapping[str, Any]:
+    """Run tests that use the virtual_clock fixture on a virtual clock loop."""
+    if "virtual_clock" in getattr(item, "fixturenames", ()):
+        return {"virtual_clock": VirtualClockEventLoop}
+    return {"default": asyncio.new_event_loop}
 
 
 @pytest.fixture(autouse=True)
@@ -19,12 +32,30 @@ def blockbuster() -> Iterator[BlockBuster]:
         yield bb
 
 
+@pytest.fixture(autouse=True)
+def reset_global_state(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Make sure connect outcomes from one test do not leak into another."""
+    # Some tests replace the BlueZ manager getters by assignment
+    for module, name in (
+        (bleak_retry_connector.bleak_manager, "get_global_bluez_manager"),
+        (bleak_retry_connector.bleak_manager, "get_global_bluez_manager_with_timeout"),
+        (bleak_retry_connector.bluez, "get_global_bluez_manager_with_timeout"),
+    ):
+        monkeypatch.setattr(module, name, getattr(module, name))
+    yield
+    bleak_retry_connector.get_adapter_health_tracker().clear()
+    bleak_retry_connector.get_metrics_registry().clear()
+    bleak_retry_connector.get_flight_recorder().clear()
+    bleak_retry_connector.bleak_manager._reset_dbus_socket_cache()
+
+
 @pytest.fixture()
 def mock_linux():
     with (
         patch.object(bleak_retry_connector, "IS_LINUX", True),
         patch.object(bleak_retry_connector.bluez, "IS_LINUX", True),
         patch.object(bleak_retry_connector.bleak_manager, "IS_LINUX", True),
+        patch.object(bleak_retry_connector.restore, "IS_LINUX", True),
         patch("bleak.backends.platform.system", return_value="Linux"),
     ):
         yield
@@ -36,5 +67,19 @@ def mock_macos():
         patch.object(bleak_retry_connector, "IS_LINUX", False),
         patch.object(bleak_retry_connector.bluez, "IS_LINUX", False),
         patch.object(bleak_retry_connector.bleak_manager, "IS_LINUX", False),
+        patch.object(bleak_retry_connector.restore, "IS_LINUX", False),
     ):
         yield
+
+
+@pytest_asyncio.fixture()
+async def virtual_clock() -> AsyncIterator[VirtualClockEventLoop]:
+    """Run the test on a loop where sleeps and timeouts complete instantly.
+
+    loop.time() and time.monotonic() start at zero and only move when
+    every task is waiting, so retry sequences run deterministically.
+    """
+    loop = asyncio.get_running_loop()
+    assert isinstance(loop, VirtualClockEventLoop)  # nosec
+    with virtual_monotonic(loop):
+        yield loop
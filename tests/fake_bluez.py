@@ -0,0 +1,293 @@
+"""An in-process BlueZ manager and client backend for simulated connects."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+from unittest.mock import patch
+
+from bleak.backends.bluezdbus import defs
+from bleak.backends.bluezdbus.manager import DeviceConditionCallback, DeviceWatcher
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakDBusError, BleakDeviceNotFoundError, BleakError
+
+import bleak_retry_connector
+import bleak_retry_connector.dbus
+from bleak_retry_connector import BleakClientWithServiceCache
+from bleak_retry_connector.bluez import adapter_from_path, ble_device_from_properties
+from bleak_retry_connector.util import asyncio_timeout
+
+
+def _abort() -> Exception:
+    return BleakDBusError("org.bluez.Error.Failed", ["le-connection-abort-by-local"])
+
+
+def _out_of_slots() -> Exception:
+    return BleakError("No available connection slots")
+
+
+def _device_missing() -> Exception:
+    return BleakDeviceNotFoundError("Device disappeared")
+
+
+def _failed() -> Exception:
+    return BleakDBusError(
+        "org.bluez.Error.Failed", ["Software caused connection abort"]
+    )
+
+
+def _eof() -> Exception:
+    return EOFError()
+
+
+ERRORS: dict[str, Callable[[], Exception]] = {
+    "abort": _abort,
+    "out_of_slots": _out_of_slots,
+    "device_missing": _device_missing,
+    "eof": _eof,
+    "failed": _failed,
+}
+
+
+@dataclass
+class AdapterProfile:
+    """How connects through an adapter behave."""
+
+    # Median seconds until a connect completes or fails; the
+    # connect times are log-normally distributed around it
+    latency: float = 1.0
+    # Spread of the log-normal distribution
+    jitter: float = 0.5
+    # Probability of each error in ERRORS, or "timeout" to never
+    # complete, per attempt
+    errors: dict[str, float] = field(default_factory=dict)
+    # Connection slots; connecting beyond them fails as out of slots
+    slots: int = 5
+
+
+class FakeMessageBus:
+    """The parts of the D-Bus message bus that are used."""
+
+    def __init__(self) -> None:
+        self._method_return_handlers: dict[int, Any] = {}
+        self.sent: list[Any] = []
+
+    async def send(self, message: Any) -> None:
+        self.sent.append(message)
+
+    async def call(self, message: Any) -> None:
+        self.sent.append(message)
+
+
+class FakeBlueZManager:
+    """A BlueZ manager that simulates connects with per-adapter behaviour.
+
+    Implements the private BlueZManager attributes bleak-retry-connector
+    uses so the real code paths run against it.
+    """
+
+    def __init__(self, adapters: dict[str, AdapterProfile], seed: int = 0) -> None:
+        self.adapters = adapters
+        self.random = random.Random(seed)
+        self._properties: dict[str, dict[str, dict[str, Any]]] = {}
+        self._services_cache: dict[str, Any] = {}
+        self._bus = FakeMessageBus()
+        self._advertisement_callbacks: defaultdict[str, list[Any]] = defaultdict(list)
+        self._condition_callbacks: dict[str, set[DeviceConditionCallback]] = {}
+        self._device_watchers: dict[str, set[DeviceWatcher]] = {}
+        self.connects: dict[str, int] = defaultdict(int)
+        self._connected: dict[str, int] = defaultdict(int)
+        self._scripts: dict[str, deque[str | None]] = {}
+        for adapter in adapters:
+            self._properties[f"/org/bluez/{adapter}"] = {
+                defs.ADAPTER_INTERFACE: {"Address": "00:00:00:00:00:00"}
+            }
+
+    def add_device(
+        self, address: str, adapters: list[str] | None = None, rssi: int = -60
+    ) -> BLEDevice:
+        """Make a device visible on adapters and return it on the first one."""
+        paths = [
+            f"/org/bluez/{adapter}/dev_{address.replace(':', '_')}"
+            for adapter in (adapters or list(self.adapters))
+        ]
+        for path in paths:
+            self._properties[path] = {
+                defs.DEVICE_INTERFACE: {
+                    "Address": address,
+                    "Alias": address,
+                    "Adapter": path[:15],
+                    "RSSI": rssi,
+                    "Connected": False,
+                }
+            }
+        return ble_device_from_properties(
+            paths[0], self._properties[paths[0]][defs.DEVICE_INTERFACE]
+        )
+
+    def script(self, path: str, outcomes: list[str | None]) -> None:
+        """Make the next connects of a device fail with these errors.
+
+        None is a successful connect; the random error mix of the
+        adapter applies again once the script runs out.
+        """
+        self._scripts[path] = deque(outcomes)
+
+    def connected_count(self, adapter: str) -> int:
+        """Return the number of connected devices on an adapter."""
+        return self._connected[adapter]
+
+    def set_connected(self, path: str, connected: bool) -> None:
+        """Change the Connected property and notify watchers like BlueZ."""
+        props = self._properties[path][defs.DEVICE_INTERFACE]
+        if props["Connected"] != connected:
+            self._connected[adapter_from_path(path)] += 1 if connected else -1
+        props["Connected"] = connected
+        # BlueZManager iterates the conditions without copying them
+        for condition in self._condition_callbacks.get(path, ()):
+            if condition.property_name == "Connected":
+                condition.callback(connected)
+        for watcher in list(self._device_watchers.get(path, ())):
+            watcher.on_connected_changed(connected)
+
+    def is_connected(self, path: str) -> bool:
+        try:
+            return bool(self._properties[path][defs.DEVICE_INTERFACE]["Connected"])
+        except KeyError:
+            return False
+
+    async def _wait_condition(
+        self, device_path: str, property_name: str, property_value: Any
+    ) -> None:
+        if device_path not in self._properties:
+            raise BleakError(f"{device_path} not found")
+        props = self._properties[device_path][defs.DEVICE_INTERFACE]
+        if props.get(property_name) == property_value:
+            return
+        event = asyncio.Event()
+
+        def _callback(new_value: Any) -> None:
+            if new_value == property_value:
+                event.set()
+
+        callbacks = self._condition_callbacks.setdefault(device_path, set())
+        condition = DeviceConditionCallback(_callback, property_name)
+        callbacks.add(condition)
+        try:
+            await event.wait()
+        finally:
+            callbacks.discard(condition)
+            if not callbacks:
+                del self._condition_callbacks[device_path]
+
+    def add_device_watcher(
+        self,
+        device_path: str,
+        on_connected_changed: Callable[[bool], None],
+        on_characteristic_value_changed: Callable[[str, bytes], None],
+    ) -> DeviceWatcher:
+        watcher = DeviceWatcher(
+            device_path, on_connected_changed, on_characteristic_value_changed
+        )
+        self._device_watchers.setdefault(device_path, set()).add(watcher)
+        return watcher
+
+    def remove_device_watcher(self, watcher: DeviceWatcher) -> None:
+        self._device_watchers[watcher.device_path].discard(watcher)
+
+    async def connect(self, path: str) -> None:
+        """Simulate a connect through the adapter of the path."""
+        adapter = adapter_from_path(path)
+        profile = self.adapters[adapter]
+        self.connects[adapter] += 1
+        delay = profile.latency * self.random.lognormvariate(0, profile.jitter)
+        error: str | None = None
+        if script := self._scripts.get(path):
+            error = script.popleft()
+        else:
+            roll = self.random.random()
+            for name, probability in profile.errors.items():
+                if roll < probability:
+                    error = name
+                    break
+                roll -= probability
+        if error == "timeout":
+            # Never completes; the caller's timeout fires
+            await asyncio.Event().wait()
+        await asyncio.sleep(delay)
+        if error is None and self.connected_count(adapter) >= profile.slots:
+            error = "out_of_slots"
+        if error is not None:
+            raise ERRORS[error]()
+        self.set_connected(path, True)
+
+    def disconnect(self, path: str) -> None:
+        """Simulate a disconnect."""
+        if self.is_connected(path):
+            self.set_connected(path, False)
+
+
+def make_client_class(
+    manager: FakeBlueZManager,
+) -> type[BleakClientWithServiceCache]:
+    """Make a client class that connects through the fake manager."""
+
+    class FakeBleakClient(BleakClientWithServiceCache):
+        def __init__(
+            self,
+            device: BLEDevice,
+            disconnected_callback: Callable[[Any], None] | None = None,
+            **kwargs: Any,
+        ) -> None:
+            self._device = device
+            self._path: str = device.details["path"]
+
+        @property
+        def is_connected(self) -> bool:
+            return manager.is_connected(self._path)
+
+        async def connect(self, timeout: float = 20.0, **kwargs: Any) -> None:
+            async with asyncio_timeout(timeout):
+                await manager.connect(self._path)
+
+        async def disconnect(self) -> None:
+            manager.disconnect(self._path)
+
+        async def clear_cache(self) -> bool:
+            return manager._services_cache.pop(self._path, None) is not None
+
+    return FakeBleakClient
+
+
+@contextlib.contextmanager
+def installed(manager: FakeBlueZManager) -> Iterator[None]:
+    """Make bleak-retry-connector use the fake manager as the BlueZ manager."""
+
+    async def _get_manager() -> FakeBlueZManager:
+        return manager
+
+    with (
+        patch.object(bleak_retry_connector, "IS_LINUX", True),
+        patch.object(bleak_retry_connector.bluez, "IS_LINUX", True),
+        patch.object(bleak_retry_connector.bleak_manager, "IS_LINUX", True),
+        patch.object(bleak_retry_connector.restore, "IS_LINUX", True),
+        patch.object(bleak_retry_connector.bluez, "defs", defs),
+        patch.object(bleak_retry_connector, "get_bluez_manager", lambda: manager),
+        patch.object(bleak_retry_connector.bluez, "get_bluez_manager", lambda: manager),
+        patch.object(
+            bleak_retry_connector.bluez,
+            "get_global_bluez_manager_with_timeout",
+            _get_manager,
+        ),
+        patch.object(
+            bleak_retry_connector.dbus,
+            "get_global_bluez_manager_with_timeout",
+            _get_manager,
+        ),
+    ):
+        yield
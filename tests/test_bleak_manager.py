@@ -3,15 +3,28 @@
 from __future__ import annotations
 
 import asyncio
+from typing import Any
 from unittest.mock import AsyncMock
 
 import pytest
 
 import bleak_retry_connector
+from bleak_retry_connector import WarmUpReport
 from bleak_retry_connector.bleak_manager import (
     _reset_dbus_socket_cache,
+    get_bluez_manager,
     get_global_bluez_manager_with_timeout,
+    register_bluez_manager_callback,
+    warm_up,
 )
+from bleak_retry_connector.const import (
+    DBUS_CONNECT_TIMEOUT,
+    DBUS_REPROBE_INTERVAL,
+    DBUS_REPROBE_MAX_INTERVAL,
+    DBUS_REPROBE_MAX_TRIES,
+)
+from tests.fake_bluez import AdapterProfile, FakeBlueZManager
+from tests.virtual_clock import VirtualClockEventLoop
 
 pytestmark = pytest.mark.asyncio
 
@@ -114,6 +127,24 @@ async def test_returns_manager_on_success(mock_linux, monkeypatch):
     mock_get.assert_awaited_once()
 
 
+async def test_returns_none_without_bluez_backend(
+    mock_linux: None,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """When bleak's BlueZ backend cannot be imported there is no manager."""
+    monkeypatch.setattr(bleak_retry_connector.bleak_manager, "_global_instances", {})
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "get_global_bluez_manager", None
+    )
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "_load_bluez_manager", lambda: None
+    )
+
+    assert await get_global_bluez_manager_with_timeout() is None
+    assert "failed" not in caplog.text
+
+
 async def test_reset_dbus_socket_cache_re_enables_retries(mock_linux, monkeypatch):
     """_reset_dbus_socket_cache() lets the helper retry after a cached failure."""
     monkeypatch.setattr(bleak_retry_connector.bleak_manager, "_global_instances", {})
@@ -139,3 +170,240 @@ async def test_reset_dbus_socket_cache_re_enables_retries(mock_linux, monkeypatc
     # After reset, the helper tries again and gets the manager.
     assert await get_global_bluez_manager_with_timeout() is sentinel_manager
     assert mock_get.call_count == 2
+
+
+async def test_get_bluez_manager(mock_linux, monkeypatch):
+    """get_bluez_manager returns the manager of the running loop without connecting."""
+    instances: dict[asyncio.AbstractEventLoop, object] = {}
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "_global_instances", instances
+    )
+    manager: Any = FakeBlueZManager({"hci0": AdapterProfile()})
+    mock_get = AsyncMock(return_value=manager)
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "get_global_bluez_manager", mock_get
+    )
+    assert get_bluez_manager() is None
+
+    instances[asyncio.get_running_loop()] = manager
+    assert get_bluez_manager() is manager
+    mock_get.assert_not_called()
+
+    # bleak registers the manager before it has connected
+    monkeypatch.setattr(manager, "_bus", None)
+    assert get_bluez_manager() is None
+
+
+async def test_get_bluez_manager_non_linux(mock_macos, monkeypatch):
+    """get_bluez_manager returns None on non-Linux platforms."""
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager,
+        "_global_instances",
+        {asyncio.get_running_loop(): object()},
+    )
+    assert get_bluez_manager() is None
+
+
+async def test_reprobes_in_background_until_dbus_is_available(
+    mock_linux: None,
+    monkeypatch: pytest.MonkeyPatch,
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """DBus is re-probed with backoff and callbacks run once it connects."""
+    monkeypatch.setattr(bleak_retry_connector.bleak_manager, "_global_instances", {})
+    sentinel_manager = object()
+    mock_get = AsyncMock(
+        side_effect=[
+            FileNotFoundError(2, "no such file", "/run/dbus"),
+            FileNotFoundError(2, "no such file", "/run/dbus"),
+            FileNotFoundError(2, "no such file", "/run/dbus"),
+            sentinel_manager,
+        ]
+    )
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "get_global_bluez_manager", mock_get
+    )
+    available: list[tuple[object, float]] = []
+    unregister = register_bluez_manager_callback(
+        lambda manager: available.append((manager, virtual_clock.time()))
+    )
+
+    assert await get_global_bluez_manager_with_timeout() is None
+    assert mock_get.call_count == 1
+
+    # Callers get the negative fast path while the re-probe backs off
+    await asyncio.sleep(DBUS_REPROBE_INTERVAL + 1)
+    assert await get_global_bluez_manager_with_timeout() is None
+    assert mock_get.call_count == 2
+    assert available == []
+
+    await asyncio.sleep(DBUS_REPROBE_INTERVAL * 6)
+    assert mock_get.call_count == 4
+    assert available == [(sentinel_manager, DBUS_REPROBE_INTERVAL * 7)]
+
+    # Callers connect again once DBus is available
+    mock_get.side_effect = None
+    mock_get.return_value = sentinel_manager
+    assert await get_global_bluez_manager_with_timeout() is sentinel_manager
+    unregister()
+
+
+async def test_reprobe_backoff_is_capped(
+    mock_linux: None,
+    monkeypatch: pytest.MonkeyPatch,
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """A DBus that never answers is probed at most every DBUS_REPROBE_MAX_INTERVAL."""
+    monkeypatch.setattr(bleak_retry_connector.bleak_manager, "_global_instances", {})
+    probes: list[float] = []
+
+    async def _never_connects() -> None:
+        probes.append(virtual_clock.time())
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "get_global_bluez_manager", _never_connects
+    )
+
+    assert await get_global_bluez_manager_with_timeout() is None
+    assert virtual_clock.time() == DBUS_CONNECT_TIMEOUT
+    await asyncio.sleep(3600)
+    intervals = [
+        end - start - DBUS_CONNECT_TIMEOUT for start, end in zip(probes, probes[1:])
+    ]
+    assert intervals[:4] == pytest.approx(
+        [DBUS_REPROBE_INTERVAL * 2**n for n in range(4)]
+    )
+    assert max(intervals) == pytest.approx(DBUS_REPROBE_MAX_INTERVAL)
+
+
+async def test_concurrent_callers_share_one_connect(
+    mock_linux: None,
+    monkeypatch: pytest.MonkeyPatch,
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """Callers that arrive while D-Bus is being probed wait for the same probe."""
+    monkeypatch.setattr(bleak_retry_connector.bleak_manager, "_global_instances", {})
+    probes: list[float] = []
+
+    async def _never_connects() -> None:
+        probes.append(virtual_clock.time())
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "get_global_bluez_manager", _never_connects
+    )
+
+    first = asyncio.create_task(get_global_bluez_manager_with_timeout())
+    await asyncio.sleep(1)
+    cancelled = asyncio.create_task(get_global_bluez_manager_with_timeout())
+    second = asyncio.create_task(get_global_bluez_manager_with_timeout())
+    await asyncio.sleep(1)
+    cancelled.cancel()
+    assert await first is None
+    assert await second is None
+    assert virtual_clock.time() == DBUS_CONNECT_TIMEOUT
+    assert probes == [0]
+
+
+async def test_reprobe_gives_up_until_needed(
+    mock_linux: None,
+    monkeypatch: pytest.MonkeyPatch,
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """A host without a system bus is re-probed a bounded number of times."""
+    monkeypatch.setattr(bleak_retry_connector.bleak_manager, "_global_instances", {})
+    mock_get = AsyncMock(side_effect=FileNotFoundError(2, "no such file", "/run/dbus"))
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "get_global_bluez_manager", mock_get
+    )
+
+    assert await get_global_bluez_manager_with_timeout() is None
+    await asyncio.sleep(86400)
+    assert mock_get.call_count == 1 + DBUS_REPROBE_MAX_TRIES
+
+    # The next caller probes again and starts a new re-probe
+    assert await get_global_bluez_manager_with_timeout() is None
+    assert mock_get.call_count == 2 + DBUS_REPROBE_MAX_TRIES
+    await asyncio.sleep(DBUS_REPROBE_INTERVAL + 1)
+    assert mock_get.call_count == 3 + DBUS_REPROBE_MAX_TRIES
+
+
+async def test_reprobe_callback_errors_are_logged(
+    mock_linux: None,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """A failing callback does not stop the others."""
+    monkeypatch.setattr(bleak_retry_connector.bleak_manager, "_global_instances", {})
+    sentinel_manager = object()
+    mock_get = AsyncMock(
+        side_effect=[asyncio.TimeoutError(), RuntimeError("boom"), sentinel_manager]
+    )
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "get_global_bluez_manager", mock_get
+    )
+    available: list[object] = []
+
+    def _broken(manager: object) -> None:
+        raise ValueError("broken")
+
+    unregister_broken = register_bluez_manager_callback(_broken)
+    unregister = register_bluez_manager_callback(available.append)
+
+    assert await get_global_bluez_manager_with_timeout() is None
+    await asyncio.sleep(DBUS_REPROBE_INTERVAL * 4)
+    assert available == [sentinel_manager]
+    assert "Error in callback" in caplog.text
+    unregister_broken()
+    unregister()
+
+
+async def test_warm_up(
+    mock_linux: None,
+    monkeypatch: pytest.MonkeyPatch,
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """warm_up connects the manager and reports how long each phase took."""
+    monkeypatch.setattr(bleak_retry_connector.bleak_manager, "_global_instances", {})
+    manager = FakeBlueZManager({"hci0": AdapterProfile(), "hci1": AdapterProfile()})
+    manager.add_device("FA:23:9D:AA:45:46")
+    manager.add_device("FA:23:9D:AA:45:47", ["hci1"])
+
+    async def _connect() -> FakeBlueZManager:
+        # Connecting to D-Bus and GetManagedObjects
+        await asyncio.sleep(0.5)
+        return manager
+
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "get_global_bluez_manager", _connect
+    )
+
+    report = await warm_up()
+    assert report.manager is True
+    assert report.adapters == 2
+    assert report.devices == 3
+    assert list(report.phases) == ["imports", "manager", "properties"]
+    assert report.phases["manager"] == 0.5
+
+
+async def test_warm_up_without_dbus(
+    mock_linux: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """warm_up reports when D-Bus is not available."""
+    monkeypatch.setattr(bleak_retry_connector.bleak_manager, "_global_instances", {})
+    mock_get = AsyncMock(side_effect=FileNotFoundError(2, "no such file", "/run/dbus"))
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "get_global_bluez_manager", mock_get
+    )
+
+    report = await warm_up()
+    assert report.manager is False
+    assert list(report.phases) == ["imports", "manager"]
+
+
+async def test_warm_up_non_linux(mock_macos: None) -> None:
+    """warm_up does nothing on non-Linux platforms."""
+    assert await warm_up() == WarmUpReport()
@@ -1,6 +1,11 @@
+import asyncio
+import gc
+import time
+from collections import defaultdict
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
+import dbus_fast.message
 import pytest
 from bleak.backends.bluezdbus import defs
 from bleak.backends.bluezdbus.manager import DeviceWatcher
@@ -14,19 +19,28 @@ from bleak_retry_connector import (
     Allocations,
     BleakSlotManager,
     device_source,
+    get_flight_recorder,
 )
+from bleak_retry_connector.attempts import ConnectionErrorCategory
 from bleak_retry_connector.bluez import (
     adapter_path_from_device_path,
+    address_from_path,
     ble_device_from_properties,
     clear_cache,
+    device_is_absent,
     get_bluez_device,
     get_connected_devices,
     get_device_by_adapter,
     path_from_ble_device,
     stop_discovery,
+    wait_for_advertisement,
     wait_for_device_to_reappear,
     wait_for_disconnect,
 )
+from bleak_retry_connector.const import DISCONNECT_TIMEOUT, REAPPEAR_WAIT_INTERVAL
+from bleak_retry_connector.metrics import DISCONNECT_WAIT_SECONDS
+from tests.fake_bluez import AdapterProfile, FakeBlueZManager, installed
+from tests.virtual_clock import VirtualClockEventLoop
 
 pytestmark = pytest.mark.asyncio
 
@@ -36,7 +50,7 @@ async def test_slot_manager(mock_linux):
 
     class FakeBluezManager:
         def __init__(self):
-            self.watchers: set[DeviceWatcher] = set()
+            self._condition_callbacks: dict[str, set[Any]] = {}
             self._properties = {
                 "/org/bluez/hci0/dev_FA_23_9D_AA_45_46": {
                     "UUID": "service",
@@ -86,16 +100,6 @@ async def test_slot_manager(mock_linux):
                 },
             }
 
-        def add_device_watcher(self, path: str, **kwargs: Any) -> DeviceWatcher:
-            """Add a watcher for device changes."""
-            watcher = DeviceWatcher(path, **kwargs)
-            self.watchers.add(watcher)
-            return watcher
-
-        def remove_device_watcher(self, watcher: DeviceWatcher) -> None:
-            """Remove a watcher for device changes."""
-            self.watchers.remove(watcher)
-
         def is_connected(self, path: str) -> bool:
             """Check if device is connected."""
             return False
@@ -186,8 +190,14 @@ async def test_slot_manager(mock_linux):
         "hci0",
         1,
         0,
-        ["FA:23:9D:AA:45:46"],
+        ("FA:23:9D:AA:45:46",),
+        0,
+        1,
     )
+    metrics = bleak_retry_connector.render_metrics()
+    assert 'bleak_retry_connector_slots{adapter="hci0"} 1' in metrics
+    assert 'bleak_retry_connector_slots_allocated{adapter="hci0"} 1' in metrics
+    assert 'bleak_retry_connector_slots_allocated{adapter="hci1"} 1' in metrics
 
     # Make sure we can allocate the same device again
     assert slot_manager.allocate_slot(ble_device_hci0) is True
@@ -206,7 +216,9 @@ async def test_slot_manager(mock_linux):
         "hci0",
         1,
         0,
-        ["FA:23:9D:AA:45:46"],
+        ("FA:23:9D:AA:45:46",),
+        0,
+        1,
     )
     assert slot_manager.allocate_slot(ble_device_hci0_2) is False
     assert changes == [
@@ -224,12 +236,14 @@ async def test_slot_manager(mock_linux):
         "hci0",
         1,
         0,
-        ["FA:23:9D:AA:45:46"],
+        ("FA:23:9D:AA:45:46",),
+        0,
+        1,
     )
-    watcher: DeviceWatcher = slot_manager._allocations_by_adapter["hci0"][
+    condition = slot_manager._allocations_by_adapter["hci0"][
         "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"
     ]
-    watcher.on_connected_changed(True)
+    condition.callback(True)
     assert slot_manager._get_allocations("hci0") == [
         "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"
     ]
@@ -237,7 +251,9 @@ async def test_slot_manager(mock_linux):
         "hci0",
         1,
         0,
-        ["FA:23:9D:AA:45:46"],
+        ("FA:23:9D:AA:45:46",),
+        0,
+        1,
     )
     assert changes == [
         (
@@ -247,7 +263,7 @@ async def test_slot_manager(mock_linux):
             "FA:23:9D:AA:45:46",
         ),
     ]
-    watcher.on_connected_changed(False)
+    condition.callback(False)
     assert changes == [
         (
             AllocationChange.ALLOCATED,
@@ -267,7 +283,7 @@ async def test_slot_manager(mock_linux):
         "hci0",
         1,
         1,
-        [],
+        (),
     )
     assert slot_manager.allocate_slot(ble_device_hci0) is True
     assert slot_manager._get_allocations("hci0") == [
@@ -277,7 +293,9 @@ async def test_slot_manager(mock_linux):
         "hci0",
         1,
         0,
-        ["FA:23:9D:AA:45:46"],
+        ("FA:23:9D:AA:45:46",),
+        0,
+        1,
     )
     assert changes == [
         (
@@ -307,8 +325,20 @@ async def test_slot_manager(mock_linux):
             "hci1": ["/org/bluez/hci1/dev_FA_23_9D_AA_45_46"],
             "hci2": ["/org/bluez/hci2/dev_FA_23_9D_AA_45_46"],
         },
+        "adapter_health": {},
+        "flight_recorder": ANY,
         "manager": True,
     }
+    assert [
+        (event["event"], event["adapter"])
+        for event in slot_manager.diagnostics()["flight_recorder"]["FA:23:9D:AA:45:46"]
+    ] == [
+        ("slot_allocated", "hci1"),
+        ("slot_allocated", "hci2"),
+        ("slot_allocated", "hci0"),
+        ("slot_released", "hci0"),
+        ("slot_allocated", "hci0"),
+    ]
 
     slot_manager.release_slot(ble_device_hci0)
     assert changes == [
@@ -342,7 +372,7 @@ async def test_slot_manager(mock_linux):
         "hci0",
         1,
         1,
-        [],
+        (),
     )
     assert slot_manager.allocate_slot(ble_device_hci0) is True
     assert changes == [
@@ -384,7 +414,9 @@ async def test_slot_manager(mock_linux):
         "hci0",
         1,
         0,
-        ["FA:23:9D:AA:45:46"],
+        ("FA:23:9D:AA:45:46",),
+        0,
+        1,
     )
     slot_manager.remove_adapter("hci0")
     assert changes == [
@@ -494,7 +526,7 @@ async def test_slot_manager_adapter_removal_during_disconnect(mock_linux):
 
     class FakeBluezManager:
         def __init__(self):
-            self.watchers: set[DeviceWatcher] = set()
+            self._condition_callbacks: dict[str, set[Any]] = {}
             self._properties = {
                 "/org/bluez/hci1/dev_FA_23_9D_AA_45_46": {
                     defs.DEVICE_INTERFACE: {
@@ -506,16 +538,6 @@ async def test_slot_manager_adapter_removal_during_disconnect(mock_linux):
                 },
             }
 
-        def add_device_watcher(self, path: str, **kwargs: Any) -> DeviceWatcher:
-            """Add a watcher for device changes."""
-            watcher = DeviceWatcher(path, **kwargs)
-            self.watchers.add(watcher)
-            return watcher
-
-        def remove_device_watcher(self, watcher: DeviceWatcher) -> None:
-            """Remove a watcher for device changes."""
-            self.watchers.discard(watcher)
-
         def is_connected(self, path: str) -> bool:
             """Check if device is connected."""
             return False
@@ -543,8 +565,8 @@ async def test_slot_manager_adapter_removal_during_disconnect(mock_linux):
     # Allocate the slot
     assert slot_manager.allocate_slot(ble_device) is True
 
-    # Store the watcher to simulate disconnect event later
-    watcher: DeviceWatcher = slot_manager._allocations_by_adapter["hci1"][
+    # Store the condition to simulate disconnect event later
+    condition = slot_manager._allocations_by_adapter["hci1"][
         "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"
     ]
 
@@ -553,11 +575,11 @@ async def test_slot_manager_adapter_removal_during_disconnect(mock_linux):
 
     # Now simulate the disconnect event firing after adapter removal
     # This should not raise a KeyError
-    watcher.on_connected_changed(False)
+    condition.callback(False)
 
     # Verify the adapter is gone and methods handle it gracefully
     assert slot_manager._get_allocations("hci1") == []
-    assert slot_manager.get_allocations("hci1") == Allocations("hci1", 0, 0, [])
+    assert slot_manager.get_allocations("hci1") == Allocations("hci1", 0, 0, ())
 
 
 async def test_slot_manager_mac_os():
@@ -604,6 +626,368 @@ async def test_slot_manager_mac_os():
     slot_manager.remove_adapter("hci0")
 
 
+async def test_slot_manager_reallocates_from_release_callback() -> None:
+    """A slot can be allocated again from the callback of its release."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    device = manager.add_device("FA:23:9D:AA:45:46", ["hci0"])
+    path = device.details["path"]
+    with installed(manager):
+        slot_manager = BleakSlotManager()
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 1)
+
+        def _reallocate(event: AllocationChangeEvent) -> None:
+            if event.change is AllocationChange.RELEASED:
+                assert slot_manager.allocate_slot(device)
+
+        unregister = slot_manager.register_allocation_callback(_reallocate)
+        assert slot_manager.allocate_slot(device)
+        manager.set_connected(path, True)
+        manager.set_connected(path, False)
+        await asyncio.sleep(0)
+        assert slot_manager.is_allocated("FA:23:9D:AA:45:46")
+        assert len(manager._condition_callbacks[path]) == 1
+
+        # The condition kept from the first allocation watches the second
+        unregister()
+        manager.set_connected(path, True)
+        manager.set_connected(path, False)
+        await asyncio.sleep(0)
+        assert not slot_manager.is_allocated("FA:23:9D:AA:45:46")
+
+
+async def test_slot_manager_address_index_and_snapshots() -> None:
+    """Allocations are cached until a slot changes and addresses are indexed."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile(), "hci1": AdapterProfile()})
+    device_hci0 = manager.add_device("FA:23:9D:AA:45:46", ["hci0"])
+    device_hci1 = manager.add_device("FA:23:9D:AA:45:47", ["hci1"])
+    with installed(manager):
+        slot_manager = BleakSlotManager()
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 2)
+        slot_manager.register_adapter("hci1", 2)
+
+        allocations = slot_manager.get_allocations("hci0")
+        assert allocations == Allocations("hci0", 2, 2, ())
+        assert slot_manager.get_allocations("hci0") is allocations
+        assert slot_manager.is_allocated("FA:23:9D:AA:45:46") is False
+        assert slot_manager.adapter_for("FA:23:9D:AA:45:46") is None
+
+        assert slot_manager.allocate_slot(device_hci0) is True
+        hci1_allocations = slot_manager.get_allocations("hci1")
+        assert slot_manager.get_allocations("hci0") == Allocations(
+            "hci0", 2, 1, ("FA:23:9D:AA:45:46",), 0, 1
+        )
+        assert slot_manager.is_allocated("fa:23:9d:aa:45:46") is True
+        assert slot_manager.adapter_for("FA:23:9D:AA:45:46") == "hci0"
+
+        assert slot_manager.allocate_slot(device_hci1) is True
+        assert slot_manager.adapter_for("FA:23:9D:AA:45:47") == "hci1"
+        assert slot_manager.get_allocations("hci1") is not hci1_allocations
+
+        manager.set_connected(device_hci0.details["path"], True)
+        manager.set_connected(device_hci0.details["path"], False)
+        assert slot_manager.get_allocations("hci0") == Allocations("hci0", 2, 2, ())
+        assert slot_manager.is_allocated("FA:23:9D:AA:45:46") is False
+
+        slot_manager.remove_adapter("hci1")
+        assert slot_manager.is_allocated("FA:23:9D:AA:45:47") is False
+        assert slot_manager.get_allocations("hci1") == Allocations("hci1", 0, 0, ())
+
+
+async def test_slot_manager_adapter_health_diagnostics() -> None:
+    """The diagnostics report the adapter health tracker of the manager."""
+    adapter_health = bleak_retry_connector.AdapterHealthTracker()
+    adapter_health.record_failure("hci1")
+    slot_manager = BleakSlotManager(adapter_health=adapter_health)
+    assert list(slot_manager.diagnostics()["adapter_health"]) == ["hci1"]
+    assert BleakSlotManager().diagnostics()["adapter_health"] == {}
+
+
+async def test_slot_manager_register_adapters() -> None:
+    """Connected devices of every registered adapter are allocated in one pass."""
+    manager = FakeBlueZManager(
+        {"hci0": AdapterProfile(), "hci1": AdapterProfile(), "hci2": AdapterProfile()}
+    )
+    for index, adapter in enumerate(["hci0", "hci1", "hci1", "hci2"]):
+        device = manager.add_device(f"FA:23:9D:AA:45:4{index}", [adapter])
+        manager.set_connected(device.details["path"], True)
+    manager.add_device("FA:23:9D:AA:45:50", ["hci0"])
+    with installed(manager):
+        slot_manager = BleakSlotManager()
+        await slot_manager.async_setup()
+        slot_manager.register_adapters({"hci0": 2, "hci1": 3})
+
+    assert slot_manager.get_allocations("hci0") == Allocations(
+        "hci0", 2, 1, ("FA:23:9D:AA:45:40",), 0, 1
+    )
+    assert slot_manager.get_allocations("hci1") == Allocations(
+        "hci1", 3, 1, ("FA:23:9D:AA:45:41", "FA:23:9D:AA:45:42"), 0, 2
+    )
+    assert slot_manager.get_allocations("hci2") == Allocations("hci2", 0, 0, ())
+    assert slot_manager.adapter_for("FA:23:9D:AA:45:43") is None
+
+
+async def _connected_slot_manager(
+    manager: FakeBlueZManager, count: int
+) -> BleakSlotManager:
+    """Make a slot manager with count connected devices on hci0."""
+    slot_manager = BleakSlotManager()
+    await slot_manager.async_setup()
+    slot_manager.register_adapter("hci0", count)
+    for index in range(count):
+        device = manager.add_device(f"FA:23:9D:AA:45:{index:02X}", ["hci0"])
+        assert slot_manager.allocate_slot(device)
+        manager.set_connected(device.details["path"], True)
+    return slot_manager
+
+
+async def test_slot_manager_watches_connected_condition() -> None:
+    """Slots are tracked with a Connected condition instead of a DeviceWatcher."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    with installed(manager):
+        slot_manager = await _connected_slot_manager(manager, 2)
+        paths = list(manager._condition_callbacks)
+        assert len(paths) == 2
+        assert not manager._device_watchers
+
+        manager.set_connected(paths[0], False)
+        assert slot_manager.get_allocations("hci0").free == 1
+        # The condition is removed once the dispatch that released it is done
+        assert paths[0] in manager._condition_callbacks
+        await asyncio.sleep(0)
+        assert paths[0] not in manager._condition_callbacks
+
+        device = ble_device_from_properties(
+            paths[0], manager._properties[paths[0]][defs.DEVICE_INTERFACE]
+        )
+        assert slot_manager.allocate_slot(device)
+        manager.set_connected(paths[0], True)
+        manager.set_connected(paths[0], False)
+        assert slot_manager.get_allocations("hci0").free == 1
+        await asyncio.sleep(0)
+        assert list(manager._condition_callbacks) == [paths[1]]
+
+
+async def test_slot_manager_reservations(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """A slot is reserved until the device connects or the ttl passes."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    devices = [
+        manager.add_device(f"FA:23:9D:AA:45:4{index}", ["hci0"]) for index in range(4)
+    ]
+    paths = [device.details["path"] for device in devices]
+    with installed(manager):
+        slot_manager = BleakSlotManager()
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 4)
+        for device in devices[:3]:
+            assert slot_manager.allocate_slot(device, ttl=10.0)
+        assert slot_manager.allocate_slot(devices[3], ttl=None)
+        allocations = slot_manager.get_allocations("hci0")
+        assert (allocations.pending, allocations.established) == (3, 1)
+
+        manager.set_connected(paths[0], True)
+        allocations = slot_manager.get_allocations("hci0")
+        assert (allocations.pending, allocations.established) == (2, 2)
+
+        await asyncio.sleep(5.0)
+        # Allocating a reserved slot again restarts its ttl
+        assert slot_manager.allocate_slot(devices[1], ttl=10.0)
+        # Connected without the condition seeing it
+        manager._properties[paths[2]][defs.DEVICE_INTERFACE]["Connected"] = True
+        await asyncio.sleep(5.0)
+
+        assert slot_manager.get_allocations("hci0") == Allocations(
+            "hci0",
+            4,
+            0,
+            tuple(address_from_path(path) for path in paths),
+            1,
+            3,
+        )
+        await asyncio.sleep(5.0)
+        assert slot_manager.get_allocations("hci0") == Allocations(
+            "hci0",
+            4,
+            1,
+            tuple(address_from_path(path) for path in (paths[0], paths[2], paths[3])),
+            0,
+            3,
+        )
+        assert [
+            event["event"]
+            for event in get_flight_recorder().diagnostics()["FA:23:9D:AA:45:41"]
+        ] == ["slot_allocated", "slot_expired", "slot_released"]
+
+        await asyncio.sleep(60.0)
+        assert slot_manager.get_allocations("hci0").established == 3
+
+
+async def test_slot_manager_reallocating_cancels_reservation() -> None:
+    """Allocating a reserved slot without a ttl makes it established."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    device = manager.add_device("FA:23:9D:AA:45:40", ["hci0"])
+    with installed(manager):
+        slot_manager = BleakSlotManager()
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 2)
+        assert slot_manager.allocate_slot(device, ttl=10.0)
+        assert slot_manager.get_allocations("hci0").pending == 1
+        assert slot_manager.allocate_slot(device)
+        allocations = slot_manager.get_allocations("hci0")
+        assert (allocations.pending, allocations.established) == (0, 1)
+
+
+async def test_slot_manager_coalesced_allocation_callback(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """A mass disconnect reaches a coalesced callback as one batch."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    batches: list[list[AllocationChangeEvent]] = []
+
+    def _failing_callback(events: list[AllocationChangeEvent]) -> None:
+        raise Exception("Test")
+
+    with installed(manager):
+        slot_manager = await _connected_slot_manager(manager, 3)
+        slot_manager.register_coalesced_allocation_callback(_failing_callback, 1.0)
+        unregister = slot_manager.register_coalesced_allocation_callback(
+            batches.append, 1.0
+        )
+        for path in list(manager._condition_callbacks):
+            manager.set_connected(path, False)
+        assert batches == []
+        await asyncio.sleep(1.0)
+        assert len(batches) == 1
+        assert [event.change for event in batches[0]] == [AllocationChange.RELEASED] * 3
+        assert batches[0][0] is not batches[0][1]
+
+        device = manager.add_device("FA:23:9D:AA:45:46", ["hci0"])
+        assert slot_manager.allocate_slot(device)
+        unregister()
+        await asyncio.sleep(2.0)
+        assert len(batches) == 1
+
+
+async def test_slot_manager_events() -> None:
+    """Allocation changes can be iterated and slow consumers lose the oldest."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    with installed(manager):
+        slot_manager = BleakSlotManager()
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 5)
+        events = slot_manager.events(maxsize=2)
+        next_event = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0)
+        for index in range(4):
+            device = manager.add_device(f"FA:23:9D:AA:45:4{index}", ["hci0"])
+            assert slot_manager.allocate_slot(device)
+
+        assert (await next_event).address == "FA:23:9D:AA:45:42"
+        assert (await anext(events)).address == "FA:23:9D:AA:45:43"
+        assert len(slot_manager._callbacks) == 1
+        await events.aclose()
+        assert not slot_manager._callbacks
+        with pytest.raises(StopAsyncIteration):
+            await anext(events)
+
+
+async def test_slot_manager_events_aclose_ends_pending_iteration() -> None:
+    """Closing the iterator ends an iteration that is waiting for a change."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    with installed(manager):
+        slot_manager = BleakSlotManager()
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 5)
+        events = slot_manager.events()
+        received: list[AllocationChangeEvent] = []
+
+        async def _consume() -> None:
+            async for event in events:
+                received.append(event)
+
+        consumer = asyncio.create_task(_consume())
+        await asyncio.sleep(0)
+        await events.aclose()
+        await asyncio.wait_for(consumer, 1.0)
+        assert received == []
+        await events.aclose()
+
+
+async def test_slot_manager_events_registers_eagerly() -> None:
+    """Changes between calling events() and iterating it are not lost."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    with installed(manager):
+        slot_manager = BleakSlotManager()
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 5)
+        events = slot_manager.events()
+        device = manager.add_device("FA:23:9D:AA:45:40", ["hci0"])
+        assert slot_manager.allocate_slot(device)
+
+        async for event in events:
+            assert event.address == "FA:23:9D:AA:45:40"
+            break
+
+        # An iterator that is dropped without being closed is unregistered
+        del events
+        gc.collect()
+        assert not slot_manager._callbacks
+
+
+async def test_slot_manager_learns_slots(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """The slots of an adapter are learned from the reported connects."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    devices = [
+        manager.add_device(f"FA:23:9D:AA:45:4{index}", ["hci0"]) for index in range(5)
+    ]
+    with installed(manager):
+        slot_manager = BleakSlotManager(learn_slots=True)
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 2)
+        for device in devices[:2]:
+            assert slot_manager.allocate_slot(device)
+            manager.set_connected(device.details["path"], True)
+            slot_manager.record_connect_success(device)
+        assert slot_manager.get_allocations("hci0").slots == 2
+
+        # One slot beyond the registered ones is probed
+        assert slot_manager.allocate_slot(devices[2])
+        allocations = slot_manager.get_allocations("hci0")
+        assert (allocations.slots, allocations.free) == (2, 0)
+        assert len(allocations.allocated) == 3
+        manager.set_connected(devices[2].details["path"], True)
+        slot_manager.record_connect_success(devices[2])
+        assert slot_manager.get_allocations("hci0").slots == 3
+        assert slot_manager.learned_slots() == {}
+
+        assert slot_manager.allocate_slot(devices[3])
+        # Not found below the capacity is not the adapter being full
+        slot_manager.record_connect_failure(
+            devices[0], ConnectionErrorCategory.DEVICE_MISSING
+        )
+        slot_manager.record_connect_failure(
+            devices[3], ConnectionErrorCategory.DEVICE_MISSING
+        )
+        for _ in range(2):
+            slot_manager.record_connect_failure(
+                devices[3], ConnectionErrorCategory.OUT_OF_SLOTS
+            )
+        assert slot_manager.learned_slots() == {"hci0": 3}
+        assert slot_manager.diagnostics()["slot_capacity"]["hci0"]["confirmed"]
+        assert slot_manager.allocate_slot(devices[4]) is False
+
+    learned = BleakSlotManager(learn_slots=True, learned_slots={"hci0": 3})
+    learned.register_adapter("hci0", 5)
+    assert learned.get_allocations("hci0").slots == 3
+    assert BleakSlotManager().learned_slots() == {}
+    assert "slot_capacity" not in BleakSlotManager().diagnostics()
+
+
 async def test_device_source():
     ble_device_hci0_2 = BLEDevice(
         "FA:23:9D:AA:45:46",
@@ -724,10 +1108,11 @@ async def test_stop_discovery(mock_linux):
         return_value=manager
     )
     bleak_retry_connector.bluez.defs = defs
-    bleak_retry_connector.bluez.Message = MagicMock()
 
-    await stop_discovery("hci0")
+    with patch("dbus_fast.message.Message") as message:
+        await stop_discovery("hci0")
     assert manager._bus.send.called
+    assert message.call_args.kwargs["member"] == "StopDiscovery"
 
 
 async def test_stop_discovery_no_manager(
@@ -739,7 +1124,6 @@ async def test_stop_discovery_no_manager(
         return_value=None
     )
     bleak_retry_connector.bluez.defs = defs
-    bleak_retry_connector.bluez.Message = MagicMock()
 
     await stop_discovery("hci0")
     assert "Failed to stop discovery" in caplog.text
@@ -1102,6 +1486,32 @@ async def test_get_services_cache_returns_none_when_no_manager(
     assert await _get_services_cache() is None
 
 
+async def test_connected_manager_is_used_without_awaiting(
+    mock_linux: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Once the manager of the loop is connected no lookup connects."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile(), "hci1": AdapterProfile()})
+    device = manager.add_device("FA:23:9D:AA:45:46", ["hci0", "hci1"])
+    path = device.details["path"]
+    slow_path = AsyncMock(side_effect=AssertionError("should not be awaited"))
+    for module in (bleak_retry_connector, bleak_retry_connector.bluez):
+        monkeypatch.setattr(module, "get_global_bluez_manager_with_timeout", slow_path)
+    monkeypatch.setattr(bleak_retry_connector.bluez, "defs", defs)
+    instances: dict[asyncio.AbstractEventLoop, FakeBlueZManager] = {}
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager, "_global_instances", instances
+    )
+    instances[asyncio.get_running_loop()] = manager
+
+    assert await get_bluez_device("test", path) is not None
+    assert await get_device_by_adapter("FA:23:9D:AA:45:46", "hci1") is not None
+    assert await get_connected_devices(device) == []
+    assert await device_is_absent(device, time.monotonic() - 1000) is False
+    assert await wait_for_device_to_reappear(device, 1.0) is True
+    assert await bleak_retry_connector._has_valid_services_in_cache(device) is False
+    slow_path.assert_not_called()
+
+
 async def test_clear_cache_not_linux(mock_macos: None) -> None:
     """Non-Linux short-circuits and returns False."""
     assert await clear_cache("FA:23:9D:AA:45:46") is False
@@ -1247,7 +1657,7 @@ async def test_clear_cache_sends_remove_device(
         AsyncMock(return_value=manager),
     )
     monkeypatch.setattr(bleak_retry_connector.bluez, "defs", defs)
-    monkeypatch.setattr(bleak_retry_connector.bluez, "Message", fake_message)
+    monkeypatch.setattr(dbus_fast.message, "Message", fake_message)
 
     assert await clear_cache("FA:23:9D:AA:45:46") is True
     assert manager._services_cache == {}
@@ -1514,3 +1924,304 @@ async def test_get_connected_devices_no_properties(
         {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"},
     )
     assert await get_connected_devices(device) == []
+
+
+class _AdvertisingBluezManager:
+    """Fake manager that can replay advertisements to registered callbacks."""
+
+    def __init__(self, properties: dict[str, Any]) -> None:
+        self._properties = properties
+        self._advertisement_callbacks: defaultdict[str, list[Any]] = defaultdict(list)
+
+    def advertise(self, path: str, props: dict[str, Any]) -> None:
+        adapter_path = path[:15]
+        for callback in self._advertisement_callbacks[adapter_path]:
+            callback(path, props.copy())
+
+
+async def test_wait_for_advertisement(
+    mock_linux: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """An advertisement on any adapter resolves every waiter for the address."""
+    manager = _AdvertisingBluezManager({})
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager,
+        "_global_instances",
+        {asyncio.get_running_loop(): manager},
+    )
+    props = {"Address": "FA:23:9D:AA:45:46", "Alias": "Test", "RSSI": -60}
+
+    waiter = asyncio.create_task(wait_for_advertisement("fa:23:9d:aa:45:46", 1))
+    other_waiter = asyncio.create_task(wait_for_advertisement("FA:23:9D:AA:45:46", 1))
+    await asyncio.sleep(0)
+    # One shared callback per adapter regardless of the number of waiters
+    assert manager._advertisement_callbacks["/org/bluez/hci3"] != []
+    assert all(len(cbs) == 1 for cbs in manager._advertisement_callbacks.values())
+
+    manager.advertise("/org/bluez/hci3/dev_FA_23_9D_AA_45_47", props)
+    assert not waiter.done()
+    manager.advertise("/org/bluez/hci3/dev_FA_23_9D_AA_45_46", props)
+    device = await waiter
+    assert device is not None
+    assert device.details["path"] == "/org/bluez/hci3/dev_FA_23_9D_AA_45_46"
+    assert (await other_waiter) is not None
+    assert all(not cbs for cbs in manager._advertisement_callbacks.values())
+
+
+async def test_wait_for_advertisement_ignores_other_properties(
+    mock_linux: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Property changes that are not advertisements do not resolve waiters."""
+    path = "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"
+    props: dict[str, Any] = {
+        "Address": "FA:23:9D:AA:45:46",
+        "Alias": "Test",
+        "RSSI": -60,
+        "Connected": True,
+    }
+    manager = _AdvertisingBluezManager({path: {defs.DEVICE_INTERFACE: props}})
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager,
+        "_global_instances",
+        {asyncio.get_running_loop(): manager},
+    )
+    monkeypatch.setattr(bleak_retry_connector.bluez, "defs", defs)
+
+    waiter = asyncio.create_task(wait_for_advertisement("FA:23:9D:AA:45:46", 1))
+    await asyncio.sleep(0)
+    # A failed connect only changes Connected
+    manager.advertise(path, {**props, "Connected": False})
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    manager.advertise(path, {**props, "Connected": False, "RSSI": -61})
+    device = await waiter
+    assert device is not None
+    assert device.details["path"] == path
+
+
+async def test_wait_for_advertisement_timeout(
+    mock_linux: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """No advertisement before the timeout returns None and cleans up."""
+    manager = _AdvertisingBluezManager({})
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager,
+        "get_global_bluez_manager",
+        AsyncMock(return_value=manager),
+    )
+    assert await wait_for_advertisement("FA:23:9D:AA:45:46", 0.01) is None
+    assert all(not cbs for cbs in manager._advertisement_callbacks.values())
+
+
+async def test_wait_for_advertisement_no_manager(
+    mock_linux: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Without a manager there is nothing to wait on."""
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager,
+        "get_global_bluez_manager",
+        AsyncMock(return_value=None),
+    )
+    assert await wait_for_advertisement("FA:23:9D:AA:45:46", 10) is None
+
+
+async def test_device_is_absent(
+    mock_linux: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """RSSI or a connection on any adapter means the device is present."""
+    properties: dict[str, Any] = {
+        "/org/bluez/hci0/dev_FA_23_9D_AA_45_46": {
+            defs.DEVICE_INTERFACE: {
+                "Address": "FA:23:9D:AA:45:46",
+                "Alias": "Test",
+            },
+        },
+    }
+    manager = _AdvertisingBluezManager(properties)
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager,
+        "get_global_bluez_manager",
+        AsyncMock(return_value=manager),
+    )
+    monkeypatch.setattr(bleak_retry_connector.bluez, "defs", defs)
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46",
+        "Test",
+        {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"},
+    )
+    stale = time.monotonic() - 1000
+    # Without a last_seen there is not enough information to decide
+    assert await device_is_absent(device) is False
+    # A recent advertisement seen by the caller wins
+    assert await device_is_absent(device, time.monotonic()) is False
+    assert await device_is_absent(device, stale) is True
+
+    properties["/org/bluez/hci2/dev_FA_23_9D_AA_45_46"] = {
+        defs.DEVICE_INTERFACE: {
+            "Address": "FA:23:9D:AA:45:46",
+            "Alias": "Test",
+            "RSSI": -80,
+        },
+    }
+    assert await device_is_absent(device, stale) is False
+    del properties["/org/bluez/hci2/dev_FA_23_9D_AA_45_46"]
+    properties["/org/bluez/hci0/dev_FA_23_9D_AA_45_46"][defs.DEVICE_INTERFACE][
+        "Connected"
+    ] = True
+    assert await device_is_absent(device, stale) is False
+
+
+async def test_device_is_absent_without_bluez_path(mock_linux: None) -> None:
+    """Non-BlueZ devices can only be judged by the caller supplied last_seen."""
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {"source": "esphome"})
+    assert await device_is_absent(device) is False
+    assert await device_is_absent(device, time.monotonic() - 1000) is True
+    assert await device_is_absent(device, time.monotonic()) is False
+
+
+async def test_get_bluez_device_avoids_unhealthy_adapters(
+    mock_linux: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Quarantined adapters are skipped and failing adapters are down-weighted."""
+
+    def _props(rssi: int) -> dict[str, Any]:
+        return {
+            defs.DEVICE_INTERFACE: {
+                "Address": "FA:23:9D:AA:45:46",
+                "Alias": "Test Device",
+                "RSSI": rssi,
+            }
+        }
+
+    manager = MagicMock(
+        _properties={
+            "/org/bluez/hci0/dev_FA_23_9D_AA_45_46": _props(-80),
+            "/org/bluez/hci1/dev_FA_23_9D_AA_45_46": _props(-40),
+            "/org/bluez/hci2/dev_FA_23_9D_AA_45_46": _props(-50),
+        }
+    )
+    monkeypatch.setattr(
+        bleak_retry_connector.bleak_manager,
+        "get_global_bluez_manager",
+        AsyncMock(return_value=manager),
+    )
+    monkeypatch.setattr(bleak_retry_connector.bluez, "defs", defs)
+    adapter_health = bleak_retry_connector.AdapterHealthTracker()
+
+    device = await get_bluez_device(
+        "Test",
+        "/org/bluez/hci0/dev_FA_23_9D_AA_45_46",
+        rssi=-80,
+        adapter_health=adapter_health,
+    )
+    assert device is not None
+    assert device.details["path"] == "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"
+
+    for _ in range(5):
+        adapter_health.record_failure("hci1")
+    device = await get_bluez_device(
+        "Test",
+        "/org/bluez/hci0/dev_FA_23_9D_AA_45_46",
+        rssi=-80,
+        adapter_health=adapter_health,
+    )
+    assert device is not None
+    assert device.details["path"] == "/org/bluez/hci2/dev_FA_23_9D_AA_45_46"
+
+    # hci2 fails 60% of the time and loses its advantage over hci0
+    for _ in range(2):
+        adapter_health.record_success("hci2", 1.0)
+    for _ in range(3):
+        adapter_health.record_failure("hci2")
+    assert (
+        await get_bluez_device(
+            "Test",
+            "/org/bluez/hci0/dev_FA_23_9D_AA_45_46",
+            rssi=-62,
+            adapter_health=adapter_health,
+        )
+        is None
+    )
+
+    # A quarantined original adapter takes any healthy path
+    for _ in range(5):
+        adapter_health.record_failure("hci0")
+    device = await get_bluez_device(
+        "Test",
+        "/org/bluez/hci0/dev_FA_23_9D_AA_45_46",
+        rssi=-20,
+        adapter_health=adapter_health,
+    )
+    assert device is not None
+    assert device.details["path"] == "/org/bluez/hci2/dev_FA_23_9D_AA_45_46"
+    # Without a tracker the adapters are ranked by RSSI alone
+    device = await get_bluez_device(
+        "Test", "/org/bluez/hci0/dev_FA_23_9D_AA_45_46", rssi=-80
+    )
+    assert device is not None
+    assert device.details["path"] == "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"
+
+
+async def test_wait_for_disconnect_virtual_clock(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """wait_for_disconnect pads to the min wait time or gives up at the timeout."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile()})
+    device = manager.add_device("FA:23:9D:AA:45:46")
+    path = device.details["path"]
+
+    async def _wait(min_wait_time: float, disconnect_after: float | None) -> float:
+        manager.set_connected(path, True)
+        if disconnect_after is not None:
+            virtual_clock.call_later(
+                disconnect_after, manager.set_connected, path, False
+            )
+        start = virtual_clock.time()
+        await wait_for_disconnect(device, min_wait_time)
+        return virtual_clock.time() - start
+
+    with installed(manager):
+        # Disconnects sooner than the min wait time so the rest is padded
+        assert await _wait(1.0, 0.3) == pytest.approx(1.0)
+        # Disconnects after the min wait time so there is no padding
+        assert await _wait(1.0, 2.5) == pytest.approx(2.5)
+        assert await _wait(0, 0.3) == pytest.approx(0.3)
+        # Never disconnects so it gives up at the disconnect timeout
+        assert await _wait(1.0, None) == pytest.approx(DISCONNECT_TIMEOUT)
+
+    assert DISCONNECT_WAIT_SECONDS.labels("hci0", "true").sum == pytest.approx(
+        0.3 + 2.5 + 0.3
+    )
+    # The wait that timed out is observed too
+    timed_out = DISCONNECT_WAIT_SECONDS.labels("hci0", "false")
+    assert sum(timed_out.counts) == 1
+    assert timed_out.sum == pytest.approx(DISCONNECT_TIMEOUT)
+
+
+async def test_wait_for_device_to_reappear_virtual_clock(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """wait_for_device_to_reappear polls the bus every REAPPEAR_WAIT_INTERVAL."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile(), "hci1": AdapterProfile()})
+    device = manager.add_device("FA:23:9D:AA:45:46", ["hci0"])
+    manager._properties.pop(device.details["path"])
+
+    with installed(manager):
+        # Reappears on another adapter between two polls
+        virtual_clock.call_later(1.2, manager.add_device, "FA:23:9D:AA:45:46", ["hci1"])
+        assert await wait_for_device_to_reappear(device, 3) is True
+        assert virtual_clock.time() == pytest.approx(3 * REAPPEAR_WAIT_INTERVAL)
+
+        for path in [path for path in manager._properties if "dev_" in path]:
+            del manager._properties[path]
+        start = virtual_clock.time()
+        assert await wait_for_device_to_reappear(device, 3) is False
+        assert virtual_clock.time() - start == pytest.approx(3)
+
+        # A device that was removed from the bus cannot be waited on to
+        # disconnect so wait_for_disconnect waits for it to reappear instead
+        virtual_clock.call_later(1.1, manager.add_device, "FA:23:9D:AA:45:46")
+        start = virtual_clock.time()
+        await wait_for_disconnect(device, 2)
+        assert virtual_clock.time() - start == pytest.approx(3 * REAPPEAR_WAIT_INTERVAL)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from bleak_retry_connector.capacity import (
+    CAPACITY_FULL_OBSERVATIONS,
+    SlotCapacityLearner,
+)
+
+
+def test_probes_until_full() -> None:
+    learner = SlotCapacityLearner()
+    assert learner.capacity("hci0", 3) == 3
+    assert learner.limit("hci0", 3) == 4
+
+    assert learner.record_connected("hci0", 3, 4) is True
+    assert learner.capacity("hci0", 3) == 4
+    assert learner.limit("hci0", 3) == 5
+    assert learner.learned() == {}
+
+    for _ in range(CAPACITY_FULL_OBSERVATIONS - 1):
+        assert learner.record_full("hci0", 3, 4) is False
+    assert learner.record_full("hci0", 3, 4) is True
+    assert learner.capacity("hci0", 3) == 4
+    assert learner.limit("hci0", 3) == 4
+    assert learner.learned() == {"hci0": 4}
+
+
+def test_shrinks_to_full_adapter() -> None:
+    learner = SlotCapacityLearner()
+    for _ in range(CAPACITY_FULL_OBSERVATIONS):
+        learner.record_full("hci0", 5, 2)
+    assert learner.capacity("hci0", 5) == 2
+    assert learner.limit("hci0", 5) == 2
+    assert learner.diagnostics() == {
+        "hci0": {
+            "capacity": 2,
+            "confirmed": True,
+            "most_connected": 0,
+            "full_at": {},
+        }
+    }
+
+
+def test_inferred_full_needs_a_report() -> None:
+    learner = SlotCapacityLearner()
+    for _ in range(CAPACITY_FULL_OBSERVATIONS):
+        assert learner.record_full("hci0", 1, 1, reported=False) is False
+    assert learner.learned() == {}
+    assert learner.record_full("hci0", 1, 1) is True
+    assert learner.learned() == {"hci0": 1}
+
+
+def test_spurious_full_is_ignored() -> None:
+    learner = SlotCapacityLearner()
+    learner.record_connected("hci0", 5, 3)
+    # Three connections have succeeded at once before
+    for _ in range(CAPACITY_FULL_OBSERVATIONS):
+        assert learner.record_full("hci0", 5, 2) is False
+    assert learner.record_full("hci0", 5, 0) is False
+
+    learner.record_full("hci0", 5, 3)
+    learner.record_full("hci0", 5, 3)
+    # A connect that succeeds with more connections contradicts them
+    learner.record_connected("hci0", 5, 4)
+    assert learner.record_full("hci0", 5, 3) is False
+    assert learner.capacity("hci0", 5) == 5
+
+
+def test_starts_from_learned() -> None:
+    learner = SlotCapacityLearner({"hci0": 7})
+    assert learner.capacity("hci0", 5) == 7
+    assert learner.limit("hci0", 5) == 7
+    assert learner.capacity("hci1", 5) == 5
+    assert learner.learned() == {"hci0": 7}
+    # Connections made outside the slot manager still raise it
+    assert learner.record_connected("hci0", 5, 8) is True
+    assert learner.learned() == {}
@@ -0,0 +1,103 @@
+"""Tests for the per-device connection circuit breaker."""
+
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+import bleak_retry_connector
+from bleak_retry_connector import (
+    BleakCircuitOpenError,
+    CircuitState,
+    ConnectionCircuitBreaker,
+)
+
+ADDRESS = "FA:23:9D:AA:45:46"
+
+
+def _at(now: float) -> AbstractContextManager[Any]:
+    return patch.object(
+        bleak_retry_connector.circuit_breaker.time, "monotonic", return_value=now
+    )
+
+
+def test_circuit_opens_after_threshold():
+    """Consecutive failures open the circuit and connects are refused."""
+    breaker = ConnectionCircuitBreaker(failure_threshold=2, base_open_time=30)
+    with _at(1000.0):
+        breaker.check(ADDRESS, "test")
+        breaker.record_failure(ADDRESS)
+        assert breaker.get_state(ADDRESS) is CircuitState.CLOSED
+        breaker.check(ADDRESS, "test")
+        breaker.record_failure(ADDRESS)
+        assert breaker.get_state(ADDRESS) is CircuitState.OPEN
+        with pytest.raises(BleakCircuitOpenError, match="next try in 30.0s"):
+            breaker.check(ADDRESS, "test")
+        assert breaker.diagnostics() == {
+            ADDRESS: {
+                "state": "OPEN",
+                "failures": 2,
+                "open_count": 1,
+                "remaining": 30.0,
+            }
+        }
+
+
+def test_half_open_trial_failure_doubles_open_time():
+    """A failed trial reopens the circuit for twice as long."""
+    breaker = ConnectionCircuitBreaker(failure_threshold=1, base_open_time=30)
+    with _at(1000.0):
+        breaker.record_failure(ADDRESS)
+    with _at(1030.0):
+        breaker.check(ADDRESS, "test")
+        assert breaker.get_state(ADDRESS) is CircuitState.HALF_OPEN
+        # Only one trial at a time
+        with pytest.raises(BleakCircuitOpenError):
+            breaker.check(ADDRESS, "test")
+        breaker.record_failure(ADDRESS)
+        assert breaker.get_state(ADDRESS) is CircuitState.OPEN
+        assert breaker.diagnostics()[ADDRESS]["remaining"] == 60.0
+
+
+def test_open_time_is_capped():
+    """The open period never exceeds the maximum."""
+    breaker = ConnectionCircuitBreaker(
+        failure_threshold=1, base_open_time=30, max_open_time=100
+    )
+    now = 1000.0
+    for _ in range(5):
+        with _at(now):
+            breaker.record_failure(ADDRESS)
+            remaining = breaker.diagnostics()[ADDRESS]["remaining"]
+        now += remaining
+        with _at(now):
+            breaker.check(ADDRESS, "test")
+    assert remaining == 100
+
+
+def test_half_open_trial_success_closes():
+    """A successful trial closes the circuit."""
+    breaker = ConnectionCircuitBreaker(failure_threshold=1, base_open_time=30)
+    with _at(1000.0):
+        breaker.record_failure(ADDRESS)
+    with _at(1031.0):
+        breaker.check(ADDRESS, "test")
+        breaker.record_success(ADDRESS)
+        assert breaker.get_state(ADDRESS) is CircuitState.CLOSED
+        breaker.check(ADDRESS, "test")
+    assert breaker.diagnostics() == {}
+
+
+def test_abandoned_trial_allows_another_after_window():
+    """A trial that never reports back does not block the device forever."""
+    breaker = ConnectionCircuitBreaker(failure_threshold=1, base_open_time=30)
+    with _at(1000.0):
+        breaker.record_failure(ADDRESS)
+    with _at(1030.0):
+        breaker.check(ADDRESS, "test")
+    with _at(1061.0):
+        breaker.check(ADDRESS, "test")
+        assert breaker.get_state(ADDRESS) is CircuitState.HALF_OPEN
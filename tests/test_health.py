@@ -0,0 +1,70 @@
+"""Tests for the per-adapter health tracker."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import bleak_retry_connector
+from bleak_retry_connector.health import (
+    HEALTH_MIN_OUTCOMES,
+    MAX_RSSI_PENALTY,
+    QUARANTINE_TIME,
+    AdapterHealthTracker,
+)
+
+
+def test_unknown_adapter_is_healthy():
+    """Adapters without outcomes have no penalty."""
+    tracker = AdapterHealthTracker()
+    assert tracker.is_quarantined("hci0") is False
+    assert tracker.rssi_penalty("hci0") == 0
+    assert tracker.diagnostics() == {}
+
+
+def test_rssi_penalty_follows_failure_rate():
+    """The penalty grows with the share of failed connects."""
+    tracker = AdapterHealthTracker()
+    for _ in range(3):
+        tracker.record_success("hci0", 1.0)
+    tracker.record_failure("hci0")
+    # Not enough outcomes to judge yet
+    assert tracker.rssi_penalty("hci0") == 0
+    tracker.record_failure("hci0")
+    assert tracker.rssi_penalty("hci0") == round(0.4 * MAX_RSSI_PENALTY)
+    assert tracker.is_quarantined("hci0") is False
+    assert tracker.diagnostics() == {
+        "hci0": {
+            "success_rate": 0.6,
+            "outcomes": 5,
+            "average_latency": 1.0,
+            "quarantined_for": 0.0,
+        }
+    }
+
+
+def test_failing_adapter_is_quarantined_then_released():
+    """An adapter where nearly every connect fails is avoided for a while."""
+    tracker = AdapterHealthTracker()
+    with patch.object(
+        bleak_retry_connector.health.time, "monotonic", return_value=1000.0
+    ):
+        for _ in range(HEALTH_MIN_OUTCOMES):
+            tracker.record_failure("hci1")
+        assert tracker.is_quarantined("hci1") is True
+        assert tracker.diagnostics()["hci1"]["quarantined_for"] == QUARANTINE_TIME
+    with patch.object(
+        bleak_retry_connector.health.time,
+        "monotonic",
+        return_value=1000.0 + QUARANTINE_TIME + 1,
+    ):
+        assert tracker.is_quarantined("hci1") is False
+        # Judged only on new outcomes after the quarantine
+        assert tracker.rssi_penalty("hci1") == 0
+
+
+def test_clear():
+    """Clearing forgets every adapter."""
+    tracker = AdapterHealthTracker()
+    tracker.record_success("hci0", 1.0)
+    tracker.clear()
+    assert tracker.diagnostics() == {}
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
@@ -29,6 +30,8 @@ from bleak_retry_connector import (
     BleakConnectionError,
     BleakNotFoundError,
     BleakOutOfConnectionSlotsError,
+    BleakSlotManager,
+    ConnectionAttempt,
     ble_device_description,
     ble_device_has_changed,
     calculate_backoff_time,
@@ -40,9 +43,18 @@ from bleak_retry_connector import (
     get_device,
     get_device_by_adapter,
     restore_discoveries,
+    restore_discoveries_by_adapter,
     retry_bluetooth_connection_error,
 )
 from bleak_retry_connector.bleak_manager import _reset_dbus_socket_cache
+from bleak_retry_connector.capacity import CAPACITY_FULL_OBSERVATIONS
+from tests.fake_bluez import (
+    AdapterProfile,
+    FakeBlueZManager,
+    installed,
+    make_client_class,
+)
+from tests.virtual_clock import VirtualClockEventLoop
 
 
 def make_scripted_client(
@@ -2235,7 +2247,7 @@ async def test_close_stale_connections_by_address(mock_linux):
 
 
 @pytest.mark.asyncio
-async def test_has_valid_services_in_cache_success(mock_linux):
+async def test_has_valid_services_in_cache_success(mock_linux, monkeypatch):
     """Test successful validation when all cached services are present in properties."""
 
     class FakeBleakClient(BleakClient):
@@ -2301,8 +2313,10 @@ async def test_has_valid_services_in_cache_success(mock_linux):
 
     bluez_manager = FakeBluezManager()
 
-    bleak_retry_connector.bluez.get_global_bluez_manager_with_timeout = AsyncMock(
-        return_value=bluez_manager
+    monkeypatch.setattr(
+        bleak_retry_connector,
+        "get_global_bluez_manager_with_timeout",
+        AsyncMock(return_value=bluez_manager),
     )
     bleak_retry_connector.bluez.defs = defs
 
@@ -2336,7 +2350,7 @@ async def test_has_valid_services_in_cache_success(mock_linux):
 
 
 @pytest.mark.asyncio
-async def test_has_valid_services_in_cache_service_missing(mock_linux):
+async def test_has_valid_services_in_cache_service_missing(mock_linux, monkeypatch):
     """Test validation fails when a cached service is not in properties."""
 
     class FakeBleakClient(BleakClient):
@@ -2386,8 +2400,10 @@ async def test_has_valid_services_in_cache_service_missing(mock_linux):
 
     bluez_manager = FakeBluezManager()
 
-    bleak_retry_connector.bluez.get_global_bluez_manager_with_timeout = AsyncMock(
-        return_value=bluez_manager
+    monkeypatch.setattr(
+        bleak_retry_connector,
+        "get_global_bluez_manager_with_timeout",
+        AsyncMock(return_value=bluez_manager),
     )
     bleak_retry_connector.bluez.defs = defs
 
@@ -2412,7 +2428,7 @@ async def test_has_valid_services_in_cache_service_missing(mock_linux):
 
 
 @pytest.mark.asyncio
-async def test_has_valid_services_in_cache_no_services(mock_linux):
+async def test_has_valid_services_in_cache_no_services(mock_linux, monkeypatch):
     """Test validation returns False when there are no services in the collection."""
 
     class FakeBleakClient(BleakClient):
@@ -2447,8 +2463,10 @@ async def test_has_valid_services_in_cache_no_services(mock_linux):
 
     bluez_manager = FakeBluezManager()
 
-    bleak_retry_connector.bluez.get_global_bluez_manager_with_timeout = AsyncMock(
-        return_value=bluez_manager
+    monkeypatch.setattr(
+        bleak_retry_connector,
+        "get_global_bluez_manager_with_timeout",
+        AsyncMock(return_value=bluez_manager),
     )
     bleak_retry_connector.bluez.defs = defs
 
@@ -2633,7 +2651,9 @@ async def test_ble_device_description_non_dict_details():
 
 
 @pytest.mark.asyncio
-async def test_has_valid_services_in_cache_no_cached_services_for_path(mock_linux):
+async def test_has_valid_services_in_cache_no_cached_services_for_path(
+    mock_linux, monkeypatch
+):
     """Services cache exists but has no entry for the device path."""
 
     class FakeBluezManager:
@@ -2642,8 +2662,10 @@ async def test_has_valid_services_in_cache_no_cached_services_for_path(mock_linu
             self._properties = {}
 
     bluez_manager = FakeBluezManager()
-    bleak_retry_connector.bluez.get_global_bluez_manager_with_timeout = AsyncMock(
-        return_value=bluez_manager
+    monkeypatch.setattr(
+        bleak_retry_connector,
+        "get_global_bluez_manager_with_timeout",
+        AsyncMock(return_value=bluez_manager),
     )
     bleak_retry_connector.bluez.defs = defs
 
@@ -2658,7 +2680,7 @@ async def test_has_valid_services_in_cache_no_cached_services_for_path(mock_linu
 
 
 @pytest.mark.asyncio
-async def test_has_valid_services_in_cache_no_properties(mock_linux):
+async def test_has_valid_services_in_cache_no_properties(mock_linux, monkeypatch):
     """Services cache has the device but properties are unavailable."""
 
     collection = BleakGATTServiceCollection()
@@ -2683,8 +2705,10 @@ async def test_has_valid_services_in_cache_no_properties(mock_linux):
             self._properties = {}
 
     bluez_manager = FakeBluezManager()
-    bleak_retry_connector.bluez.get_global_bluez_manager_with_timeout = AsyncMock(
-        return_value=bluez_manager
+    monkeypatch.setattr(
+        bleak_retry_connector,
+        "get_global_bluez_manager_with_timeout",
+        AsyncMock(return_value=bluez_manager),
     )
     bleak_retry_connector.bluez.defs = defs
 
@@ -2816,6 +2840,66 @@ async def test_restore_discoveries_no_properties(mock_linux: None) -> None:
     assert mock_backend.seen_devices == {}
 
 
+@pytest.mark.asyncio
+async def test_restore_discoveries_by_adapter() -> None:
+    """Every scanner gets the same discoveries as restore_discoveries gives it."""
+    manager = FakeBlueZManager(
+        {"hci0": AdapterProfile(), "hci1": AdapterProfile(), "hci2": AdapterProfile()}
+    )
+    for index in range(5):
+        manager.add_device(f"AA:BB:CC:DD:EE:0{index}", ["hci0", "hci1"])
+    manager.add_device("AA:BB:CC:DD:EE:10", ["hci1", "hci2"], rssi=-40)
+    scanners = {
+        adapter: Mock(_backend=Mock(seen_devices={})) for adapter in ("hci0", "hci1")
+    }
+    expected = {
+        adapter: Mock(_backend=Mock(seen_devices={})) for adapter in ("hci0", "hci1")
+    }
+
+    with installed(manager):
+        report = await restore_discoveries_by_adapter(scanners)
+        for adapter, scanner in expected.items():
+            await restore_discoveries(scanner, adapter)
+
+    assert report.restored == {"hci0": 5, "hci1": 6}
+    assert set(report.seconds) == {"hci0", "hci1"}
+    for adapter, scanner in scanners.items():
+        seen_devices = scanner._backend.seen_devices
+        assert seen_devices.keys() == expected[adapter]._backend.seen_devices.keys()
+        assert all(f"/{adapter}/" in path for path in seen_devices)
+
+
+@pytest.mark.asyncio
+async def test_restore_discoveries_by_adapter_no_properties(
+    mock_linux: None,
+) -> None:
+    """Nothing is restored when properties are unavailable."""
+    mock_scanner = Mock(_backend=Mock(seen_devices={}))
+
+    with patch.object(
+        bleak_retry_connector,
+        "_get_properties",
+        AsyncMock(return_value=None),
+    ):
+        report = await restore_discoveries_by_adapter({"hci0": mock_scanner})
+
+    assert report.restored == {}
+    assert mock_scanner._backend.seen_devices == {}
+
+
+@pytest.mark.asyncio
+async def test_restore_discoveries_by_adapter_non_linux(mock_macos: None) -> None:
+    """restore_discoveries_by_adapter is a no-op on non-Linux platforms."""
+    get_props = AsyncMock()
+    with patch.object(bleak_retry_connector, "_get_properties", get_props):
+        report = await restore_discoveries_by_adapter(
+            {"hci0": Mock(_backend=Mock(seen_devices={}))}
+        )
+
+    get_props.assert_not_called()
+    assert report.restored == {}
+
+
 @pytest.mark.asyncio
 async def test_establish_connection_debug_disabled_cycles_all_exception_paths() -> None:
     """Cycle through every retryable exception class with debug logging off.
@@ -2880,3 +2964,763 @@ async def test_retry_bluetooth_connection_error_zero_attempts_returns_none() ->
 
     await never_called()
     assert call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_fail_fast_if_absent() -> None:
+    """An absent device that does not advertise fails without any attempts."""
+    client_class, attempts = make_scripted_client([None])
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {"source": "esphome"})
+    with (
+        patch.object(
+            bleak_retry_connector,
+            "wait_for_advertisement",
+            AsyncMock(return_value=None),
+        ) as mock_wait,
+        pytest.raises(BleakNotFoundError, match="not advertised recently"),
+    ):
+        await establish_connection(
+            client_class,
+            device,
+            "test",
+            fail_fast_if_absent=True,
+            last_seen=0.0,
+        )
+    assert attempts["n"] == 0
+    mock_wait.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_fail_fast_if_absent_device_appears() -> None:
+    """An absent BlueZ device that advertises is connected on that adapter."""
+    seen_devices: list[BLEDevice] = []
+
+    class FakeBleakClient(BleakClient):
+        def __init__(self, device: BLEDevice, *args: Any, **kwargs: Any) -> None:
+            seen_devices.append(device)
+
+        async def connect(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"}
+    )
+    advertised = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"}
+    )
+    with (
+        patch.object(
+            bleak_retry_connector, "device_is_absent", AsyncMock(return_value=True)
+        ),
+        patch.object(
+            bleak_retry_connector,
+            "wait_for_advertisement",
+            AsyncMock(return_value=advertised),
+        ),
+    ):
+        await establish_connection(
+            FakeBleakClient, device, "test", fail_fast_if_absent=True
+        )
+    assert seen_devices == [advertised]
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_fail_fast_if_absent_present() -> None:
+    """A recently seen device skips the appearance wait."""
+    client_class, attempts = make_scripted_client([None])
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {"source": "esphome"})
+    with patch.object(
+        bleak_retry_connector,
+        "wait_for_advertisement",
+        AsyncMock(side_effect=AssertionError("should not wait")),
+    ):
+        await establish_connection(
+            client_class,
+            device,
+            "test",
+            fail_fast_if_absent=True,
+            last_seen=time.monotonic(),
+        )
+    assert attempts["n"] == 1
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_on_advertisement(mock_linux: None) -> None:
+    """Connects through the adapter that heard the advertisement."""
+    seen_paths: list[str] = []
+    results: list[BaseException | None] = [BleakError("boom")]
+
+    class FakeBleakClient(BleakClient):
+        def __init__(self, device: BLEDevice, *args: Any, **kwargs: Any) -> None:
+            seen_paths.append(device.details["path"])
+
+        async def connect(self, *args: Any, **kwargs: Any) -> None:
+            if results and (exc := results.pop(0)):
+                raise exc
+
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"}
+    )
+    advertisements = [
+        BLEDevice(
+            "FA:23:9D:AA:45:46",
+            "Test",
+            {
+                "path": f"/org/bluez/hci{i}/dev_FA_23_9D_AA_45_46",
+                "props": {"RSSI": -60},
+            },
+        )
+        for i in (1, 2)
+    ]
+    with (
+        patch.object(
+            bleak_retry_connector,
+            "wait_for_advertisement",
+            AsyncMock(side_effect=advertisements),
+        ),
+        patch.object(
+            bleak_retry_connector, "get_bluez_device", AsyncMock(return_value=None)
+        ),
+        patch.object(
+            bleak_retry_connector, "get_connected_devices", AsyncMock(return_value=[])
+        ),
+        patch.object(bleak_retry_connector, "wait_for_disconnect", AsyncMock()),
+    ):
+        client = await bleak_retry_connector.establish_connection_on_advertisement(
+            FakeBleakClient, device, "test", timeout=1
+        )
+    assert isinstance(client, FakeBleakClient)
+    assert seen_paths == [
+        "/org/bluez/hci1/dev_FA_23_9D_AA_45_46",
+        "/org/bluez/hci2/dev_FA_23_9D_AA_45_46",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_on_advertisement_deadline(mock_linux: None) -> None:
+    """The overall deadline bounds the wait for advertisements."""
+    client_class, attempts = make_scripted_client([])
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"}
+    )
+
+    async def _never_advertises(address: str, timeout: float) -> BLEDevice:
+        await asyncio.sleep(10)
+        raise AssertionError("not reached")
+
+    with (
+        patch.object(
+            bleak_retry_connector, "wait_for_advertisement", _never_advertises
+        ),
+        pytest.raises(BleakNotFoundError, match="within 0.01 seconds"),
+    ):
+        await bleak_retry_connector.establish_connection_on_advertisement(
+            client_class, device, "test", timeout=0.01
+        )
+    assert attempts["n"] == 0
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_on_advertisement_max_attempts() -> None:
+    """max_attempts is rejected since every advertisement is one attempt."""
+    client_class, attempts = make_scripted_client([None])
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {})
+    with pytest.raises(TypeError, match="max_attempts"):
+        await bleak_retry_connector.establish_connection_on_advertisement(
+            client_class, device, "test", max_attempts=3
+        )
+    assert attempts["n"] == 0
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_on_advertisement_reports_last_error(
+    mock_linux: None,
+) -> None:
+    """When no more advertisements arrive the last connect failure is reported."""
+    client_class, attempts = make_scripted_client([BleakError("boom")])
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"}
+    )
+    advertised = BLEDevice(
+        "FA:23:9D:AA:45:46",
+        "Test",
+        {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46", "props": {}},
+    )
+    with (
+        patch.object(
+            bleak_retry_connector,
+            "wait_for_advertisement",
+            AsyncMock(side_effect=[advertised, None]),
+        ),
+        patch.object(
+            bleak_retry_connector, "get_bluez_device", AsyncMock(return_value=None)
+        ),
+        patch.object(
+            bleak_retry_connector, "get_connected_devices", AsyncMock(return_value=[])
+        ),
+        patch.object(bleak_retry_connector, "wait_for_disconnect", AsyncMock()),
+        pytest.raises(BleakConnectionError, match="boom") as exc_info,
+    ):
+        await bleak_retry_connector.establish_connection_on_advertisement(
+            client_class, device, "test", timeout=1
+        )
+    assert attempts["n"] == 1
+    assert len(exc_info.value.attempts) == 1
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_on_advertisement_circuit_open(
+    mock_linux: None,
+) -> None:
+    """An open circuit is raised without waiting for more advertisements."""
+    client_class, attempts = make_scripted_client([])
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"}
+    )
+    advertised = BLEDevice(
+        "FA:23:9D:AA:45:46",
+        "Test",
+        {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46", "props": {}},
+    )
+    breaker = bleak_retry_connector.ConnectionCircuitBreaker(failure_threshold=1)
+    breaker.record_failure(device.address)
+    wait_for_advertisement = AsyncMock(return_value=advertised)
+    with (
+        patch.object(
+            bleak_retry_connector, "wait_for_advertisement", wait_for_advertisement
+        ),
+        patch.object(
+            bleak_retry_connector, "get_bluez_device", AsyncMock(return_value=None)
+        ),
+        pytest.raises(bleak_retry_connector.BleakCircuitOpenError),
+    ):
+        await bleak_retry_connector.establish_connection_on_advertisement(
+            client_class, device, "test", timeout=1, circuit_breaker=breaker
+        )
+    assert wait_for_advertisement.await_count == 1
+    assert attempts["n"] == 0
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_on_advertisement_not_bluez() -> None:
+    """Devices without a BlueZ path fall back to a normal connection."""
+    client_class, attempts = make_scripted_client([None])
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {"source": "esphome"})
+    client = await bleak_retry_connector.establish_connection_on_advertisement(
+        client_class, device, "test"
+    )
+    assert isinstance(client, client_class)
+    assert attempts["n"] == 1
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_latency_tracker() -> None:
+    """Successful connects are recorded and drive the next connect timeout."""
+    timeouts: list[float] = []
+
+    class FakeBleakClient(BleakClient):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+        async def connect(self, *args: Any, **kwargs: Any) -> None:
+            timeouts.append(kwargs["timeout"])
+
+    tracker = bleak_retry_connector.ConnectLatencyTracker()
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {})
+    for _ in range(4):
+        await establish_connection(
+            FakeBleakClient, device, "test", latency_tracker=tracker
+        )
+    assert len(tracker.diagnostics()["FA:23:9D:AA:45:46"]) == 4
+    assert timeouts == [
+        bleak_retry_connector.BLEAK_TIMEOUT,
+        bleak_retry_connector.BLEAK_TIMEOUT,
+        bleak_retry_connector.BLEAK_TIMEOUT,
+        bleak_retry_connector.latency.ADAPTIVE_TIMEOUT_FLOOR,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_feeds_adapter_health() -> None:
+    """Adapter caused outcomes are recorded against the adapter or proxy source."""
+    client_class, _ = make_scripted_client(
+        [
+            BleakError("No available connection slots"),
+            asyncio.TimeoutError(),
+            BleakDeviceNotFoundError("FA:23:9D:AA:45:46"),
+            None,
+        ]
+    )
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {"source": "esphome-proxy"})
+    adapter_health = bleak_retry_connector.AdapterHealthTracker()
+    with patch.object(bleak_retry_connector, "wait_for_disconnect", AsyncMock()):
+        await establish_connection(
+            client_class, device, "test", adapter_health=adapter_health
+        )
+    diagnostics = adapter_health.diagnostics()
+    # The timeout and the missing device are not the adapter's fault
+    assert diagnostics["esphome-proxy"]["outcomes"] == 2
+    assert diagnostics["esphome-proxy"]["average_latency"] is not None
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_without_adapter_health() -> None:
+    """Adapter health is only tracked when a tracker is passed."""
+    client_class, _ = make_scripted_client(
+        [BleakError("No available connection slots"), None]
+    )
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {"source": "esphome-proxy"})
+    with patch.object(bleak_retry_connector, "wait_for_disconnect", AsyncMock()):
+        await establish_connection(client_class, device, "test")
+    assert bleak_retry_connector.get_adapter_health_tracker().diagnostics() == {}
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_moves_off_quarantined_adapter(
+    mock_linux: None,
+) -> None:
+    """A device on a quarantined adapter is connected through a healthy one."""
+    seen_paths: list[str] = []
+
+    class FakeBleakClient(BleakClient):
+        def __init__(self, device: BLEDevice, *args: Any, **kwargs: Any) -> None:
+            seen_paths.append(device.details["path"])
+
+        async def connect(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci0/dev_FA_23_9D_AA_45_46"}
+    )
+    healthy = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"}
+    )
+    adapter_health = bleak_retry_connector.AdapterHealthTracker()
+    for _ in range(5):
+        adapter_health.record_failure("hci0")
+    with (
+        patch.object(
+            bleak_retry_connector, "get_connected_devices", AsyncMock(return_value=[])
+        ),
+        patch.object(
+            bleak_retry_connector, "get_bluez_device", AsyncMock(return_value=healthy)
+        ),
+    ):
+        await establish_connection(FakeBleakClient, device, "test")
+        await establish_connection(
+            FakeBleakClient, device, "test", adapter_health=adapter_health
+        )
+    assert seen_paths == [
+        "/org/bluez/hci0/dev_FA_23_9D_AA_45_46",
+        "/org/bluez/hci1/dev_FA_23_9D_AA_45_46",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_circuit_breaker() -> None:
+    """A device that keeps failing is short-circuited until the circuit closes."""
+    client_class, attempts = make_scripted_client(
+        [BleakError("boom"), BleakError("boom"), None]
+    )
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {})
+    breaker = bleak_retry_connector.ConnectionCircuitBreaker(failure_threshold=1)
+    with patch.object(bleak_retry_connector, "wait_for_disconnect", AsyncMock()):
+        with pytest.raises(BleakConnectionError):
+            await establish_connection(
+                client_class, device, "test", max_attempts=1, circuit_breaker=breaker
+            )
+        with pytest.raises(bleak_retry_connector.BleakCircuitOpenError):
+            await establish_connection(
+                client_class, device, "test", circuit_breaker=breaker
+            )
+        assert attempts["n"] == 1
+
+        with patch.object(
+            bleak_retry_connector.circuit_breaker.time,
+            "monotonic",
+            return_value=time.monotonic() + 1000,
+        ):
+            with pytest.raises(BleakConnectionError):
+                await establish_connection(
+                    client_class,
+                    device,
+                    "test",
+                    max_attempts=1,
+                    circuit_breaker=breaker,
+                )
+        assert attempts["n"] == 2
+        assert (
+            breaker.get_state(device.address) is bleak_retry_connector.CircuitState.OPEN
+        )
+
+        with patch.object(
+            bleak_retry_connector.circuit_breaker.time,
+            "monotonic",
+            return_value=time.monotonic() + 5000,
+        ):
+            await establish_connection(
+                client_class, device, "test", circuit_breaker=breaker
+            )
+    assert (
+        breaker.get_state(device.address) is bleak_retry_connector.CircuitState.CLOSED
+    )
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_circuit_breaker_fail_fast() -> None:
+    """A fast-fail for an absent device counts as a failure."""
+    client_class, attempts = make_scripted_client([])
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {"source": "esphome"})
+    breaker = bleak_retry_connector.ConnectionCircuitBreaker(failure_threshold=1)
+    with (
+        patch.object(
+            bleak_retry_connector,
+            "wait_for_advertisement",
+            AsyncMock(return_value=None),
+        ),
+        pytest.raises(BleakNotFoundError),
+    ):
+        await establish_connection(
+            client_class,
+            device,
+            "test",
+            fail_fast_if_absent=True,
+            last_seen=0.0,
+            circuit_breaker=breaker,
+        )
+    assert breaker.get_state(device.address) is bleak_retry_connector.CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_attempts_on_exception() -> None:
+    """Every attempt is recorded on the raised exception."""
+    client_class, _ = make_scripted_client(
+        [
+            BleakError("le-connection-abort-by-local"),
+            BleakError("ESP_GATT_CONN_CONN_CANCEL"),
+            asyncio.TimeoutError(),
+        ]
+    )
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {"source": "esphome-proxy"})
+    with (
+        patch.object(bleak_retry_connector, "wait_for_disconnect", AsyncMock()),
+        pytest.raises(BleakNotFoundError) as exc_info,
+    ):
+        await establish_connection(client_class, device, "test", max_attempts=1)
+    attempts = exc_info.value.attempts
+    assert [attempt.category for attempt in attempts] == [
+        bleak_retry_connector.ConnectionErrorCategory.ABORTED,
+        bleak_retry_connector.ConnectionErrorCategory.OUT_OF_SLOTS,
+        bleak_retry_connector.ConnectionErrorCategory.TIMEOUT,
+    ]
+    assert [attempt.backoff for attempt in attempts] == [
+        BLEAK_TRANSIENT_BACKOFF_TIME,
+        BLEAK_OUT_OF_SLOTS_BACKOFF_TIME,
+        BLEAK_DBUS_BACKOFF_TIME,
+    ]
+    assert all(attempt.adapter == "esphome-proxy" for attempt in attempts)
+    assert all(attempt.path is None for attempt in attempts)
+    assert all(attempt.duration >= 0 for attempt in attempts)
+    assert attempts[0].start <= attempts[1].start <= attempts[2].start
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_attempts_callback() -> None:
+    """On success the attempts are handed to the callback."""
+    client_class, _ = make_scripted_client([BrokenPipeError(), None])
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"}
+    )
+    received: list[list[bleak_retry_connector.ConnectionAttempt]] = []
+    with patch.object(
+        bleak_retry_connector, "get_connected_devices", AsyncMock(return_value=[])
+    ):
+        await establish_connection(
+            client_class,
+            device,
+            "test",
+            use_services_cache=False,
+            attempts_callback=received.append,
+        )
+    (attempts,) = received
+    assert [attempt.category for attempt in attempts] == [
+        bleak_retry_connector.ConnectionErrorCategory.BROKEN_PIPE,
+        None,
+    ]
+    assert attempts[1].adapter == "hci1"
+    assert attempts[1].path == "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_attempts_disconnect_wait() -> None:
+    """Time spent waiting for the disconnect is recorded."""
+    client_class, _ = make_scripted_client([EOFError(), None])
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {})
+    received: list[list[bleak_retry_connector.ConnectionAttempt]] = []
+
+    async def _slow_disconnect(*args: Any) -> None:
+        await asyncio.sleep(0.01)
+
+    with patch.object(bleak_retry_connector, "wait_for_disconnect", _slow_disconnect):
+        await establish_connection(
+            client_class, device, "test", attempts_callback=received.append
+        )
+    attempts = received[0]
+    assert attempts[0].category is bleak_retry_connector.ConnectionErrorCategory.EOF
+    assert attempts[0].disconnect_wait >= 0.01
+
+
+def test_categorize_exception() -> None:
+    """Exceptions are categorized the same way they are raised."""
+    category = bleak_retry_connector.ConnectionErrorCategory
+    categorize = bleak_retry_connector._categorize_exception
+    assert categorize(KeyError("org.bluez.GattService1")) is category.SERVICES_CHANGED
+    assert categorize(BleakDeviceNotFoundError("x")) is category.DEVICE_MISSING
+    assert (
+        categorize(BleakError("org.freedesktop.DBus.Error.UnknownObject"))
+        is category.DEVICE_MISSING
+    )
+    assert categorize(BleakError("Disconnected")) is category.DISCONNECTED
+    assert categorize(BleakError("boom")) is category.OTHER
+    assert categorize(AttributeError("boom")) is category.OTHER
+
+
+def test_connection_errors_default_to_no_attempts() -> None:
+    """Errors raised outside establish_connection have an empty attempts list."""
+    assert BleakNotFoundError("x").attempts == []
+    assert str(BleakConnectionError("x", attempts=[])) == "x"
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_traces_attempts_and_backoff() -> None:
+    """Each attempt and backoff is emitted as a span to the tracer."""
+    client_class, _ = make_scripted_client([EOFError(), None])
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {})
+    events: list[tuple[str, Any]] = []
+
+    class _Tracer:
+        def start_span(self, name: str, attributes: dict[str, Any]) -> str:
+            events.append(("start", name))
+            return name
+
+        def end_span(self, span: Any, error: BaseException | None) -> None:
+            events.append(("end", span))
+
+    bleak_retry_connector.set_tracer(_Tracer())
+    try:
+        with patch.object(bleak_retry_connector, "wait_for_disconnect", AsyncMock()):
+            await establish_connection(
+                client_class, device, "test", use_services_cache=False
+            )
+    finally:
+        bleak_retry_connector.set_tracer(None)
+    assert events == [
+        ("start", "connect_attempt"),
+        ("end", "connect_attempt"),
+        ("start", "backoff"),
+        ("end", "backoff"),
+        ("start", "connect_attempt"),
+        ("end", "connect_attempt"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_feeds_metrics() -> None:
+    """Attempts, outcomes and backoff are recorded per adapter."""
+    client_class, _ = make_scripted_client([EOFError(), None])
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"}
+    )
+    with (
+        patch.object(
+            bleak_retry_connector, "get_connected_devices", AsyncMock(return_value=[])
+        ),
+        patch.object(bleak_retry_connector, "wait_for_disconnect", AsyncMock()),
+    ):
+        await establish_connection(
+            client_class, device, "test", use_services_cache=False
+        )
+    metrics = bleak_retry_connector.render_metrics()
+    assert 'bleak_retry_connector_connect_attempts_total{adapter="hci1"} 2' in metrics
+    assert (
+        'bleak_retry_connector_connect_outcomes_total{adapter="hci1",outcome="eof"} 1'
+        in metrics
+    )
+    assert (
+        "bleak_retry_connector_connect_outcomes_total"
+        '{adapter="hci1",outcome="connected"} 1' in metrics
+    )
+    assert 'bleak_retry_connector_backoff_seconds_count{adapter="hci1"} 1' in metrics
+    assert (
+        'bleak_retry_connector_connect_attempt_seconds_count{adapter="hci1"} 2'
+        in metrics
+    )
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_feeds_flight_recorder() -> None:
+    """Attempts, classified failures and the connect are recorded per device."""
+    client_class, _ = make_scripted_client([EOFError(), None])
+    device = BLEDevice(
+        "FA:23:9D:AA:45:46", "Test", {"path": "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"}
+    )
+    with (
+        patch.object(
+            bleak_retry_connector, "get_connected_devices", AsyncMock(return_value=[])
+        ),
+        patch.object(bleak_retry_connector, "wait_for_disconnect", AsyncMock()),
+    ):
+        await establish_connection(
+            client_class, device, "test", use_services_cache=False
+        )
+    events = bleak_retry_connector.get_flight_recorder().get_events(device.address)
+    assert [
+        (event["event"], event["adapter"], event["detail"]) for event in events
+    ] == [
+        ("attempt", "hci1", "1"),
+        ("failed", "hci1", "EOF: EOFError"),
+        ("attempt", "hci1", "2"),
+        ("connected", "hci1", "2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_watchdog() -> None:
+    """A stalled attempt is reported to the watchdog and a fast one is not."""
+    snapshots: list[bleak_retry_connector.SlowConnectSnapshot] = []
+
+    class _SlowClient(BleakClient):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+        async def connect(self, *args: Any, **kwargs: Any) -> None:
+            await asyncio.sleep(0.05)
+
+    watchdog = bleak_retry_connector.SlowConnectWatchdog(snapshots.append, 0.01)
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {})
+    await establish_connection(_SlowClient, device, "test", watchdog=watchdog)
+    (snapshot,) = snapshots
+    assert snapshot.attempt == 1
+    assert any("connect" in frame for frame in snapshot.stack)
+
+    client_class, _ = make_scripted_client([None])
+    await establish_connection(client_class, device, "test", watchdog=watchdog)
+    await asyncio.sleep(0.02)
+    assert len(snapshots) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_sequence_virtual_clock(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """A whole retry sequence takes the connect times plus the backoff times."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile(latency=1.0, jitter=0)})
+    device = manager.add_device("FA:23:9D:AA:45:46")
+    path = device.details["path"]
+    manager.script(path, ["abort", "out_of_slots", "eof", None])
+    recorded: list[list[ConnectionAttempt]] = []
+
+    with installed(manager):
+        await establish_connection(
+            make_client_class(manager),
+            device,
+            "test",
+            attempts_callback=recorded.append,
+        )
+
+    backoffs = [
+        BLEAK_DBUS_BACKOFF_TIME,
+        BLEAK_OUT_OF_SLOTS_BACKOFF_TIME,
+        BLEAK_DBUS_BACKOFF_TIME,
+    ]
+    assert [attempt.backoff for attempt in recorded[0]] == [*backoffs, 0]
+    assert [attempt.duration for attempt in recorded[0]] == [1.0] * 4
+    assert virtual_clock.time() == pytest.approx(4 * 1.0 + sum(backoffs))
+
+    # Running out of attempts backs off after the last attempt too
+    manager.disconnect(path)
+    manager.script(path, ["failed"] * 4)
+    start = virtual_clock.time()
+    with installed(manager), pytest.raises(BleakConnectionError):
+        await establish_connection(
+            make_client_class(manager), device, "test", max_attempts=4
+        )
+    assert virtual_clock.time() - start == pytest.approx(
+        4 * (1.0 + BLEAK_DBUS_BACKOFF_TIME)
+    )
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_learns_slots(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """The connects of establish_connection teach the slot manager the slots."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile(latency=1.0, slots=2)})
+    devices = [manager.add_device(f"FA:23:9D:AA:45:4{index}") for index in range(3)]
+
+    with installed(manager):
+        slot_manager = BleakSlotManager(learn_slots=True)
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 1)
+        for device in devices[:2]:
+            assert slot_manager.allocate_slot(device)
+            await establish_connection(
+                make_client_class(manager),
+                device,
+                "test",
+                slot_manager=slot_manager,
+            )
+        assert slot_manager.get_allocations("hci0").slots == 2
+
+        assert slot_manager.allocate_slot(devices[2])
+        # Each connect that runs out of attempts is one observation
+        for _ in range(CAPACITY_FULL_OBSERVATIONS):
+            assert slot_manager.learned_slots() == {}
+            with pytest.raises(BleakOutOfConnectionSlotsError):
+                await establish_connection(
+                    make_client_class(manager),
+                    devices[2],
+                    "test",
+                    max_attempts=3,
+                    slot_manager=slot_manager,
+                )
+
+    assert slot_manager.learned_slots() == {"hci0": 2}
+
+
+@pytest.mark.asyncio
+async def test_establish_connection_absent_device_does_not_settle_slots(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """A device that is gone does not settle the slots of a larger adapter."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile(latency=1.0, slots=7)})
+    devices = [
+        manager.add_device(f"FA:23:9D:AA:45:4{index}")
+        for index in range(1 + CAPACITY_FULL_OBSERVATIONS)
+    ]
+
+    with installed(manager):
+        slot_manager = BleakSlotManager(learn_slots=True)
+        await slot_manager.async_setup()
+        slot_manager.register_adapter("hci0", 1)
+        assert slot_manager.allocate_slot(devices[0])
+        await establish_connection(
+            make_client_class(manager), devices[0], "test", slot_manager=slot_manager
+        )
+
+        for device in devices[1:]:
+            manager.script(
+                device.details["path"], ["device_missing"] * MAX_TRANSIENT_ERRORS
+            )
+            assert slot_manager.allocate_slot(device)
+            with pytest.raises(BleakNotFoundError):
+                await establish_connection(
+                    make_client_class(manager),
+                    device,
+                    "test",
+                    slot_manager=slot_manager,
+                )
+            slot_manager.release_slot(device)
+
+    assert slot_manager.learned_slots() == {}
+    assert slot_manager.get_allocations("hci0").slots == 1
@@ -0,0 +1,87 @@
+"""Tests for the per-device connect latency tracker."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+import bleak_retry_connector
+from bleak_retry_connector.latency import (
+    ADAPTIVE_TIMEOUT_FLOOR,
+    MAX_LATENCY_SAMPLES,
+    ConnectLatencyTracker,
+)
+
+
+def test_timeout_uses_ceiling_without_history():
+    """Until enough connects are recorded the ceiling is used."""
+    tracker = ConnectLatencyTracker()
+    assert tracker.get_timeout("AA:BB:CC:DD:EE:FF", 20.0) == 20.0
+    tracker.record("AA:BB:CC:DD:EE:FF", 0.3)
+    tracker.record("AA:BB:CC:DD:EE:FF", 0.3)
+    assert tracker.get_timeout("AA:BB:CC:DD:EE:FF", 20.0) == 20.0
+
+
+def test_timeout_from_history_is_clamped():
+    """A fast device gets the floor, a slow one is capped by the ceiling."""
+    tracker = ConnectLatencyTracker()
+    for _ in range(5):
+        tracker.record("fast", 0.3)
+        tracker.record("medium", 4.0)
+        tracker.record("slow", 15.0)
+    assert tracker.get_timeout("fast", 20.0) == ADAPTIVE_TIMEOUT_FLOOR
+    assert tracker.get_timeout("medium", 20.0) == pytest.approx(4.0 * 1.5 + 1.0)
+    assert tracker.get_timeout("slow", 20.0) == 20.0
+
+
+def test_timeout_uses_high_percentile():
+    """A single slow outlier raises the timeout to cover it."""
+    tracker = ConnectLatencyTracker()
+    for duration in (1.0, 1.0, 1.0, 1.0, 6.0):
+        tracker.record("device", duration)
+    assert tracker.get_timeout("device", 20.0) == pytest.approx(6.0 * 1.5 + 1.0)
+
+
+def test_timeout_doubles_after_timeouts():
+    """Each timeout in the current connect doubles the timeout up to the ceiling."""
+    tracker = ConnectLatencyTracker()
+    for _ in range(3):
+        tracker.record("device", 0.3)
+    assert tracker.get_timeout("device", 20.0, 1) == 4.0
+    assert tracker.get_timeout("device", 20.0, 2) == 8.0
+    assert tracker.get_timeout("device", 20.0, 5) == 20.0
+
+
+def test_history_is_bounded():
+    """Only the most recent samples are kept per device."""
+    tracker = ConnectLatencyTracker()
+    for i in range(MAX_LATENCY_SAMPLES * 2):
+        tracker.record("device", float(i))
+    assert tracker.diagnostics()["device"] == [
+        float(i) for i in range(MAX_LATENCY_SAMPLES, MAX_LATENCY_SAMPLES * 2)
+    ]
+
+
+def test_least_recently_used_devices_are_evicted():
+    """The number of tracked devices is bounded."""
+    tracker = ConnectLatencyTracker(max_devices=2)
+    tracker.record("a", 1.0)
+    tracker.record("b", 1.0)
+    tracker.record("a", 1.0)
+    tracker.record("c", 1.0)
+    assert list(tracker.diagnostics()) == ["a", "c"]
+
+
+def test_idle_devices_are_evicted():
+    """Devices that have not connected within the idle time are forgotten."""
+    tracker = ConnectLatencyTracker(idle_time=60)
+    with patch.object(
+        bleak_retry_connector.latency.time, "monotonic", return_value=1000.0
+    ):
+        tracker.record("idle", 1.0)
+    with patch.object(
+        bleak_retry_connector.latency.time, "monotonic", return_value=1100.0
+    ):
+        tracker.record("active", 1.0)
+    assert list(tracker.diagnostics()) == ["active"]
@@ -0,0 +1,82 @@
+"""Tests for the metrics registry."""
+
+from __future__ import annotations
+
+import pytest
+
+from bleak_retry_connector.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+)
+
+
+def test_render_counter_and_gauge():
+    """Counters get a _total suffix and label values are escaped."""
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("test_events", "Events.", ("adapter",)))
+    gauge = registry.register(Gauge("test_slots", "Slots."))
+    counter.labels("hci0").inc()
+    counter.labels("hci0").inc(2)
+    counter.labels('a"b\\c\n').inc()
+    gauge.labels().set(3)
+    assert registry.render() == (
+        "# TYPE test_events counter\n"
+        "# HELP test_events Events.\n"
+        'test_events_total{adapter="hci0"} 3\n'
+        'test_events_total{adapter="a\\"b\\\\c\\n"} 1\n'
+        "# TYPE test_slots gauge\n"
+        "# HELP test_slots Slots.\n"
+        "test_slots 3\n"
+        "# EOF\n"
+    )
+
+
+def test_render_histogram():
+    """Histogram buckets are rendered cumulative with a +Inf bucket."""
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram("test_seconds", "Seconds.", ("adapter",), buckets=(1.0, 0.5))
+    )
+    value = histogram.labels("hci0")
+    for observation in (0.25, 0.5, 0.75, 3.0):
+        value.observe(observation)
+    assert registry.render() == (
+        "# TYPE test_seconds histogram\n"
+        "# HELP test_seconds Seconds.\n"
+        'test_seconds_bucket{adapter="hci0",le="0.5"} 2\n'
+        'test_seconds_bucket{adapter="hci0",le="1.0"} 3\n'
+        'test_seconds_bucket{adapter="hci0",le="+Inf"} 4\n'
+        'test_seconds_count{adapter="hci0"} 4\n'
+        'test_seconds_sum{adapter="hci0"} 4.5\n'
+        "# EOF\n"
+    )
+
+
+def test_labels_are_reused_and_validated():
+    """The same value is returned for a label set and the arity is checked."""
+    counter = Counter("test_events", "Events.", ("adapter", "outcome"))
+    assert counter.labels("hci0", "timeout") is counter.labels("hci0", "timeout")
+    with pytest.raises(ValueError):
+        counter.labels("hci0")
+
+
+def test_remove_and_clear():
+    """Label sets can be removed and the registry can be reset."""
+    registry = MetricsRegistry()
+    gauge = registry.register(Gauge("test_slots", "Slots.", ("adapter",)))
+    gauge.labels("hci0").set(1)
+    gauge.labels("hci1").set(1)
+    gauge.remove("hci0")
+    assert 'adapter="hci0"' not in registry.render()
+    registry.clear()
+    assert "hci1" not in registry.render()
+
+
+def test_register_duplicate():
+    """A metric name can only be registered once."""
+    registry = MetricsRegistry()
+    registry.register(Counter("test_events", "Events."))
+    with pytest.raises(ValueError):
+        registry.register(Counter("test_events", "Events."))
@@ -0,0 +1,45 @@
+"""Tests for the per-device flight recorder."""
+
+from __future__ import annotations
+
+from bleak_retry_connector.recorder import FlightRecorder
+
+
+def test_record_and_get_events():
+    """Events are returned oldest first."""
+    recorder = FlightRecorder()
+    recorder.record("AA:BB:CC:DD:EE:FF", "attempt", "hci0", "1")
+    recorder.record("AA:BB:CC:DD:EE:FF", "failed", "hci0", "TIMEOUT: timed out")
+    events = recorder.get_events("AA:BB:CC:DD:EE:FF")
+    assert [
+        (event["event"], event["adapter"], event["detail"]) for event in events
+    ] == [
+        ("attempt", "hci0", "1"),
+        ("failed", "hci0", "TIMEOUT: timed out"),
+    ]
+    assert events[0]["time"] <= events[1]["time"]
+    assert recorder.get_events("11:22:33:44:55:66") == []
+
+
+def test_events_are_bounded():
+    """Only the last max_events are kept per device."""
+    recorder = FlightRecorder(max_events=3)
+    for attempt in range(5):
+        recorder.record("AA:BB:CC:DD:EE:FF", "attempt", detail=str(attempt))
+    assert [event["detail"] for event in recorder.get_events("AA:BB:CC:DD:EE:FF")] == [
+        "2",
+        "3",
+        "4",
+    ]
+
+
+def test_least_recently_used_device_is_evicted():
+    """The device that has not had an event for the longest is evicted."""
+    recorder = FlightRecorder(max_devices=2)
+    recorder.record("AA:AA:AA:AA:AA:AA", "attempt")
+    recorder.record("BB:BB:BB:BB:BB:BB", "attempt")
+    recorder.record("AA:AA:AA:AA:AA:AA", "connected")
+    recorder.record("CC:CC:CC:CC:CC:CC", "attempt")
+    assert list(recorder.diagnostics()) == ["AA:AA:AA:AA:AA:AA", "CC:CC:CC:CC:CC:CC"]
+    recorder.clear()
+    assert recorder.diagnostics() == {}
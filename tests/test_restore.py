@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from bluetooth_adapters import load_history_from_managed_objects
+
+import bleak_retry_connector
+from bleak_retry_connector import DiscoveryRestorer, restore_discoveries
+from bleak_retry_connector.restore import partition_by_adapter
+from tests.fake_bluez import AdapterProfile, FakeBlueZManager, installed
+
+
+def test_partition_by_adapter() -> None:
+    device: dict[str, dict[str, Any]] = {
+        "org.bluez.Device1": {"Address": "AA:BB:CC:DD:EE:FF"}
+    }
+    service: dict[str, dict[str, Any]] = {"org.bluez.GattService1": {}}
+    managed_objects = {
+        "/org/bluez": {"org.bluez.AgentManager1": {}},
+        "/org/bluez/hci0": {"org.bluez.Adapter1": {}},
+        "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF": device,
+        "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF/service0001": service,
+        "/org/bluez/hci1/dev_AA_BB_CC_DD_EE_FF": device,
+        "/org/bluez/hci2/dev_AA_BB_CC_DD_EE_FF": device,
+    }
+
+    partitions = partition_by_adapter(managed_objects, ["hci0", "hci1", "hci3"])
+
+    assert partitions == {
+        "hci0": {
+            "/org/bluez/hci0": {"org.bluez.Adapter1": {}},
+            "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF": device,
+            "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF/service0001": service,
+        },
+        "hci1": {"/org/bluez/hci1/dev_AA_BB_CC_DD_EE_FF": device},
+        "hci3": {},
+    }
+
+
+def _make_scanner() -> Mock:
+    return Mock(_backend=Mock(seen_devices={}))
+
+
+@pytest.mark.asyncio
+async def test_discovery_restorer_applies_changes() -> None:
+    manager = FakeBlueZManager({"hci0": AdapterProfile(), "hci1": AdapterProfile()})
+    for index in range(3):
+        manager.add_device(f"AA:BB:CC:DD:EE:0{index}")
+    scanner = _make_scanner()
+    expected = _make_scanner()
+    restorer = DiscoveryRestorer()
+    seen_devices = scanner._backend.seen_devices
+
+    with (
+        installed(manager),
+        patch(
+            "bluetooth_adapters.load_history_from_managed_objects",
+            wraps=load_history_from_managed_objects,
+        ) as mock_load_history,
+    ):
+        report = await restorer.restore({"hci0": scanner})
+        await restore_discoveries(expected, "hci0")
+        assert report.restored == {"hci0": 3}
+        assert report.removed == {"hci0": 0}
+        assert seen_devices.keys() == expected._backend.seen_devices.keys()
+        mock_load_history.reset_mock()
+
+        report = await restorer.restore({"hci0": scanner})
+        assert report.restored == {"hci0": 0}
+        assert report.removed == {"hci0": 0}
+        assert mock_load_history.call_count == 0
+        assert len(seen_devices) == 3
+
+        del manager._properties["/org/bluez/hci0/dev_AA_BB_CC_DD_EE_00"]
+        manager.add_device("AA:BB:CC:DD:EE:10")
+        report = await restorer.restore({"hci0": scanner})
+        assert report.restored == {"hci0": 1}
+        assert report.removed == {"hci0": 1}
+        assert mock_load_history.call_count == 1
+        assert sorted(seen_devices) == [
+            "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_01",
+            "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_02",
+            "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_10",
+        ]
+
+
+@pytest.mark.asyncio
+async def test_discovery_restorer_restarted_scanner() -> None:
+    """A restarted scanner gets every remembered discovery without loading them."""
+    manager = FakeBlueZManager({"hci0": AdapterProfile(), "hci1": AdapterProfile()})
+    for index in range(3):
+        manager.add_device(f"AA:BB:CC:DD:EE:0{index}")
+    restorer = DiscoveryRestorer()
+    scanner = _make_scanner()
+
+    with installed(manager):
+        await restorer.restore({"hci0": scanner, "hci1": _make_scanner()})
+        scanner._backend.seen_devices = {}
+        with patch(
+            "bluetooth_adapters.load_history_from_managed_objects"
+        ) as mock_load_history:
+            report = await restorer.restore({"hci0": scanner})
+
+    assert mock_load_history.call_count == 0
+    assert report.restored == {"hci0": 3}
+    assert all("/hci0/" in path for path in scanner._backend.seen_devices)
+    assert len(scanner._backend.seen_devices) == 3
+
+    restorer.clear()
+    with installed(manager):
+        scanner._backend.seen_devices = {}
+        with patch(
+            "bluetooth_adapters.load_history_from_managed_objects",
+            wraps=load_history_from_managed_objects,
+        ) as mock_load_history:
+            report = await restorer.restore({"hci0": scanner})
+    assert mock_load_history.call_count == 1
+    assert report.restored == {"hci0": 3}
+
+
+@pytest.mark.asyncio
+async def test_discovery_restorer_no_properties(mock_linux: None) -> None:
+    scanner = _make_scanner()
+    with patch.object(
+        bleak_retry_connector.restore, "_get_properties", AsyncMock(return_value=None)
+    ):
+        report = await DiscoveryRestorer().restore({"hci0": scanner})
+    assert report.restored == {}
+    assert scanner._backend.seen_devices == {}
+
+
+@pytest.mark.asyncio
+async def test_discovery_restorer_non_linux(mock_macos: None) -> None:
+    get_props = AsyncMock()
+    with patch.object(bleak_retry_connector.restore, "_get_properties", get_props):
+        report = await DiscoveryRestorer().restore({"hci0": _make_scanner()})
+    get_props.assert_not_called()
+    assert report.restored == {}
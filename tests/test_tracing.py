@@ -0,0 +1,84 @@
+"""Tests for the pluggable tracer."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from bleak_retry_connector.tracing import set_tracer, trace_span
+
+
+class RecordingTracer:
+    """Tracer that records span events."""
+
+    def __init__(self) -> None:
+        self.events: list[tuple[str, str, Any]] = []
+
+    def start_span(self, name: str, attributes: dict[str, Any]) -> str:
+        self.events.append(("start", name, attributes))
+        return name
+
+    def end_span(self, span: Any, error: BaseException | None) -> None:
+        self.events.append(("end", span, error))
+
+
+@pytest.fixture
+def tracer() -> Iterator[RecordingTracer]:
+    tracer = RecordingTracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(None)
+
+
+def test_trace_span_without_tracer():
+    """Without a tracer the same no-op context manager is reused."""
+    assert trace_span("a", address="x") is trace_span("b")
+    with trace_span("a"):
+        pass
+
+
+def test_trace_span(tracer: RecordingTracer) -> None:
+    """Span start and end are sent to the tracer."""
+    with trace_span("connect_attempt", address="AA:BB:CC:DD:EE:FF", attempt=1):
+        pass
+    assert tracer.events == [
+        (
+            "start",
+            "connect_attempt",
+            {"address": "AA:BB:CC:DD:EE:FF", "attempt": 1},
+        ),
+        ("end", "connect_attempt", None),
+    ]
+
+
+def test_trace_span_error(tracer: RecordingTracer) -> None:
+    """The error that ended the span is passed to the tracer."""
+    error = ValueError("boom")
+    with pytest.raises(ValueError), trace_span("backoff"):
+        raise error
+    assert tracer.events[-1] == ("end", "backoff", error)
+
+
+def test_broken_tracer_does_not_break_the_span(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Errors raised by the tracer are logged and swallowed."""
+
+    class BrokenTracer:
+        def start_span(self, name: str, attributes: dict[str, Any]) -> Any:
+            raise RuntimeError("start")
+
+        def end_span(self, span: Any, error: BaseException | None) -> None:
+            raise RuntimeError("end")
+
+    set_tracer(BrokenTracer())
+    try:
+        with caplog.at_level(logging.ERROR), trace_span("stale_cleanup"):
+            ran = True
+    finally:
+        set_tracer(None)
+    assert ran
+    assert caplog.text.count("Error in tracer") == 2
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import pytest
+
+from bleak_retry_connector.util import asyncio_timeout
+from tests.virtual_clock import VirtualClockEventLoop
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_sleeps_complete_in_virtual_time(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """Sleeps advance the clock without waiting."""
+    wall_start = time.perf_counter()
+    assert virtual_clock.time() == 0
+    await asyncio.sleep(3600)
+    assert virtual_clock.time() == 3600
+    assert time.monotonic() == 3600
+    assert time.perf_counter() - wall_start < 1
+
+
+async def test_timers_fire_in_order(virtual_clock: VirtualClockEventLoop) -> None:
+    """Concurrent sleeps wake up in order at their virtual time."""
+    woke: list[tuple[str, float]] = []
+
+    async def _sleep(name: str, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+        woke.append((name, virtual_clock.time()))
+
+    await asyncio.gather(_sleep("slow", 2), _sleep("fast", 0.5), _sleep("mid", 1))
+    assert woke == [("fast", 0.5), ("mid", 1), ("slow", 2)]
+
+
+async def test_timeouts_fire_in_virtual_time(
+    virtual_clock: VirtualClockEventLoop,
+) -> None:
+    """Timeouts fire at their deadline."""
+    with pytest.raises(asyncio.TimeoutError):
+        async with asyncio_timeout(5):
+            await asyncio.Event().wait()
+    assert virtual_clock.time() == 5
+
+
+async def test_real_loop_without_fixture() -> None:
+    """Tests that do not use the fixture keep the default loop."""
+    assert not isinstance(asyncio.get_running_loop(), VirtualClockEventLoop)
@@ -0,0 +1,96 @@
+"""Tests for the slow-connect watchdog."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from bleak.backends.bluezdbus import defs
+from bleak.backends.device import BLEDevice
+
+import bleak_retry_connector
+from bleak_retry_connector import BleakSlotManager
+from bleak_retry_connector.bluez import Allocations
+from bleak_retry_connector.watchdog import SlowConnectSnapshot, SlowConnectWatchdog
+
+pytestmark = pytest.mark.asyncio
+
+PATH = "/org/bluez/hci1/dev_FA_23_9D_AA_45_46"
+
+
+async def _stalled_connect() -> None:
+    await asyncio.sleep(1)
+
+
+async def test_watchdog_snapshots_stalled_attempt(
+    mock_linux: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A stalled attempt is snapshotted while it is still running."""
+    manager = SimpleNamespace(
+        _properties={
+            PATH: {defs.DEVICE_INTERFACE: {"Address": "FA:23:9D:AA:45:46", "RSSI": -60}}
+        },
+        _bus=SimpleNamespace(_method_return_handlers={1: None, 2: None}),
+        _condition_callbacks={PATH: [SimpleNamespace(property_name="Connected")]},
+        add_device_watcher=lambda *args, **kwargs: None,
+    )
+    monkeypatch.setattr(
+        bleak_retry_connector.bluez,
+        "get_global_bluez_manager_with_timeout",
+        AsyncMock(return_value=manager),
+    )
+    monkeypatch.setattr(bleak_retry_connector.bluez, "defs", defs)
+    slot_manager = BleakSlotManager()
+    await slot_manager.async_setup()
+    slot_manager.register_adapter("hci1", 3)
+    snapshots: list[SlowConnectSnapshot] = []
+    watchdog = SlowConnectWatchdog(snapshots.append, 0.01, slot_manager)
+    device = BLEDevice("FA:23:9D:AA:45:46", "Test", {"path": PATH})
+
+    async def _attempt() -> None:
+        watch = watchdog.watch(device, "test", 2)
+        try:
+            await _stalled_connect()
+        finally:
+            watch.cancel()
+
+    attempt = asyncio.create_task(_attempt())
+    await asyncio.sleep(0.05)
+    attempt.cancel()
+
+    (snapshot,) = snapshots
+    assert snapshot.address == "FA:23:9D:AA:45:46"
+    assert snapshot.name == "test"
+    assert snapshot.attempt == 2
+    assert snapshot.elapsed >= 0.01
+    assert any("_stalled_connect" in frame for frame in snapshot.stack)
+    assert snapshot.device_properties == {"Address": "FA:23:9D:AA:45:46", "RSSI": -60}
+    assert snapshot.allocations == Allocations("hci1", 3, 3, ())
+    assert snapshot.pending_dbus_calls == 2
+    assert snapshot.pending_conditions == ["Connected"]
+
+
+async def test_watchdog_not_triggered_for_fast_attempt() -> None:
+    """Nothing is snapshotted when the attempt finishes in time."""
+    snapshots: list[SlowConnectSnapshot] = []
+    watchdog = SlowConnectWatchdog(snapshots.append, 0.01)
+    watch = watchdog.watch(BLEDevice("FA:23:9D:AA:45:46", "Test", {}), "test", 1)
+    watch.cancel()
+    await asyncio.sleep(0.02)
+    assert snapshots == []
+
+
+async def test_watchdog_callback_error(caplog: pytest.LogCaptureFixture) -> None:
+    """Errors raised by the callback are logged."""
+
+    def _callback(snapshot: Any) -> None:
+        raise RuntimeError("boom")
+
+    watchdog = SlowConnectWatchdog(_callback, 0)
+    with caplog.at_level(logging.ERROR):
+        await watchdog.watch(BLEDevice("FA:23:9D:AA:45:46", "Test", {}), "test", 1)
+    assert "Error in slow connect callback" in caplog.text